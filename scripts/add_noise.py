@@ -13,13 +13,24 @@ PROBLEMAS ADICIONADOS:
 8. Posts vazios ou quebrados
 """
 
+import contextlib
+import io
+import json
+import os
+import shutil
+from concurrent.futures import ProcessPoolExecutor, as_completed
 import pandas as pd
 import numpy as np
 from datetime import timedelta
-import random
 import warnings
 warnings.filterwarnings('ignore')
 
+import profiling
+from noise_manifest import ManifestWriter, manifest_path, save_manifest
+from noise_plan import NoisePlan
+from noise_stream import BucketShuffler, DuplicateReservoir, NoiseBudget
+from string_corruptors import corrupt_strings, pick_corruptors
+
 print("=" * 70)
 print(" ADICIONANDO 'SUJEIRA' AOS DADOS")
 print("=" * 70)
@@ -36,274 +47,575 @@ NOISE_CONFIG = {
     'inconsistent_pct': 0.025,      # 2.5% de inconsistências
     'format_errors_pct': 0.02,      # 2% de erros de formato
 }
+
+# Erros de formato nos usernames: corruptor -> peso (opções em string_corruptors.py:
+# special_suffix, lookalikes, whitespace, case_flip, truncate), ex:
+# {'special_suffix': 0.4, 'lookalikes': 0.2, 'whitespace': 0.2, 'case_flip': 0.1, 'truncate': 0.1}
+USERNAME_CORRUPTORS = {'special_suffix': 1.0}
+
+# Valores inválidos de account_type (sorteados linha a linha)
+INVALID_ACCOUNT_TYPES = ['unknown', 'ERRO', '', 'NULL', 'deleted']
+
+# Semente global: cada base recebe um gerador próprio derivado dela (SeedSequence.spawn), então as bases
+# sujas são idênticas rodando em série ou com qualquer número de processos
+# None sorteia uma semente nova a cada execução (mostrada e gravada em add_noise_seeds.json, para reproduzir)
+RANDOM_SEED = None
+
+# Número de processos: cada base é carregada, sujada e gravada em um processo próprio (1 roda tudo em série)
+MAX_WORKERS = os.cpu_count() or 1
+
+# Modo streaming: com um valor (ex: 1_000_000), os CSVs do Xister e das moedas são lidos, sujados e
+# gravados em blocos desse tamanho, sem carregar o arquivo inteiro. As quantidades de cada corrupção são
+# as mesmas da versão em memória (calculadas para o arquivo todo), as duplicatas saem de um reservatório
+# de até DUPLICATE_RESERVOIR linhas já lidas e o embaralhamento final passa por arquivos temporários em
+# NOISE_TMP_DIR (apagados no final). None suja tudo em memória
+NOISE_CHUNK_SIZE = None
+DUPLICATE_RESERVOIR = 100_000
+NOISE_TMP_DIR = 'noise_tmp'
+
+# Gabarito do ruído: grava ao lado de cada base suja um <base>_dirty.manifest.npz com, para cada linha,
+# a linha do CSV limpo de origem, a linha da cópia original (duplicatas) e um bitmask uint16 das
+# corrupções aplicadas (bits em XISTER_FLAGS, CRYPTO_FLAGS e EVENTS_FLAGS; leitura em noise_manifest.py)
+NOISE_MANIFEST = True
+
+# Profiling: grava add_noise_profile.json com tempo, tempo de CSV, linhas/s e pico de memória de cada etapa
+# PROFILE_SLOWEST_STAGE salva também o cProfile da etapa mais lenta (add_noise_slowest.prof)
+PROFILE_REPORT = True
+PROFILE_SLOWEST_STAGE = False
 # 1° Função: suja a base de dados do Xister
+# As corrupções são divididas em antes e depois das duplicatas (as cópias já saem com as de antes) e
+# a quantidade de cada uma é calculada para o arquivo inteiro, então as mesmas funções servem para o
+# arquivo todo na memória e para cada bloco no modo streaming
 
-def add_noise_to_xister(df):
-    """Adiciona ruído realista aos posts do Xister"""
-    print("\n📱 Sujando dados do Xister...")
-    
-    df_dirty = df.copy()
-    total_rows = len(df_dirty)
-    
-    # 1. VALORES AUSENTES (NaN)
-    n_missing = int(total_rows * NOISE_CONFIG['missing_data_pct'])
-    
-    # Likes faltantes
-    missing_likes = np.random.choice(df_dirty.index, size=n_missing//4, replace=False)
-    df_dirty.loc[missing_likes, 'likes'] = np.nan
-    
-    # Sentiment faltante
-    missing_sent = np.random.choice(df_dirty.index, size=n_missing//4, replace=False)
-    df_dirty.loc[missing_sent, 'sentiment'] = np.nan
-    
-    # Username faltante
-    missing_user = np.random.choice(df_dirty.index, size=n_missing//4, replace=False)
-    df_dirty.loc[missing_user, 'username'] = np.nan
-    
-    # Text faltante ou vazio
-    missing_text = np.random.choice(df_dirty.index, size=n_missing//4, replace=False)
-    df_dirty.loc[missing_text, 'text'] = ''
-    
-    print(f"  ✓ Adicionados {n_missing} valores ausentes")
-    
-    # 2. DUPLICATAS
-    n_duplicates = int(total_rows * NOISE_CONFIG['duplicates_pct'])
-    duplicate_indices = np.random.choice(df_dirty.index, size=n_duplicates, replace=False)
-    duplicates = df_dirty.loc[duplicate_indices].copy()
-    
-    # Algumas duplicatas exatas
-    df_dirty = pd.concat([df_dirty, duplicates.iloc[:n_duplicates//2]], ignore_index=True)
-    
-    # Algumas duplicatas com leve modificação
-    duplicates_modified = duplicates.iloc[n_duplicates//2:].copy()
-    duplicates_modified['likes'] = duplicates_modified['likes'] + np.random.randint(-5, 5, len(duplicates_modified))
-    df_dirty = pd.concat([df_dirty, duplicates_modified], ignore_index=True)
-    
-    print(f"  ✓ Adicionadas {n_duplicates} duplicatas")
+def noise_totals(total_rows):
+    """Total de linhas de cada tipo de ruído do NOISE_CONFIG em um arquivo de total_rows linhas"""
+    return {kind: int(total_rows * NOISE_CONFIG[f'{kind}_pct'])
+            for kind in ('missing_data', 'duplicates', 'outliers', 'inconsistent', 'format_errors')}
+
+def xister_noise_counts(total_rows):
+    """Quantas linhas recebem cada corrupção nos posts do Xister"""
+    totals = noise_totals(total_rows)
+    return {
+        'missing_likes': totals['missing_data']//4,
+        'missing_sentiment': totals['missing_data']//4,
+        'missing_username': totals['missing_data']//4,
+        'empty_text': totals['missing_data']//4,
+        'duplicates': totals['duplicates'],
+        'modified_duplicates': totals['duplicates'] - totals['duplicates']//2,
+        'outlier_likes': totals['outliers']//3,
+        'negative_reposts': totals['outliers']//3,
+        'outlier_sentiment': totals['outliers']//3,
+        'inconsistent': totals['inconsistent']//2,
+        'bot_likes': totals['inconsistent']//2,
+        'username_format': totals['format_errors']//3,
+        'invalid_timestamp': totals['format_errors']//3,
+        'invalid_account_type': totals['format_errors']//3,
+    }
+
+# Bits do manifesto (bit i = rótulo XISTER_FLAGS[i]); só acrescente no final, para não mudar os bits antigos
+XISTER_FLAGS = (
+    'missing_likes', 'missing_sentiment', 'missing_username', 'empty_text', 'duplicate_likes',
+    'outlier_likes', 'negative_reposts', 'outlier_sentiment', 'inconsistent_sentiment', 'inconsistent_likes',
+    'bot_likes', 'username_format', 'invalid_timestamp', 'invalid_account_type',
+)
+
+# Chaves das tabelas limpas que ficam fora do Xister sujo: com elas daria para refazer username,
+# account_type e text corrompidos a partir de xister_users.csv e do template (o CSV limpo mantém as
+# chaves, e o manifesto liga cada linha suja à linha limpa)
+XISTER_KEY_COLUMNS = ('user_id', 'template_id')
+
+# Corrupções sorteadas só entre as linhas originais (antes das duplicatas)
+XISTER_BEFORE_DUPLICATES = ('missing_likes', 'missing_sentiment', 'missing_username', 'empty_text')
+
+def plan_xister_before_duplicates(plan, counts):
+    """Valores ausentes"""
+    # Likes, sentiment e username faltantes
+    plan.set('likes', plan.sample(counts['missing_likes']), np.nan, 'missing_likes')
+    plan.set('sentiment', plan.sample(counts['missing_sentiment']), np.nan, 'missing_sentiment')
+    plan.set('username', plan.sample(counts['missing_username']), np.nan, 'missing_username')
+    
+    # Text faltante ou vazio (a moeda marcada no post se perde junto com o texto)
+    empty_text = plan.sample(counts['empty_text'])
+    plan.set('text', empty_text, '', 'empty_text')
+    plan.set('coin', empty_text, np.nan, 'empty_text')
+
+def plan_xister_after_duplicates(plan, counts, df, modified):
+    """
+    Duplicatas modificadas (linhas modified), outliers, inconsistências e erros de formato, sorteados
+    entre originais e duplicatas; df são as linhas de origem do plano (para achar os bots)
+    """
+    rng = plan.rng
     
-    # 3. OUTLIERS EXTREMOS
-    n_outliers = int(total_rows * NOISE_CONFIG['outliers_pct'])
+    # Duplicatas com leve modificação nos likes
+    plan.transform('likes', modified, np.add, 'duplicate_likes', rng.integers(-5, 5, len(modified)))
     
+    # OUTLIERS EXTREMOS
     # Likes absurdos
-    outlier_likes = np.random.choice(df_dirty.index, size=n_outliers//3, replace=False)
-    df_dirty.loc[outlier_likes, 'likes'] = np.random.randint(500000, 10000000, len(outlier_likes))
+    outlier_likes = plan.sample(counts['outlier_likes'])
+    plan.set('likes', outlier_likes, rng.integers(500000, 10000000, len(outlier_likes)), 'outlier_likes')
     
     # Reposts negativos (erro)
-    outlier_reposts = np.random.choice(df_dirty.index, size=n_outliers//3, replace=False)
-    df_dirty.loc[outlier_reposts, 'reposts'] = np.random.randint(-100, -1, len(outlier_reposts))
+    outlier_reposts = plan.sample(counts['negative_reposts'])
+    plan.set('reposts', outlier_reposts, rng.integers(-100, -1, len(outlier_reposts)), 'negative_reposts')
     
     # Sentiment fora do range
-    outlier_sent = np.random.choice(df_dirty.index, size=n_outliers//3, replace=False)
-    df_dirty.loc[outlier_sent, 'sentiment'] = np.random.uniform(-5, 5, len(outlier_sent))
-    
-    print(f"  ✓ Adicionados {n_outliers} outliers extremos")
-    
-    # 4. INCONSISTÊNCIAS
-    n_inconsistent = int(total_rows * NOISE_CONFIG['inconsistent_pct'])
+    outlier_sent = plan.sample(counts['outlier_sentiment'])
+    plan.set('sentiment', outlier_sent, rng.uniform(-5, 5, len(outlier_sent)), 'outlier_sentiment')
     
+    # INCONSISTÊNCIAS
     # Posts com muito engagement mas sentiment negativo (suspeito)
-    inconsistent_idx = np.random.choice(df_dirty.index, size=n_inconsistent//2, replace=False)
-    df_dirty.loc[inconsistent_idx, 'sentiment'] = -0.8
-    df_dirty.loc[inconsistent_idx, 'likes'] = np.random.randint(10000, 50000, len(inconsistent_idx))
+    inconsistent_idx = plan.sample(counts['inconsistent'])
+    plan.set('sentiment', inconsistent_idx, -0.8, 'inconsistent_sentiment')
+    plan.set('likes', inconsistent_idx, rng.integers(10000, 50000, len(inconsistent_idx)), 'inconsistent_likes')
     
     # Bots com muito engagement (suspeito)
-    bot_mask = df_dirty['account_type'] == 'bot'
-    suspicious_bots = df_dirty[bot_mask].sample(min(n_inconsistent//2, bot_mask.sum()))
-    df_dirty.loc[suspicious_bots.index, 'likes'] = np.random.randint(5000, 20000, len(suspicious_bots))
-    
-    print(f"  ✓ Adicionadas {n_inconsistent} inconsistências")
+    bot_rows = np.flatnonzero((df['account_type'] == 'bot').to_numpy()[plan.sources()])
+    suspicious_bots = plan.sample(min(counts['bot_likes'], len(bot_rows)), candidates=bot_rows)
+    plan.set('likes', suspicious_bots, rng.integers(5000, 20000, len(suspicious_bots)), 'bot_likes')
     
-    # 5. ERROS DE FORMATO
-    n_format_errors = int(total_rows * NOISE_CONFIG['format_errors_pct'])
-    
-    # Usernames com caracteres especiais estranhos
-    format_errors = np.random.choice(df_dirty.index, size=n_format_errors//3, replace=False)
-    for idx in format_errors:
-        if pd.notna(df_dirty.loc[idx, 'username']):
-            df_dirty.loc[idx, 'username'] = df_dirty.loc[idx, 'username'] + random.choice(['@@', '##', '$$', '!!', '??'])
+    # ERROS DE FORMATO
+    # Usernames com caracteres especiais estranhos (ou outro corruptor do USERNAME_CORRUPTORS)
+    format_errors = plan.sample(counts['username_format'])
+    corruptors = pick_corruptors(USERNAME_CORRUPTORS, len(format_errors), rng)
+    plan.transform('username', format_errors, lambda usernames, names: corrupt_strings(usernames, names, rng),
+                   'username_format', corruptors)
     
     # Timestamps faltantes (convertidos para string quebrada)
-    missing_ts = np.random.choice(df_dirty.index, size=n_format_errors//3, replace=False)
-    df_dirty.loc[missing_ts, 'timestamp'] = 'ERRO'
+    plan.set('timestamp', plan.sample(counts['invalid_timestamp']), 'ERRO', 'invalid_timestamp')
     
     # Account type inválido
-    invalid_type = np.random.choice(df_dirty.index, size=n_format_errors//3, replace=False)
-    df_dirty.loc[invalid_type, 'account_type'] = random.choice(['unknown', 'ERRO', '', 'NULL', 'deleted'])
-    
-    print(f"  ✓ Adicionados {n_format_errors} erros de formato")
-    
-    # 6. EMBARALHA LINHAS
-    df_dirty = df_dirty.sample(frac=1).reset_index(drop=True)
-    
-    print(f"\n  📊 Resumo Xister:")
-    print(f"    - Linhas originais: {total_rows:,}")
-    print(f"    - Linhas com ruído: {len(df_dirty):,}")
-    print(f"    - NaN em likes: {df_dirty['likes'].isna().sum()}")
-    print(f"    - NaN em sentiment: {df_dirty['sentiment'].isna().sum()}")
-    print(f"    - Posts vazios: {(df_dirty['text'] == '').sum()}")
-    print(f"    - Usernames inválidos: {df_dirty['username'].isna().sum()}")
-    
-    return df_dirty
+    invalid_type = plan.sample(counts['invalid_account_type'])
+    plan.set('account_type', invalid_type, rng.choice(INVALID_ACCOUNT_TYPES, len(invalid_type)), 'invalid_account_type')
 
-# 2° Função: suja as bases de dados de Crypto
+def xister_stats(df):
+    """Contagens do resumo de uma base suja do Xister (somáveis entre blocos)"""
+    return {
+        'NaN em likes': int(df['likes'].isna().sum()),
+        'NaN em sentiment': int(df['sentiment'].isna().sum()),
+        'Posts vazios': int((df['text'] == '').sum()),
+        'Usernames inválidos': int(df['username'].isna().sum()),
+    }
 
-def add_noise_to_crypto(df, coin_name):
-    """Adiciona ruído aos dados de crypto"""
-    print(f"\n💰 Sujando dados de {coin_name}...")
+def print_noise_summary(name, total_rows, dirty_rows, stats):
+    """Resumo de uma base suja"""
+    print(f"\n  📊 Resumo {name}:")
+    print(f"    - Linhas originais: {total_rows:,}")
+    print(f"    - Linhas com ruído: {dirty_rows:,}")
+    for label, count in stats.items():
+        print(f"    - {label}: {count}")
+
+def add_noise_to_xister(df, rng=None, manifest=None):
+    """Adiciona ruído realista aos posts do Xister (e grava o gabarito em manifest, se dado)"""
+    print("\n📱 Sujando dados do Xister...")
     
-    df_dirty = df.copy()
-    total_rows = len(df_dirty)
+    df = df.drop(columns=list(XISTER_KEY_COLUMNS), errors='ignore')
+    total_rows = len(df)
+    totals = noise_totals(total_rows)
+    counts = xister_noise_counts(total_rows)
+    plan = NoisePlan(total_rows, rng)
     
-    # 1. VALORES AUSENTES
-    n_missing = int(total_rows * NOISE_CONFIG['missing_data_pct'])
+    # 1. VALORES AUSENTES (NaN)
+    plan_xister_before_duplicates(plan, counts)
+    print(f"  ✓ Adicionados {totals['missing_data']} valores ausentes")
     
-    # Preço faltante
-    missing_price = np.random.choice(df_dirty.index, size=n_missing//3, replace=False)
-    df_dirty.loc[missing_price, 'price_usd'] = np.nan
+    # 2. DUPLICATAS (copiam a linha já com os valores ausentes): metade exatas, metade com likes modificados
+    duplicates = plan.duplicate(plan.sample(counts['duplicates']))
+    print(f"  ✓ Adicionadas {totals['duplicates']} duplicatas")
     
-    # Volume faltante
-    missing_vol = np.random.choice(df_dirty.index, size=n_missing//3, replace=False)
-    df_dirty.loc[missing_vol, 'volume_24h'] = np.nan
+    # 3-5. OUTLIERS, INCONSISTÊNCIAS E ERROS DE FORMATO (as duplicatas também podem ser sorteadas)
+    plan_xister_after_duplicates(plan, counts, df, duplicates[len(duplicates) - counts['modified_duplicates']:])
+    print(f"  ✓ Adicionados {totals['outliers']} outliers extremos")
+    print(f"  ✓ Adicionadas {totals['inconsistent']} inconsistências")
+    print(f"  ✓ Adicionados {totals['format_errors']} erros de formato")
     
-    # Market cap zerado
-    missing_mc = np.random.choice(df_dirty.index, size=n_missing//3, replace=False)
-    df_dirty.loc[missing_mc, 'market_cap'] = 0
+    # 6. MONTA O DATAFRAME SUJO (um gather embaralhado por coluna)
+    df_dirty = plan.build(df)
+    if manifest:
+        save_manifest(manifest, *plan.manifest(XISTER_FLAGS), XISTER_FLAGS)
     
-    print(f"  ✓ Adicionados {n_missing} valores ausentes")
+    print_noise_summary('Xister', total_rows, len(df_dirty), xister_stats(df_dirty))
     
-    # 2. OUTLIERS
-    n_outliers = int(total_rows * NOISE_CONFIG['outliers_pct'])
+    return df_dirty
+
+# 2° Função: suja as bases de dados de Crypto
+
+def crypto_noise_counts(total_rows):
+    """Quantas linhas recebem cada corrupção nos preços de uma moeda"""
+    totals = noise_totals(total_rows)
+    return {
+        'missing_price': totals['missing_data']//3,
+        'missing_volume': totals['missing_data']//3,
+        'zero_market_cap': totals['missing_data']//3,
+        'outlier_price': totals['outliers']//2,
+        'outlier_change': totals['outliers']//2,
+        'duplicates': totals['duplicates'],
+        'modified_duplicates': totals['duplicates'],
+        'invalid_timestamp': totals['format_errors'],
+        'negative_price': int(total_rows * 0.01),
+    }
+
+# Bits do manifesto (bit i = rótulo CRYPTO_FLAGS[i])
+CRYPTO_FLAGS = (
+    'missing_price', 'missing_volume', 'zero_market_cap', 'outlier_price', 'outlier_change',
+    'duplicate_price', 'invalid_timestamp', 'negative_price',
+)
+
+# Corrupções sorteadas só entre as linhas originais (antes das duplicatas)
+CRYPTO_BEFORE_DUPLICATES = ('missing_price', 'missing_volume', 'zero_market_cap', 'outlier_price', 'outlier_change')
+
+def plan_crypto_before_duplicates(plan, counts):
+    """Valores ausentes e outliers"""
+    rng = plan.rng
+    
+    # Preço e volume faltantes, market cap zerado
+    plan.set('price_usd', plan.sample(counts['missing_price']), np.nan, 'missing_price')
+    plan.set('volume_24h', plan.sample(counts['missing_volume']), np.nan, 'missing_volume')
+    plan.set('market_cap', plan.sample(counts['zero_market_cap']), 0, 'zero_market_cap')
     
     # Preços absurdos
-    outlier_price = np.random.choice(df_dirty.index, size=n_outliers//2, replace=False)
-    df_dirty.loc[outlier_price, 'price_usd'] = df_dirty.loc[outlier_price, 'price_usd'] * np.random.uniform(50, 200, len(outlier_price))
+    outlier_price = plan.sample(counts['outlier_price'])
+    plan.transform('price_usd', outlier_price, np.multiply, 'outlier_price',
+                   rng.uniform(50, 200, len(outlier_price)))
     
     # Variações impossíveis
-    outlier_change = np.random.choice(df_dirty.index, size=n_outliers//2, replace=False)
-    df_dirty.loc[outlier_change, 'price_change_pct'] = np.random.uniform(-99, 99, len(outlier_change))
-    
-    print(f"  ✓ Adicionados {n_outliers} outliers")
+    outlier_change = plan.sample(counts['outlier_change'])
+    plan.set('price_change_pct', outlier_change, rng.uniform(-99, 99, len(outlier_change)), 'outlier_change')
+
+def plan_crypto_after_duplicates(plan, counts, df, modified):
+    """Preço das duplicatas (linhas modified), timestamps quebrados e preços negativos"""
+    rng = plan.rng
     
-    # 3. DUPLICATAS DE TIMESTAMP
-    n_duplicates = int(total_rows * NOISE_CONFIG['duplicates_pct'])
-    duplicate_indices = np.random.choice(df_dirty.index, size=n_duplicates, replace=False)
-    duplicates = df_dirty.loc[duplicate_indices].copy()
+    # Duplicatas de timestamp: modifica levemente os preços mas mantém timestamp
+    plan.transform('price_usd', modified, np.multiply, 'duplicate_price', rng.uniform(0.95, 1.05, len(modified)))
     
-    # Modifica levemente os preços mas mantém timestamp
-    duplicates['price_usd'] = duplicates['price_usd'] * np.random.uniform(0.95, 1.05, len(duplicates))
-    df_dirty = pd.concat([df_dirty, duplicates], ignore_index=True)
+    # Timestamps quebrados
+    plan.set('timestamp', plan.sample(counts['invalid_timestamp']), 'INVALID_DATE', 'invalid_timestamp')
     
-    print(f"  ✓ Adicionadas {n_duplicates} duplicatas de timestamp")
+    # Valores negativos inválidos
+    plan.transform('price_usd', plan.sample(counts['negative_price']), lambda prices: -np.abs(prices), 'negative_price')
+
+def crypto_stats(df):
+    """Contagens do resumo de uma moeda suja (somáveis entre blocos)"""
+    return {
+        'NaN em price': int(df['price_usd'].isna().sum()),
+        'NaN em volume': int(df['volume_24h'].isna().sum()),
+        'Preços negativos': int((df['price_usd'] < 0).sum()),
+        'Timestamps inválidos': int((df['timestamp'] == 'INVALID_DATE').sum()),
+    }
+
+def add_noise_to_crypto(df, coin_name, rng=None, manifest=None):
+    """Adiciona ruído aos dados de crypto (e grava o gabarito em manifest, se dado)"""
+    print(f"\n💰 Sujando dados de {coin_name}...")
     
-    # 4. TIMESTAMPS QUEBRADOS
-    n_format_errors = int(total_rows * NOISE_CONFIG['format_errors_pct'])
-    format_errors = np.random.choice(df_dirty.index, size=n_format_errors, replace=False)
-    df_dirty.loc[format_errors, 'timestamp'] = 'INVALID_DATE'
+    total_rows = len(df)
+    totals = noise_totals(total_rows)
+    counts = crypto_noise_counts(total_rows)
+    plan = NoisePlan(total_rows, rng)
     
-    print(f"  ✓ Adicionados {n_format_errors} timestamps inválidos")
+    # 1-2. VALORES AUSENTES E OUTLIERS
+    plan_crypto_before_duplicates(plan, counts)
+    print(f"  ✓ Adicionados {totals['missing_data']} valores ausentes")
+    print(f"  ✓ Adicionados {totals['outliers']} outliers")
     
-    # 5. VALORES NEGATIVOS INVÁLIDOS
-    n_negative = int(total_rows * 0.01)
-    negative_idx = np.random.choice(df_dirty.index, size=n_negative, replace=False)
-    df_dirty.loc[negative_idx, 'price_usd'] = -abs(df_dirty.loc[negative_idx, 'price_usd'])
+    # 3. DUPLICATAS DE TIMESTAMP (preço levemente modificado)
+    duplicates = plan.duplicate(plan.sample(counts['duplicates']))
     
-    print(f"  ✓ Adicionados {n_negative} preços negativos")
+    # 4-5. TIMESTAMPS QUEBRADOS E VALORES NEGATIVOS INVÁLIDOS
+    plan_crypto_after_duplicates(plan, counts, df, duplicates)
+    print(f"  ✓ Adicionadas {totals['duplicates']} duplicatas de timestamp")
+    print(f"  ✓ Adicionados {totals['format_errors']} timestamps inválidos")
+    print(f"  ✓ Adicionados {counts['negative_price']} preços negativos")
     
-    # 6. EMBARALHA
-    df_dirty = df_dirty.sample(frac=1).reset_index(drop=True)
+    # 6. MONTA O DATAFRAME SUJO (um gather embaralhado por coluna)
+    df_dirty = plan.build(df)
+    if manifest:
+        save_manifest(manifest, *plan.manifest(CRYPTO_FLAGS), CRYPTO_FLAGS)
     
-    print(f"\n  📊 Resumo {coin_name}:")
-    print(f"    - Linhas originais: {total_rows:,}")
-    print(f"    - Linhas com ruído: {len(df_dirty):,}")
-    print(f"    - NaN em price: {df_dirty['price_usd'].isna().sum()}")
-    print(f"    - NaN em volume: {df_dirty['volume_24h'].isna().sum()}")
-    print(f"    - Preços negativos: {(df_dirty['price_usd'] < 0).sum()}")
-    print(f"    - Timestamps inválidos: {(df_dirty['timestamp'] == 'INVALID_DATE').sum()}")
+    print_noise_summary(coin_name, total_rows, len(df_dirty), crypto_stats(df_dirty))
     
     return df_dirty
 
 # 3° Função: suja a base de dados de Eventos
 
-def add_noise_to_events(df):
-    """Adiciona ruído aos eventos"""
+# Bits do manifesto (bit i = rótulo EVENTS_FLAGS[i])
+EVENTS_FLAGS = ('invalid_date', 'invalid_intensity', 'empty_description')
+
+def add_noise_to_events(df, rng=None, manifest=None):
+    """Adiciona ruído aos eventos (e grava o gabarito em manifest, se dado)"""
     print(f"\n📅 Sujando dados de Eventos...")
     
-    df_dirty = df.copy()
+    plan = NoisePlan(len(df), rng)
+    rng = plan.rng
     
     # 1. Datas duplicadas
-    duplicate_event = df_dirty.sample(2)
-    df_dirty = pd.concat([df_dirty, duplicate_event], ignore_index=True)
+    plan.duplicate(plan.sample(2))
     
     # 2. Eventos com datas inválidas
-    invalid_dates = df_dirty.sample(2)
-    df_dirty.loc[invalid_dates.index, 'date'] = 'DATA_INVALIDA'
+    plan.set('date', plan.sample(2), 'DATA_INVALIDA', 'invalid_date')
     
     # 3. Intensidades fora do range
-    invalid_intensity = df_dirty.sample(3)
-    df_dirty.loc[invalid_intensity.index, 'impact_intensity'] = np.random.uniform(2, 10, len(invalid_intensity))
+    invalid_intensity = plan.sample(3)
+    plan.set('impact_intensity', invalid_intensity, rng.uniform(2, 10, len(invalid_intensity)), 'invalid_intensity')
     
     # 4. Campos vazios
-    empty_fields = df_dirty.sample(2)
-    df_dirty.loc[empty_fields.index, 'event_description'] = ''
+    plan.set('event_description', plan.sample(2), '', 'empty_description')
+    
+    # Sem embaralhar: as duplicatas ficam no final
+    df_dirty = plan.build(df, shuffle=False)
+    if manifest:
+        save_manifest(manifest, *plan.manifest(EVENTS_FLAGS), EVENTS_FLAGS)
     
     print(f"  ✓ Adicionados eventos duplicados, datas inválidas e campos vazios")
     
     return df_dirty
 
+# Modo streaming: suja um CSV bloco a bloco
+
+# Como sujar cada tipo de base: corrupções antes/depois das duplicatas, quantidades e resumo
+XISTER_NOISE = {
+    'counts': xister_noise_counts,
+    'before_duplicates': XISTER_BEFORE_DUPLICATES,
+    'plan_before': plan_xister_before_duplicates,
+    'plan_after': plan_xister_after_duplicates,
+    'stats': xister_stats,
+    'bot_column': 'account_type',
+    'drop_columns': XISTER_KEY_COLUMNS,
+    'flags': XISTER_FLAGS,
+}
+CRYPTO_NOISE = {
+    'counts': crypto_noise_counts,
+    'before_duplicates': CRYPTO_BEFORE_DUPLICATES,
+    'plan_before': plan_crypto_before_duplicates,
+    'plan_after': plan_crypto_after_duplicates,
+    'stats': crypto_stats,
+    'bot_column': None,
+    'drop_columns': (),
+    'flags': CRYPTO_FLAGS,
+}
+
+# Colunas internas que acompanham cada linha até a gravação, para montar o manifesto no modo streaming
+MANIFEST_COLUMNS = ('_original_row', '_duplicate', '_corruptions')
+
+def stream_noise(input_path, output_path, name, noise, rng=None, chunk_size=None, tmp_dir=None, manifest=None):
+    """
+    Suja input_path em blocos de chunk_size linhas e grava output_path, sem carregar o arquivo inteiro
+    noise: XISTER_NOISE ou CRYPTO_NOISE; manifest: caminho do gabarito (ou None); retorna (linhas originais, linhas sujas)
+    """
+    chunk_size = chunk_size or NOISE_CHUNK_SIZE
+    rng = np.random.default_rng(rng)
+    read_options = {'encoding': 'utf-8-sig', 'float_precision': 'round_trip'}
+    print(f"\n🌊 Sujando {name} em blocos de {chunk_size:,} linhas...")
+    
+    # 1ª passada: só o tamanho do arquivo (as quantidades valem para o arquivo todo) e os bots de cada bloco
+    bot_column = noise['bot_column']
+    chunk_rows, chunk_bots = [], []
+    for chunk in profiling.read_csv_chunks(input_path, chunk_size, usecols=[bot_column or 0], **read_options):
+        chunk_rows.append(len(chunk))
+        chunk_bots.append(int((chunk.iloc[:, 0] == 'bot').sum()))
+    total_rows = sum(chunk_rows)
+    
+    counts = noise['counts'](total_rows)
+    budget = NoiseBudget(counts, rng)
+    reservoir = DuplicateReservoir(DUPLICATE_RESERVOIR, rng)
+    bucket_dir = os.path.join(tmp_dir or NOISE_TMP_DIR, os.path.splitext(os.path.basename(output_path))[0])
+    num_buckets = max(1, -(-(total_rows + counts['duplicates']) // chunk_size))
+    shuffler = BucketShuffler(bucket_dir, num_buckets, rng)
+    after_duplicates = [op for op in counts if op not in noise['before_duplicates']
+                        and op not in ('duplicates', 'modified_duplicates', 'bot_likes')]
+    
+    remaining_rows = total_rows
+    stats = {}
+    float_columns = set()
+    read_options['usecols'] = lambda column: column not in noise['drop_columns']
+    for index, chunk in enumerate(profiling.read_csv_chunks(input_path, chunk_size, **read_options)):
+        # Corrupções das linhas originais do bloco
+        plan = NoisePlan(len(chunk), rng)
+        noise['plan_before'](plan, {op: budget.take(op, len(chunk), remaining_rows) for op in noise['before_duplicates']})
+        chunk = plan.build(chunk, shuffle=False)
+        if manifest:
+            # A linha de origem e as corrupções de antes viajam com a linha (e com as cópias do reservatório)
+            chunk['_original_row'] = total_rows - remaining_rows + np.arange(len(chunk))
+            chunk['_corruptions'] = plan.corruption_mask(noise['flags'])
+        reservoir.add(chunk)
+        
+        # Duplicatas: cópias tiradas do reservatório (podem vir de blocos anteriores)
+        duplicates_left = budget.remaining['duplicates']
+        num_duplicates = budget.take('duplicates', len(chunk), remaining_rows)
+        if num_duplicates > len(reservoir):
+            budget.give_back('duplicates', num_duplicates - len(reservoir))
+            num_duplicates = len(reservoir)
+        num_modified = budget.take('modified_duplicates', num_duplicates, duplicates_left)
+        extended = pd.concat([chunk, reservoir.pop(num_duplicates)], ignore_index=True)
+        
+        # Corrupções sorteadas entre originais e duplicatas
+        remaining_virtual = remaining_rows + duplicates_left
+        after = {op: budget.take(op, len(extended), remaining_virtual) for op in after_duplicates}
+        if bot_column:
+            bots = int((extended[bot_column] == 'bot').sum())
+            after['bot_likes'] = budget.take('bot_likes', bots, bots + sum(chunk_bots[index + 1:]))
+        plan = NoisePlan(len(extended), rng)
+        noise['plan_after'](plan, after, extended, np.arange(len(extended) - num_modified, len(extended)))
+        dirty = plan.build(extended, shuffle=False)
+        if manifest:
+            dirty['_duplicate'] = np.arange(len(dirty)) >= len(chunk)
+            dirty['_corruptions'] |= plan.corruption_mask(noise['flags'])
+        
+        for label, count in noise['stats'](dirty).items():
+            stats[label] = stats.get(label, 0) + count
+        float_columns.update(column for column in dirty.columns if dirty[column].dtype.kind == 'f')
+        shuffler.add(dirty)
+        remaining_rows -= len(chunk)
+    
+    if budget.remaining['duplicates'] > 0:
+        print(f"  ⚠️  {budget.remaining['duplicates']:,} duplicatas a menos (reservatório pequeno: aumente DUPLICATE_RESERVOIR)")
+    
+    # Embaralhamento externo: um balde por vez, do tamanho de um bloco
+    dirty_rows = 0
+    if manifest:
+        num_dirty = total_rows + counts['duplicates'] - budget.remaining['duplicates']
+        writer = ManifestWriter(manifest, num_dirty, total_rows, noise['flags'], bucket_dir + '_manifest')
+    with open(output_path, 'w', encoding='utf-8-sig', newline='') as output:
+        for bucket in shuffler.buckets():
+            if manifest:
+                writer.add(*(bucket.pop(column).to_numpy() for column in MANIFEST_COLUMNS))
+            # Uma coluna inteira em um bloco e com NaN em outro: grava tudo como na versão em memória
+            bucket = bucket.astype({column: float for column in float_columns})
+            profiling.to_csv(bucket, output, header=(dirty_rows == 0), index=False)
+            dirty_rows += len(bucket)
+    shutil.rmtree(bucket_dir, ignore_errors=True)
+    if manifest:
+        writer.close()
+    
+    print_noise_summary(name, total_rows, dirty_rows, stats)
+    return total_rows, dirty_rows
+
 # Função Principal para criação e salvamento dos dados sujos
 # Esses dados foram os que dei upload para a base de dados do Datathon, só troquei o nome, obviamente, pra não deixar
 # tão óbvio que as bases estão sujas e com outliers e erros
 
-def main():
-    print("\nCarregando dados limpos...")
-    
-    try:
-        # Carrega dados limpos
-        xister = pd.read_csv('xister_posts.csv', encoding='utf-8-sig')
-        solana = pd.read_csv('solana_prices.csv', encoding='utf-8-sig')
-        ribercoin = pd.read_csv('ribercoin_prices.csv', encoding='utf-8-sig')
-        neuroncoin = pd.read_csv('neuroncoin_prices.csv', encoding='utf-8-sig')
-        bonfimcoin = pd.read_csv('bonfimcoin_prices.csv', encoding='utf-8-sig')
-        zephyrcoin = pd.read_csv('zephyrcoin_prices.csv', encoding='utf-8-sig')
-        lunartoken = pd.read_csv('lunartoken_prices.csv', encoding='utf-8-sig')
-        events = pd.read_csv('ribeirania_events.csv', encoding='utf-8-sig')
-        
-        print("✓ Dados limpos carregados")
+# Bases sujadas: job -> (CSV limpo, tipo). A ordem define a semente de cada base (SeedSequence.spawn)
+# e a ordem de envio aos processos: a maior (Xister) primeiro. O nome do job aparece nos resumos das moedas
+NOISE_JOBS = {
+    'xister': ('xister_posts.csv', 'xister'),
+    'Solana': ('solana_prices.csv', 'crypto'),
+    'RiberCoin': ('ribercoin_prices.csv', 'crypto'),
+    'NeuronCoin': ('neuroncoin_prices.csv', 'crypto'),
+    'BonfimCoin': ('bonfimcoin_prices.csv', 'crypto'),
+    'ZephyrCoin': ('zephyrcoin_prices.csv', 'crypto'),
+    'LunarToken': ('lunartoken_prices.csv', 'crypto'),
+    'events': ('ribeirania_events.csv', 'events'),
+}
+
+def dirty_path(path):
+    """xister_posts.csv -> xister_posts_dirty.csv"""
+    return path.replace('.csv', '_dirty.csv')
+
+def run_noise_job(name, seed):
+    """Carrega, suja e grava uma base (no processo atual ou em um worker); retorna (linhas limpas, linhas sujas)"""
+    path, kind = NOISE_JOBS[name]
+    rng = np.random.default_rng(seed)
+    manifest = manifest_path(dirty_path(path)) if NOISE_MANIFEST else None
+    
+    with profiling.stage(f'noise:{name}') as stage:
+        if NOISE_CHUNK_SIZE and kind != 'events':
+            # Streaming: os eventos são pequenos e continuam em memória
+            noise = XISTER_NOISE if kind == 'xister' else CRYPTO_NOISE
+            rows, dirty_rows = stream_noise(path, dirty_path(path), 'Xister' if kind == 'xister' else name, noise, rng,
+                                            manifest=manifest)
+        else:
+            df = profiling.read_csv(path, encoding='utf-8-sig')
+            if kind == 'xister':
+                df_dirty = add_noise_to_xister(df, rng, manifest)
+            elif kind == 'crypto':
+                df_dirty = add_noise_to_crypto(df, name, rng, manifest)
+            else:
+                df_dirty = add_noise_to_events(df, rng, manifest)
+            profiling.to_csv(df_dirty, dirty_path(path), index=False, encoding='utf-8-sig')
+            rows, dirty_rows = len(df), len(df_dirty)
+        stage['rows'] = rows
+    return rows, dirty_rows
+
+def run_captured_noise_job(name, seed):
+    """run_noise_job em um worker, devolvendo também o que ele imprimiu (para não misturar as saídas)"""
+    with contextlib.redirect_stdout(io.StringIO()) as output:
+        result = run_noise_job(name, seed)
+    return result, output.getvalue()
+
+def run_noise_jobs(seeds, max_workers):
+    """
+    Suja todas as bases de NOISE_JOBS (seeds: {job: SeedSequence}) e retorna {job: (linhas limpas, linhas sujas)}
+    Com max_workers > 1 cada base roda em um processo; a saída de cada uma é mostrada quando ela termina
+    """
+    if max_workers <= 1:
+        return {name: run_noise_job(name, seeds[name]) for name in NOISE_JOBS}
+    
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        running = {}
+        for name in NOISE_JOBS:
+            if profiling.ACTIVE is not None:
+                # O worker mede as próprias etapas e devolve as medições junto com o resultado
+                future = pool.submit(profiling.profiled_call, profiling.ACTIVE.pipeline,
+                                     profiling.ACTIVE.profile_slowest, run_captured_noise_job, name, seeds[name])
+            else:
+                future = pool.submit(run_captured_noise_job, name, seeds[name])
+            running[future] = name
         
-    except FileNotFoundError:
+        for future in as_completed(running):
+            result = future.result()
+            if profiling.ACTIVE is not None:
+                result, measurements = result
+                profiling.ACTIVE.merge(measurements)
+            result, output = result
+            print(output, end='')
+            results[running[future]] = result
+    return results
+
+def save_seeds(seed_sequence, seeds, path='add_noise_seeds.json'):
+    """Grava a semente global e a de cada base (spawn_key), para reproduzir uma execução"""
+    record = {
+        'random_seed': seed_sequence.entropy,
+        'datasets': {dirty_path(NOISE_JOBS[name][0]): {'spawn_key': list(seed.spawn_key)}
+                     for name, seed in seeds.items()},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(record, f, indent=2)
+
+def main():
+    if PROFILE_REPORT:
+        profiling.start('add_noise', PROFILE_SLOWEST_STAGE)
+    
+    if not all(os.path.exists(path) for path, _ in NOISE_JOBS.values()):
         print("❌ ERRO: Execute 'python main_generator.py' primeiro!")
+        profiling.finish()
         return
     
-    print("\n" + "=" * 70)
-    print(" ADICIONANDO RUÍDO")
-    print("=" * 70)
+    seed_sequence = np.random.SeedSequence(RANDOM_SEED)
+    print(f"\n🎲 Semente: {seed_sequence.entropy} (use RANDOM_SEED = {seed_sequence.entropy} para reproduzir)")
+    print(f"⚙ Processos: {MAX_WORKERS}")
     
-    # Adiciona ruído
-    xister_dirty = add_noise_to_xister(xister)
-    solana_dirty = add_noise_to_crypto(solana, 'Solana')
-    ribercoin_dirty = add_noise_to_crypto(ribercoin, 'RiberCoin')
-    neuroncoin_dirty = add_noise_to_crypto(neuroncoin, 'NeuronCoin')
-    bonfimcoin_dirty = add_noise_to_crypto(bonfimcoin, 'BonfimCoin')
-    zephyrcoin_dirty = add_noise_to_crypto(zephyrcoin, 'ZephyrCoin')
-    lunartoken_dirty = add_noise_to_crypto(lunartoken, 'LunarToken')
-    events_dirty = add_noise_to_events(events)
-    
-    # Salva versões sujas
     print("\n" + "=" * 70)
-    print(" SALVANDO DADOS SUJOS")
+    print(" ADICIONANDO RUÍDO" + (" (STREAMING)" if NOISE_CHUNK_SIZE else ""))
     print("=" * 70)
     
-    xister_dirty.to_csv('xister_posts_dirty.csv', index=False, encoding='utf-8-sig')
-    solana_dirty.to_csv('solana_prices_dirty.csv', index=False, encoding='utf-8-sig')
-    ribercoin_dirty.to_csv('ribercoin_prices_dirty.csv', index=False, encoding='utf-8-sig')
-    neuroncoin_dirty.to_csv('neuroncoin_prices_dirty.csv', index=False, encoding='utf-8-sig')
-    bonfimcoin_dirty.to_csv('bonfimcoin_prices_dirty.csv', index=False, encoding='utf-8-sig')
-    zephyrcoin_dirty.to_csv('zephyrcoin_prices_dirty.csv', index=False, encoding='utf-8-sig')
-    lunartoken_dirty.to_csv('lunartoken_prices_dirty.csv', index=False, encoding='utf-8-sig')
-    events_dirty.to_csv('ribeirania_events_dirty.csv', index=False, encoding='utf-8-sig')
+    seeds = dict(zip(NOISE_JOBS, seed_sequence.spawn(len(NOISE_JOBS))))
+    run_noise_jobs(seeds, MAX_WORKERS)
+    save_seeds(seed_sequence, seeds)
+    if NOISE_CHUNK_SIZE:
+        try:
+            os.rmdir(NOISE_TMP_DIR)
+        except OSError:
+            pass  # Não estava vazia
     
     print("\n✓ Dados sujos salvos (*_dirty.csv)")
-    
+    if NOISE_MANIFEST:
+        print("✓ Gabaritos do ruído salvos (*_dirty.manifest.npz)")
+    print("✓ Salvo: add_noise_seeds.json (sementes usadas)")
+    profiling.finish()
+    print_instructions()
+
+def print_instructions():
+    """Arquivos gerados e desafios para os participantes"""
     # Mantém originais como "gabarito"
     print("\n💡 Os arquivos originais foram mantidos como GABARITO")
     print("   Use os arquivos *_dirty.csv para o datathon!")
@@ -325,6 +637,8 @@ def main():
     print("\n📂 Arquivos LIMPOS (Gabarito - NÃO distribua!):")
     print("  - xister_posts.csv")
     print("  - *_prices.csv (originais)")
+    if NOISE_MANIFEST:
+        print("  - *_dirty.manifest.npz (linha de origem e corrupções de cada linha suja)")
     
     print("\n🎯 Problemas adicionados:")
     print("  ✓ Valores ausentes (NaN)")
@@ -0,0 +1,82 @@
+"""
+Campanhas de Bots - Datathon Ribeirania
+Planeja campanhas coordenadas de bots (pump groups) no Xister
+
+Os bots da população são divididos em anéis fixos. Cada campanha escolhe um evento da
+RiberCoin e um anel; horas antes do evento, os bots do anel postam quase o mesmo texto com
+poucos segundos de intervalo. Tudo é planejado em blocos de arrays (uma linha por post),
+sem loop por campanha, e cada post carrega o gabarito da campanha (campanha, anel, evento).
+"""
+
+import numpy as np
+
+# Antecedência máxima do início da campanha em relação ao evento (horas)
+LEAD_HOURS = 48
+
+# Intervalo médio entre posts seguidos de uma campanha (segundos)
+POST_SPACING_S = 4.0
+
+# Chance de cada bot do anel participar de uma campanha e posts extras por bot (média)
+PARTICIPATION = 0.8
+EXTRA_POSTS = 0.5
+
+# Parte dos posts de uma campanha que usa outro template do mesmo tom (textos quase idênticos)
+VARIANT_SHARE = 0.15
+
+
+def bot_rings(bot_ids, ring_size, rng):
+    """
+    Divide os bots em anéis de ~ring_size contas (embaralhados): (indptr, membros) em CSR
+    Os membros do anel r são membros[indptr[r]:indptr[r+1]]
+    """
+    members = rng.permutation(np.asarray(bot_ids))
+    num_rings = max(len(members) // ring_size, 1)
+    ring_of = np.arange(len(members)) * num_rings // max(len(members), 1)
+    indptr = np.concatenate(([0], np.cumsum(np.bincount(ring_of, minlength=num_rings))))
+    return indptr, members
+
+
+def segment_starts(segment_ids):
+    """Posição do início de cada linha dentro do seu segmento (segment_ids ordenado)"""
+    first = np.flatnonzero(np.concatenate(([True], segment_ids[1:] != segment_ids[:-1])))
+    return np.repeat(first, np.diff(np.append(first, len(segment_ids))))
+
+
+def plan_campaigns(num_campaigns, event_starts, ring_indptr, ring_members, rng, earliest_ns=None):
+    """
+    Planeja num_campaigns campanhas antes dos eventos (event_starts em ns)
+    Retorna (campanhas, posts): dicionários de arrays, um por campanha e um por post
+        campanhas: event (posição em event_starts), ring, start (ns)
+        posts: campaign, user_id, timestamp (ns), ordenados por campanha e horário
+    """
+    num_rings = len(ring_indptr) - 1
+    event = rng.integers(0, len(event_starts), num_campaigns)
+    ring = rng.integers(0, num_rings, num_campaigns)
+    lead = rng.uniform(0.05, 1.0, num_campaigns) * LEAD_HOURS * 3600 * 10**9
+    start = np.asarray(event_starts)[event] - lead.astype(np.int64)
+    if earliest_ns is not None:
+        start = np.maximum(start, earliest_ns)
+
+    # Um candidato por (campanha, bot do anel); cada bot participa com chance PARTICIPATION
+    sizes = np.diff(ring_indptr)[ring]
+    member_campaign = np.repeat(np.arange(num_campaigns), sizes)
+    member_offset = np.arange(len(member_campaign)) - segment_starts(member_campaign)
+    members = ring_members[ring_indptr[ring][member_campaign] + member_offset]
+    joined = rng.random(len(members)) < PARTICIPATION
+
+    # Posts de cada participante, em ordem aleatória dentro da campanha
+    posts_per_bot = 1 + rng.poisson(EXTRA_POSTS, joined.sum())
+    post_campaign = np.repeat(member_campaign[joined], posts_per_bot)
+    post_user = np.repeat(members[joined], posts_per_bot)
+    order = np.lexsort((rng.random(len(post_campaign)), post_campaign))
+    post_campaign, post_user = post_campaign[order], post_user[order]
+
+    # Rajada: intervalos exponenciais acumulados dentro de cada campanha
+    gaps = rng.exponential(POST_SPACING_S * 10**9, len(post_campaign))
+    elapsed = np.cumsum(gaps)
+    elapsed -= (elapsed - gaps)[segment_starts(post_campaign)]
+    timestamps = start[post_campaign] + elapsed.astype(np.int64)
+
+    campaigns = {'event': event, 'ring': ring, 'start': start}
+    posts = {'campaign': post_campaign, 'user_id': post_user, 'timestamp': timestamps}
+    return campaigns, posts
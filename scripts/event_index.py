@@ -0,0 +1,193 @@
+"""
+Índice de Eventos - Datathon Ribeirania
+Compila o ribeirania_events.csv uma única vez em arrays ordenados de intervalos
+
+Cada evento vira uma linha de um array estruturado (início/fim em ns, código do tipo,
+intensidade, sentiment, flags SIM/NÃO e nome), ordenado pelo início. O array é salvo em um
+arquivo .npy ao lado do CSV, com o hash do CSV no nome: enquanto o CSV não mudar, as
+próximas execuções só mapeiam o arquivo na memória (np.load com mmap_mode), sem reler
+nem reinterpretar as datas.
+
+Preços (CryptoGenerator) e sentiment (XisterGenerator) consultam o mesmo índice por
+"stabbing": quais intervalos contêm cada timestamp, com busca binária (searchsorted).
+"""
+
+import glob
+import hashlib
+import os
+from datetime import timedelta
+
+import numpy as np
+import pandas as pd
+
+# Muda sempre que o formato do array mudar (invalida os caches antigos)
+INDEX_VERSION = 2
+
+# Tipos de impacto conhecidos; o código é a posição na tupla (-1 = tipo desconhecido, sem impacto)
+IMPACT_TYPES = ('pump', 'crash', 'slight_pump', 'slight_crash')
+
+# Flags (bits) das colunas SIM/NÃO do CSV
+AFFECTS_RIBERCOIN = 1
+AFFECTS_SENTIMENT = 2
+
+EVENT_DTYPE = np.dtype([
+    ('start', 'i8'),        # Início do evento (ns desde 1970)
+    ('end', 'i8'),          # Fim do evento (início + duração), inclusivo
+    ('type_code', 'i1'),    # Posição em IMPACT_TYPES
+    ('intensity', 'f8'),
+    ('sentiment', 'f8'),
+    ('flags', 'u1'),
+    ('name', 'U64'),        # Nome do evento (ex: para citar nos posts)
+])
+
+
+def type_code(impact_type):
+    """Código numérico de um tipo de impacto (-1 se desconhecido)"""
+    return IMPACT_TYPES.index(impact_type) if impact_type in IMPACT_TYPES else -1
+
+
+def duration_ns(duration_hours):
+    """Duração em ns, arredondada para microssegundos como o timedelta"""
+    return timedelta(hours=float(duration_hours)) // timedelta(microseconds=1) * 1000
+
+
+def build_events(dates, impact_types, intensities, durations_hours, sentiments=None, flags=None, names=None):
+    """Monta o array estruturado (ordenado pelo início) a partir de colunas de eventos"""
+    dates = pd.to_datetime(pd.Series(dates), errors='coerce')
+    valid = dates.notna().to_numpy()
+    count = int(valid.sum())
+
+    events = np.zeros(count, dtype=EVENT_DTYPE)
+    if count == 0:
+        return events
+
+    events['start'] = dates[valid].to_numpy().astype('datetime64[ns]').astype(np.int64)
+    events['end'] = events['start'] + np.array(
+        [duration_ns(hours) for hours in np.asarray(durations_hours, dtype=float)[valid]], dtype=np.int64
+    )
+    events['type_code'] = [type_code(impact_type) for impact_type in np.asarray(impact_types, dtype=object)[valid]]
+    events['intensity'] = np.asarray(intensities, dtype=float)[valid]
+    events['sentiment'] = np.asarray(sentiments, dtype=float)[valid] if sentiments is not None else 0.0
+    events['flags'] = np.asarray(flags, dtype=np.uint8)[valid] if flags is not None else 0
+    events['name'] = np.asarray(names, dtype=object)[valid].astype(str) if names is not None else ''
+
+    return events[np.argsort(events['start'], kind='stable')]
+
+
+def compile_events(events_file):
+    """Lê o CSV de eventos e compila no array estruturado (eventos com data inválida são descartados)"""
+    df = pd.read_csv(events_file, encoding='utf-8-sig')
+    flags = ((df['affects_ribercoin'] == 'SIM') * AFFECTS_RIBERCOIN
+             + (df['affects_sentiment'] == 'SIM') * AFFECTS_SENTIMENT)
+    return build_events(df['date'], df['impact_type'], df['impact_intensity'], df['duration_hours'],
+                        df['sentiment'], flags, df['event_name'].fillna(''))
+
+
+def index_path(events_file):
+    """Caminho do cache do índice: <csv sem extensão>.<hash do CSV>.index.npy"""
+    digest = hashlib.sha256(f"v{INDEX_VERSION}".encode())
+    with open(events_file, 'rb') as f:
+        digest.update(f.read())
+    stem = os.path.splitext(events_file)[0]
+    return f"{stem}.{digest.hexdigest()[:16]}.index.npy"
+
+
+def load_event_index(events_file, use_cache=True):
+    """
+    Índice dos eventos do CSV; usa o cache .npy (mapeado na memória) se o CSV não mudou,
+    senão compila e salva um novo cache (removendo os caches antigos desse CSV)
+    """
+    if not use_cache:
+        return EventIndex(compile_events(events_file))
+
+    path = index_path(events_file)
+    if not os.path.exists(path):
+        events = compile_events(events_file)
+
+        # Escreve em arquivo temporário e renomeia: processos em paralelo nunca leem um cache pela metade
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, 'wb') as f:
+            np.save(f, events)
+        os.replace(temporary, path)
+
+        stem = os.path.splitext(events_file)[0]
+        for old in glob.glob(f"{glob.escape(stem)}.*.index.npy"):
+            if old != path:
+                try:
+                    os.remove(old)
+                except OSError:
+                    pass
+
+    return EventIndex(np.load(path, mmap_mode='r'))
+
+
+class EventIndex:
+    """Eventos ordenados pelo início, consultados por busca binária"""
+
+    def __init__(self, events):
+        self.events = events
+        self.starts = np.asarray(events['start'])
+        self.ends = np.asarray(events['end'])
+        # Maior duração: um evento ativo em ts começou no máximo max_duration antes de ts
+        self.max_duration = int((self.ends - self.starts).max()) if len(events) > 0 else 0
+        # Curva de sentiment (calculada na primeira consulta)
+        self._sentiment_curve = None
+
+    def __len__(self):
+        return len(self.events)
+
+    def merged(self, events):
+        """Novo índice com os eventos deste mais os de events (array estruturado)"""
+        combined = np.concatenate((np.asarray(self.events), events))
+        return EventIndex(combined[np.argsort(combined['start'], kind='stable')])
+
+    def select(self, flag):
+        """Sub-índice só com os eventos que têm a flag (ex: AFFECTS_SENTIMENT)"""
+        return EventIndex(np.asarray(self.events[(self.events['flags'] & flag) != 0]))
+
+    def active(self, ts_ns):
+        """Posições dos eventos ativos em um único timestamp (ns), em O(log n + k)"""
+        lo = np.searchsorted(self.starts, ts_ns - self.max_duration, side='left')
+        hi = np.searchsorted(self.starts, ts_ns, side='right')
+        candidates = np.arange(lo, hi)
+        return candidates[self.ends[candidates] >= ts_ns]
+
+    def active_pairs(self, ts_ns):
+        """
+        Todos os pares (evento, timestamp) com início <= ts <= fim, para timestamps ORDENADOS
+        Cada evento acha sua faixa de timestamps com duas buscas binárias; retorna (event_idx, ts_idx)
+        """
+        lo = np.searchsorted(ts_ns, self.starts, side='left')
+        hi = np.searchsorted(ts_ns, self.ends, side='right')
+        counts = np.maximum(hi - lo, 0)
+
+        # Expande os pares ativos sem loop em Python
+        event_idx = np.repeat(np.arange(len(self.starts)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+        ts_idx = np.repeat(lo, counts) + offsets
+        return event_idx, ts_idx
+
+    def sentiment_curve(self):
+        """
+        Sentiment médio dos eventos ativos como função degrau: (instantes em ns, valores)
+        O valor i vale de instantes[i] até o instante seguinte (antes do primeiro, 0)
+        Varre os limites ordenados dos intervalos: os eventos ativos só mudam no início de um
+        evento ou logo depois do fim (fim + 1 ns, já que o fim é inclusivo)
+        """
+        if self._sentiment_curve is None:
+            bounds = np.unique(np.concatenate((self.starts, self.ends + 1)))
+            event_idx, bound_idx = self.active_pairs(bounds)
+            sentiment_sum = np.bincount(bound_idx, weights=self.events['sentiment'][event_idx], minlength=len(bounds))
+            count = np.bincount(bound_idx, minlength=len(bounds))
+            values = np.divide(sentiment_sum, count, out=np.zeros(len(bounds)), where=count > 0)
+            self._sentiment_curve = (bounds, values)
+        return self._sentiment_curve
+
+    def sentiment(self, ts_ns):
+        """Sentiment médio dos eventos ativos em cada timestamp (0 quando não há evento), lido da curva"""
+        bounds, values = self.sentiment_curve()
+        if len(bounds) == 0:
+            # Sem eventos: a curva é vazia e vale 0 em todo o período
+            return np.zeros(np.shape(ts_ns))
+        segment = np.searchsorted(bounds, np.asarray(ts_ns, dtype=np.int64), side='right') - 1
+        return np.where(segment >= 0, values[np.maximum(segment, 0)], 0.0)
@@ -1,6 +1,6 @@
 """
 Gerador de Templates e Eventos - Datathon Ribeirania
-Cria os arquivos CSV editáveis para tweets e eventos
+Cria os arquivos CSV editáveis para tweets, eventos e moedas sintéticas
 
 Execute este script PRIMEIRO para criar os arquivos de configuração
 """
@@ -13,7 +13,10 @@ import numpy as np
 from datetime import datetime, timedelta
 
 def generate_tweet_templates():
-    """Gera 1000 templates de tweets em português para edição manual"""
+    """
+    Gera 2000 templates de tweets em português para edição manual
+    Os textos aceitam placeholders preenchidos em cada post: {coin}, {price}, {pct}, {user} e {event}
+    """
     
     categories = {
         'memes': 550,
@@ -47,7 +50,8 @@ def generate_tweet_templates():
         "Vida tá corrida mas tá boa! ✨",
         "Depois do caos da crise hídrica, bom ver a rotina voltando ao normal 💧",
         "Nem acredito que já é Natal de novo 🎄",
-        "Energia boa pós BanBan Açaí! Bora começar o dia bem 💥"
+        "Energia boa pós BanBan Açaí! Bora começar o dia bem 💥",
+        "Bom dia @{user}! Bora tomar aquele café? ☕"
     ],
 
     'eventos': [
@@ -65,7 +69,9 @@ def generate_tweet_templates():
         "Feira de tecnologia surpreendeu geral! 💡",
         "Carnaval de Ribeirania promete ser o melhor dos últimos anos 🎭",
         "Maratona da cidade inspirou muita gente 🏃‍♀️",
-        "Retrospectiva do ano: Ribeirania só cresce 💪"
+        "Retrospectiva do ano: Ribeirania só cresce 💪",
+        "Ainda falando de {event} por aqui 🎉",
+        "{event}: quem mais tava lá? @{user}"
     ],
 
     'ribeirania': [
@@ -83,7 +89,8 @@ def generate_tweet_templates():
         "Mais uma manhã ensolarada em Ribeirania ☀️",
         "Cultura, música e inovação — essa é Ribeirania!",
         "Ribeirania pós-RiberTech tá virando o novo polo tech 💻",
-        "Melhor cidade do interior, sem discussão 😎"
+        "Melhor cidade do interior, sem discussão 😎",
+        "@{user} bora ver o pôr do sol hoje? 🌅"
     ],
 
     'crypto': [
@@ -101,7 +108,11 @@ def generate_tweet_templates():
         "Mercado cripto reagindo bem às notícias locais 📊",
         "Comunidade RBC mais unida do que nunca 🚀",
         "RBC acima dos 0.9 novamente, bora comemorar! 🎉",
-        "A economia de Ribeirania e a blockchain caminham juntas 💎"
+        "A economia de Ribeirania e a blockchain caminham juntas 💎",
+        "{coin} a ${price} agora, {pct} nas últimas 24h 📊",
+        "Alguém viu {coin} em {pct} hoje? 👀",
+        "@{user} eu avisei que {coin} ia passar de ${price}! 😎",
+        "Depois de {event}, {coin} tá em ${price} 💸"
     ],
 
     'memes': [
@@ -119,7 +130,9 @@ def generate_tweet_templates():
         "Depois do festival de música, minha energia social acabou 🎶😵",
         "Vida de investidor em RBC: pump, crash, pump, crash... emoção todo dia 🎢",
         "Natal em Ribeirania e eu ainda esperando o bônus cair 🎁",
-        "Grinch 1 x 0 Espírito Natalino 💔"
+        "Grinch 1 x 0 Espírito Natalino 💔",
+        "@{user} vendendo {coin} a ${price} e se arrependendo 😭",
+        "Eu depois de {event}: 🫠"
     ]
 }
 
@@ -337,6 +350,76 @@ def generate_events_config():
     
     return df
 
+def generate_coins_registry():
+    """Gera o registro das moedas sintéticas (uma linha por moeda, lido pelo motor do main_generator)"""
+    
+    # Campos vazios usam o valor padrão do motor (COIN_DEFAULTS no main_generator.py)
+    # events: 'ribeirania' usa os eventos do ribeirania_events.csv que afetam a RiberCoin;
+    # ou uma lista própria no formato 'data|tipo|intensidade|horas; data|tipo|intensidade|horas'
+    coins = [
+        # ===== MEMECOIN PRINCIPAL =====
+        {
+            'coin_name': 'RiberCoin', 'symbol': 'RBC', 'start_price': 0.08, 'volatility': 0.00036,
+            'events': 'ribeirania', 'event_loading': 1.0, 'event_noise_boost': 2.0,
+            'reversion': 0.08, 'event_reversion_damping': 0.3,
+            'target_level': 0.75, 'cycle_amplitude': 0.5, 'cycle_days': 90, 'target_min': 0.05, 'target_max': 0.15,
+            'spike_prob': 0.01, 'spike_min': 0.03, 'spike_max': 0.08,
+            'step_min': 0.90, 'step_max': 1.10, 'price_min': 0.003, 'price_max': 0.80,
+            'base_volume': 600000, 'volume_min': 0.7, 'volume_max': 1.3,
+            'volume_event_boost': 5.0, 'volume_spike_boost': 3.0, 'supply': 500000000
+        },
+        
+        # ===== STABLECOIN (apenas 2 eventos pequenos) =====
+        {
+            'coin_name': 'NeuronCoin', 'symbol': 'NRC', 'start_price': 1.00, 'volatility': 0.003,
+            'events': '2022-06-01|slight_crash|0.08|720; 2023-12-01|slight_pump|0.10|1440', 'event_loading': 0.15,
+            'reversion': 0.1, 'price_min': 0.85, 'price_max': 1.15,
+            'base_volume': 800000, 'volume_min': 0.8, 'volume_max': 1.2, 'supply': 1000000000
+        },
+        
+        # ===== ESPELHO DA RIBERCOIN (correlação negativa) =====
+        {
+            'coin_name': 'BonfimCoin', 'symbol': 'BFC', 'start_price': 0.45, 'volatility': 0.006,
+            'events': 'ribeirania', 'event_loading': -0.95,
+            'reversion': 0.0444, 'event_reversion_damping': 0.3,
+            'target_level': 1.25, 'cycle_amplitude': -0.5, 'cycle_days': 90,
+            'step_min': 0.85, 'step_max': 1.15, 'price_min': 0.01, 'price_max': 2.00,
+            'base_volume': 500000, 'volume_min': 0.7, 'volume_max': 1.3,
+            'volume_event_boost': 7.6, 'supply': 300000000
+        },
+        
+        # ===== CORTINAS DE FUMAÇA =====
+        {
+            'coin_name': 'ZephyrCoin', 'symbol': 'ZPH', 'start_price': 95.50, 'volatility': 0.0281, 'drift': 0.00005,
+            'spike_prob': 0.003, 'spike_min': 0.0, 'spike_max': 0.04,
+            'step_min': 0.94, 'step_max': 1.06, 'price_min': 20.0, 'price_max': 300.0,
+            'base_volume': 2000000000, 'volume_min': 0.6, 'volume_max': 1.8, 'supply': 400000000
+        },
+        {
+            'coin_name': 'LunarToken', 'symbol': 'LNR', 'start_price': 0.42, 'volatility': 0.032,
+            'wave_amplitude': 0.02, 'wave_period_min': 800, 'wave_period_max': 1200,
+            'step_min': 0.90, 'step_max': 1.10, 'price_min': 0.05, 'price_max': 2.0,
+            'base_volume': 350000, 'volume_min': 0.7, 'volume_max': 1.3,
+            'volume_wave_amplitude': 0.3, 'volume_wave_period': 500, 'supply': 200000000
+        }
+    ]
+    
+    df = pd.DataFrame(coins)
+    df.to_csv('coins_registry.csv', index=False, encoding='utf-8-sig')
+    
+    print(f"\n✓ Criado: coins_registry.csv com {len(df)} moedas")
+    for coin in coins:
+        print(f"  - {coin['coin_name']} ({coin['symbol']}): preço inicial ${coin['start_price']}")
+    
+    print("\n  ⚙️ PARÂMETROS PRINCIPAIS:")
+    print("     - volatility: desvio do ruído por período (correlacionado via COIN_CORRELATIONS)")
+    print("     - events / event_loading: eventos que afetam a moeda e quanto (negativo = reage ao contrário)")
+    print("     - reversion / target_level / cycle_amplitude: mean reversion em direção ao alvo do ciclo")
+    print("     - step_min / step_max / price_min / price_max: limites por período e de preço")
+    print("     - Para adicionar uma moeda, basta adicionar uma linha (campos vazios = padrão)")
+    
+    return df
+
 def main():
     print("=" * 70)
     print(" GERADOR DE TEMPLATES E EVENTOS - DATATHON RIBEIRANIA")
@@ -356,17 +439,24 @@ def main():
     print("-" * 70)
     events_df = generate_events_config()
     
+    # Gera registro das moedas
+    print("\n" + "-" * 70)
+    print("ETAPA 3: Gerando registro das moedas sintéticas...")
+    print("-" * 70)
+    coins_df = generate_coins_registry()
+    
     print("\n" + "=" * 70)
     print(" ✅ TEMPLATES GERADOS COM SUCESSO!")
     print("=" * 70)
     print("\n📂 Arquivos criados:")
     print("  1. xister_tweets_template.csv (1000 tweets para editar)")
     print("  2. ribeirania_events.csv (eventos configuráveis)")
+    print("  3. coins_registry.csv (moedas sintéticas configuráveis)")
     
     print("\n💡 Próximos passos:")
     print("  1. Abra os CSVs em Excel/Google Sheets")
     print("  2. Edite os textos dos tweets como quiser")
-    print("  3. Adicione/edite eventos nas datas que quiser")
+    print("  3. Adicione/edite eventos nas datas que quiser (e moedas no registro)")
     print("  4. Salve os arquivos")
     print("  5. Execute: python main_generator.py")
     
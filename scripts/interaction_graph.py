@@ -0,0 +1,122 @@
+"""
+Grafo de Interações - Datathon Ribeirania
+Quem repostou ou respondeu cada post do Xister, em formato CSR
+
+Cada aresta liga um usuário (quem interage) a um post (e, pelo autor do post, a outro usuário).
+As arestas ficam agrupadas por post, como em uma matriz esparsa CSR posts x usuários:
+
+    indptr[p]:indptr[p+1]   faixa das arestas do post p (p = linha do xister_posts.csv)
+    user_id                 quem interagiu (int32)
+    kind                    0 = repost, 1 = resposta (uint8)
+
+Dentro de cada post vêm primeiro os reposts e depois as respostas. São 5 bytes por aresta
+(+ 8 por post), então dezenas de milhões de arestas cabem em poucas centenas de MB.
+Tudo é sorteado em bloco: o número de arestas de cada post, depois quem interage em cada uma.
+"""
+
+import numpy as np
+
+INTERACTION_KINDS = ('repost', 'reply')
+REPOST, REPLY = 0, 1
+
+# Quantas arestas sorteadas por vez (limita a memória temporária da busca binária)
+SOURCE_CHUNK = 8_000_000
+
+
+def sample_weighted(weights, size, rng, chunk_size=SOURCE_CHUNK):
+    """Sorteia size índices com probabilidade proporcional a weights (int32, em blocos)"""
+    cdf = np.cumsum(weights, dtype=float)
+    cdf /= cdf[-1]
+    result = np.empty(size, dtype=np.int32)
+    for start in range(0, size, chunk_size):
+        stop = min(start + chunk_size, size)
+        # side='right' nunca escolhe um índice de peso 0
+        result[start:stop] = np.searchsorted(cdf, rng.random(stop - start), side='right')
+    # Arredondamento no fim da cdf: garante índices válidos
+    np.minimum(result, len(cdf) - 1, out=result)
+    return result
+
+
+class InteractionGraph:
+    """Arestas usuário -> post agrupadas por post (CSR)"""
+
+    def __init__(self, indptr, user_id, kind, first_post=0):
+        self.indptr = indptr
+        self.user_id = user_id
+        self.kind = kind
+        # Linha do xister_posts.csv do 1° post do grafo (> 0 nas partes geradas em shards)
+        self.first_post = first_post
+
+    def __len__(self):
+        return len(self.user_id)
+
+    @property
+    def num_posts(self):
+        return len(self.indptr) - 1
+
+    def post_index(self):
+        """Linha do post de cada aresta (expande o indptr)"""
+        return np.repeat(np.arange(self.num_posts, dtype=np.int32), np.diff(self.indptr))
+
+    def counts(self, kind):
+        """Número de arestas do tipo kind em cada post"""
+        return np.bincount(self.post_index()[self.kind == kind], minlength=self.num_posts)
+
+    def user_adjacency(self, post_authors, num_users, kind=None):
+        """
+        Grafo usuário -> usuário (quem interage -> autor do post) em CSR, com o número de interações
+        Retorna (indptr, autores, pesos); a linha u lista os autores com quem u interagiu
+        """
+        edges = slice(None) if kind is None else self.kind == kind
+        # Chave do par = quem interage x num_users + autor, ordenada no lugar (um único array int64)
+        keys = self.user_id[edges].astype(np.int64)
+        keys *= num_users
+        keys += np.asarray(post_authors)[self.post_index()[edges]]
+        keys.sort()
+
+        starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+        weights = np.diff(np.append(starts, len(keys)))
+        pairs = keys[starts]
+        del keys
+        indptr = np.concatenate(([0], np.cumsum(np.bincount(pairs // num_users, minlength=num_users))))
+        return indptr, (pairs % num_users).astype(np.int32), weights
+
+    def save(self, path):
+        """Grava o grafo em .npz (arrays binários, sem compressão: leitura rápida com np.load)"""
+        np.savez(path, indptr=self.indptr, user_id=self.user_id, kind=self.kind,
+                 kinds=np.array(INTERACTION_KINDS), first_post=self.first_post)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            first_post = int(data['first_post']) if 'first_post' in data else 0
+            return cls(data['indptr'], data['user_id'], data['kind'], first_post)
+
+
+def build_interactions(post_authors, repost_counts, reply_counts, repost_weights, reply_weights, rng):
+    """
+    Monta o grafo a partir do número de reposts/respostas de cada post
+    Quem reposta/responde é sorteado entre todos os usuários pelo peso de cada um (repost_weights,
+    reply_weights); o próprio autor nunca interage com o próprio post
+    """
+    post_authors = np.asarray(post_authors)
+    num_users = len(repost_weights)
+    repost_counts = np.asarray(repost_counts, dtype=np.int64)
+    reply_counts = np.asarray(reply_counts, dtype=np.int64)
+
+    counts = repost_counts + reply_counts
+    indptr = np.concatenate(([0], np.cumsum(counts)))
+    # Reposts e respostas intercalados por post: [reposts do post 0, respostas do post 0, reposts do post 1, ...]
+    kind = np.repeat(np.tile(np.array([REPOST, REPLY], dtype=np.uint8), len(counts)),
+                     np.column_stack((repost_counts, reply_counts)).ravel())
+
+    user_id = np.empty(indptr[-1], dtype=np.int32)
+    user_id[kind == REPOST] = sample_weighted(repost_weights, int(repost_counts.sum()), rng)
+    user_id[kind == REPLY] = sample_weighted(reply_weights, int(reply_counts.sum()), rng)
+
+    # Autor sorteado para o próprio post: passa a aresta para o usuário seguinte
+    authors = np.repeat(post_authors.astype(np.int32), counts)
+    own = np.flatnonzero(user_id == authors)
+    user_id[own] = (user_id[own] + 1) % num_users
+
+    return InteractionGraph(indptr, user_id, kind)
@@ -1,9 +1,24 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import glob
+import os
+import shutil
+import tempfile
 import warnings
 warnings.filterwarnings('ignore')
 
+import profiling
+from price_kernels import FlooredCumprod, price_recurrence_paths
+from post_text import template_fields, price_strings, pct_strings, render_texts
+from interaction_graph import build_interactions
+from bot_campaigns import bot_rings, plan_campaigns, VARIANT_SHARE
+from post_arrivals import (bin_edges, calendar_intensity, event_intensity, volatility_intensity,
+                           sample_arrivals, arrival_counts, bin_arrivals)
+from event_index import (EventIndex, build_events, load_event_index, type_code,
+                         AFFECTS_RIBERCOIN, AFFECTS_SENTIMENT)
+
 # 1° parte do código
 # Feita para setar os 1°s parâmetros, deixado de modo personalizável para melhor adaptação da base
 
@@ -20,14 +35,112 @@ CRYPTO_PRICES = 100000
 
 ADDITIONAL_COINS = True  
 
+# Modo Monte Carlo: número de caminhos alternativos de RiberCoin/BonfimCoin gerados ao final
+# (0 desliga). Os caminhos são gerados em blocos de no máximo ENSEMBLE_BLOCK_VALUES valores
+# (caminhos x registros) por moeda e resumidos bloco a bloco: a memória não cresce com K x num_records
+ENSEMBLE_PATHS = 0
+ENSEMBLE_BLOCK_VALUES = 1_000_000
+
+# Semente global: cada job (e cada shard do Xister) recebe um gerador próprio derivado dela (SeedSequence.spawn),
+# então o resultado é idêntico rodando em série ou com qualquer número de processos
+# None sorteia uma semente nova a cada execução (e mostra qual foi, para reproduzir depois)
+RANDOM_SEED = None
+
+# Número de processos para os shards do Xister (XISTER_SHARD_POSTS; 1 roda tudo em série)
+# Os jobs de GENERATION_JOBS rodam sempre no processo principal
+MAX_WORKERS = os.cpu_count() or 1
+
+# Geração em blocos (streaming): com um valor (ex: 1_000_000), cada moeda é gerada e gravada no CSV
+# em blocos desse tamanho, sem montar a série inteira na memória. Mesma semente = mesmos dados
+# None gera tudo em memória (e mostra o resumo final com as correlações)
+STREAM_CHUNK_SIZE = None
+
+# Formato das datas nos CSVs (igual em memória e em streaming)
+CSV_DATE_FORMAT = '%Y-%m-%d %H:%M:%S.%f'
+
+# Moedas comentadas nos posts de crypto e o peso de cada uma: o sentiment do post acompanha a
+# variação mais recente da moeda sorteada (coluna coin). Ex: {'RBC': 0.7, 'SOL': 0.1, 'BFC': 0.1, 'NRC': 0.1}
+CRYPTO_POST_COINS = {'RBC': 1.0}
+
+# Tamanho da população de usuários do Xister (além das contas oficiais); cada usuário tem tipo de
+# conta, seguidores e atividade fixos, salvos em xister_users.csv
+XISTER_USERS = 1000
+
+# Layout do export dos posts: 'denormalized' grava o texto em cada post (xister_posts.csv completo);
+# 'normalized' grava os posts só com template_id/user_id + xister_templates.csv (e xister_users.csv)
+XISTER_EXPORT = 'denormalized'
+
+# Horário dos posts: 'poisson' sorteia as chegadas com volume variando com a hora do dia, o dia da
+# semana, os eventos ativos e a volatilidade das moedas; 'uniform' espaça os posts igualmente
+XISTER_ARRIVALS = 'poisson'
+
+# Quanto os eventos ativos (por unidade de intensidade) e a volatilidade das moedas aumentam o volume de posts
+ARRIVAL_EVENT_WEIGHT = 3.0
+ARRIVAL_VOLATILITY_WEIGHT = 1.0
+
+# Grafo de interações (quem repostou/respondeu cada post): True salva em xister_interactions.npz
+# Cada post recebe em média REPOST_EDGE_RATE x reposts arestas de repost e REPLY_EDGE_RATE x likes
+# de resposta: os contadores incluem gente de fora da população simulada. False (padrão) não gera o grafo
+XISTER_INTERACTIONS = False
+REPOST_EDGE_RATE = 0.02
+REPLY_EDGE_RATE = 0.001
+
+# Campanhas coordenadas de bots (pump groups): anéis de bots postando quase o mesmo texto de crypto
+# com segundos de intervalo, horas antes dos eventos da RiberCoin. Os posts entram no xister_posts.csv
+# (além dos XISTER_POSTS) e o gabarito vai para xister_campaigns.csv. 0 (padrão) desliga; ex: 300
+BOT_CAMPAIGNS = 0
+BOT_RING_SIZE = 12
+
+# Posts do Xister em shards de tempo (para bilhões de posts): com um valor (ex: 5_000_000), o período é
+# dividido em fatias com ~esse número de posts, geradas em paralelo (MAX_WORKERS processos), cada uma
+# gravada no seu arquivo em XISTER_SHARD_DIR. Mesma semente = mesmos arquivos com qualquer número de
+# processos. XISTER_SHARD_CONCAT junta as partes em xister_posts.csv. None gera tudo em um processo
+XISTER_SHARD_POSTS = None
+XISTER_SHARD_DIR = 'xister_shards'
+XISTER_SHARD_CONCAT = True
+
+# Profiling: grava main_generator_profile.json com tempo, tempo de CSV, linhas/s e pico de memória
+# de cada etapa. PROFILE_SLOWEST_STAGE salva também o cProfile da etapa mais lenta (main_generator_slowest.prof)
+PROFILE_REPORT = True
+PROFILE_SLOWEST_STAGE = False
+
 # Código feito para rodar no terminal linux, já que é meu sistema principal
 
-print("=" * 70)
-print(" GERADOR PRINCIPAL - DATATHON RIBEIRANIA")
-print("=" * 70)
-print(f"\nPeríodo: {START_DATE.date()} até {END_DATE.date()}")
-print(f"Total de dias: {TOTAL_DAYS}")
-print(f"Registros por database: ~{XISTER_POSTS:,}\n")
+
+def to_ns(values):
+    # Converte datas/timestamps para int64 em nanossegundos (facilita buscas vetorizadas)
+    return pd.DatetimeIndex(values).values.astype('datetime64[ns]').astype(np.int64)
+
+
+def post_ids(num_posts, first=0):
+    """post_id das posições first, first+1, ... (numeração global): POST_000001, POST_000002, ..."""
+    return np.char.add('POST_', np.char.zfill(np.arange(first + 1, first + num_posts + 1).astype(str), 6))
+
+
+def asof_values(post_times, post_coins, coin_prices, column='price_change_pct'):
+    """
+    As-of join: valor de column no registro mais recente (timestamp <= post) da moeda de cada post
+    coin_prices é {símbolo: DataFrame com timestamp e column}; uma busca binária por moeda
+    sobre os preços ordenados resolve todos os posts de uma vez. NaN quando não há preço anterior
+    """
+    post_ns = to_ns(post_times)
+    result = np.full(len(post_ns), np.nan)
+    
+    for symbol, prices in coin_prices.items():
+        posts = np.flatnonzero(post_coins == symbol)
+        if len(posts) == 0:
+            continue
+        price_ns = to_ns(prices['timestamp'])
+        values = prices[column].to_numpy(dtype=float)
+        if np.any(price_ns[1:] < price_ns[:-1]):
+            order = np.argsort(price_ns, kind='stable')
+            price_ns, values = price_ns[order], values[order]
+        
+        price_idx = np.searchsorted(price_ns, post_ns[posts], side='right') - 1
+        found = price_idx >= 0
+        result[posts[found]] = values[price_idx[found]]
+    
+    return result
 
 
 # Gerador dos preços das criptomoedas
@@ -35,122 +148,73 @@ print(f"Registros por database: ~{XISTER_POSTS:,}\n")
 
 class CryptoGenerator:
     #Gera séries temporais de preços de criptomoedas com eventos
-    def __init__(self, coin_name, symbol, start_price, volatility, trend='stable'):
+    def __init__(self, coin_name, symbol, event_index=None):
         self.coin_name = coin_name
         self.symbol = symbol
-        self.current_price = start_price
-        self.volatility = volatility
-        self.trend = trend
-        self.events = []
+        # Índice de eventos (ex: o compilado do ribeirania_events.csv); add_event acrescenta a ele
+        self.event_index = event_index if event_index is not None else EventIndex(build_events([], [], [], []))
         
     def add_event(self, date, impact_type, intensity, duration_hours):
         #Adiciona evento que afeta o preço
-        self.events.append({
-            'date': pd.to_datetime(date),
-            'impact_type': impact_type,
-            'intensity': intensity,
-            'duration_hours': duration_hours
-        })
+        self.event_index = self.event_index.merged(build_events([date], [impact_type], [intensity], [duration_hours]))
     
     def get_event_impact(self, current_date):
         #Calcula impacto de eventos ativos na data atual
-        total_impact = 0
-        
-        for event in self.events:
-            event_date = event['date']
-            duration = timedelta(hours=event['duration_hours'])
-            
-            if event_date <= current_date <= event_date + duration:
-                # Calcula progresso dentro do evento (0 a 1)
-                progress = (current_date - event_date) / duration
-                
-                if event['impact_type'] == 'pump':
-                    # PUMP: Sobe rápido nos primeiros 25%, mantém até 50%, depois desce
-                    if progress < 0.25:
-                        impact = event['intensity'] * 2.0 * (progress / 0.25)
-                    elif progress < 0.5:
-                        impact = event['intensity'] * 2.0
-                    else:
-                        impact = event['intensity'] * 2.0 * (1 - (progress - 0.5) / 0.5)
-                    total_impact += impact
-                    
-                elif event['impact_type'] == 'crash':
-                    # CRASH: Cai rápido nos primeiros 20%, recupera gradualmente
-                    if progress < 0.2:
-                        impact = -event['intensity'] * 1.5 * (progress / 0.2)
-                    else:
-                        impact = -event['intensity'] * 1.5 * (1 - (progress - 0.2) / 0.8 * 0.6)
-                    total_impact += impact
-                    
-                elif event['impact_type'] == 'slight_pump':
-                    # PUMP LEVE: Subida moderada
-                    impact = event['intensity'] * 1.0 * (1 - progress * 0.7)
-                    total_impact += impact
-                    
-                elif event['impact_type'] == 'slight_crash':
-                    # CRASH LEVE: Queda moderada
-                    impact = -event['intensity'] * 1.0 * (1 - progress * 0.7)
-                    total_impact += impact
-        
+        return self.get_event_impact_batch([current_date])[0]
+
+    def get_event_impact_batch(self, timestamps):
+        """Calcula o impacto (já limitado) dos eventos para todos os timestamps de uma vez"""
+        ts_ns = to_ns(timestamps)
+        total_impact = np.zeros(len(ts_ns))
+        index = self.event_index
+
+        if len(index) == 0 or len(ts_ns) == 0:
+            return np.clip(total_impact, -0.8, 1.2)
+
+        # Ordena os timestamps se necessário (date_range já vem ordenado)
+        order = None
+        if np.any(ts_ns[1:] < ts_ns[:-1]):
+            order = np.argsort(ts_ns, kind='stable')
+            ts_ns = ts_ns[order]
+
+        # Pares (evento, timestamp) ativos, por busca binária no índice
+        event_idx, ts_idx = index.active_pairs(ts_ns)
+        starts, ends = index.starts, index.ends
+
+        # Calcula progresso dentro do evento (0 a 1)
+        duration = (ends - starts)[event_idx].astype(float)
+        elapsed = (ts_ns[ts_idx] - starts[event_idx]).astype(float)
+        progress = np.divide(elapsed, duration, out=np.zeros_like(elapsed), where=duration > 0)
+
+        intensity = index.events['intensity'][event_idx]
+        impact_type = index.events['type_code'][event_idx]
+        impact = np.zeros(len(progress))
+
+        # PUMP: Sobe rápido nos primeiros 25%, mantém até 50%, depois desce
+        pump_shape = np.where(
+            progress < 0.25, progress / 0.25,
+            np.where(progress < 0.5, 1.0, 1 - (progress - 0.5) / 0.5)
+        )
+        impact = np.where(impact_type == type_code('pump'), intensity * 2.0 * pump_shape, impact)
+
+        # CRASH: Cai rápido nos primeiros 20%, recupera gradualmente
+        crash_shape = np.where(progress < 0.2, progress / 0.2, 1 - (progress - 0.2) / 0.8 * 0.6)
+        impact = np.where(impact_type == type_code('crash'), -intensity * 1.5 * crash_shape, impact)
+
+        # PUMP/CRASH LEVE: Subida ou queda moderada
+        slight_shape = 1 - progress * 0.7
+        impact = np.where(impact_type == type_code('slight_pump'), intensity * 1.0 * slight_shape, impact)
+        impact = np.where(impact_type == type_code('slight_crash'), -intensity * 1.0 * slight_shape, impact)
+
+        total_impact = np.bincount(ts_idx, weights=impact, minlength=len(ts_ns))
+
+        if order is not None:
+            unsorted = np.empty_like(total_impact)
+            unsorted[order] = total_impact
+            total_impact = unsorted
+
         # Limita o impacto total de forma realista
         return np.clip(total_impact, -0.8, 1.2)
-    
-    def generate_prices(self, num_records):
-        """Gera série temporal de preços"""
-        timestamps = pd.date_range(start=START_DATE, end=END_DATE, periods=num_records)
-        prices = []
-        volumes = []
-        market_caps = []
-        
-        for ts in timestamps:
-            # 1. Impacto de eventos
-            event_impact = self.get_event_impact(ts)
-            
-            # 2. Tendência de longo prazo
-            if self.trend == 'bullish':
-                trend_factor = 1.0001  # +0.01% por período
-            elif self.trend == 'bearish':
-                trend_factor = 0.9999  # -0.01% por período
-            else:
-                trend_factor = 1.0  # Estável
-            
-            # 3. Volatilidade normal (ruído aleatório)
-            random_change = np.random.normal(0, self.volatility)
-            
-            # 4. Calcula novo preço
-            change = (1 + random_change + event_impact) * trend_factor
-            self.current_price *= change
-            
-            # Evita preços negativos ou muito baixos
-            self.current_price = max(self.current_price, 0.0001)
-            
-            prices.append(self.current_price)
-            
-            # 5. Volume (aumenta com volatilidade e eventos)
-            base_volume = 1000000 * (1 + abs(event_impact) * 5)
-            volume = base_volume * np.random.uniform(0.5, 2.0)
-            volumes.append(volume)
-            
-            # 6. Market cap (preço * supply fixo)
-            supply = 1000000000  # 1 bilhão de moedas
-            market_cap = self.current_price * supply
-            market_caps.append(market_cap)
-        
-        # Cria DataFrame
-        df = pd.DataFrame({
-            'timestamp': timestamps,
-            'coin_name': self.coin_name,
-            'symbol': self.symbol,
-            'price_usd': prices,
-            'volume_24h': volumes,
-            'market_cap': market_caps
-        })
-        
-        # Calcula variação percentual
-        df['price_change_pct'] = df['price_usd'].pct_change() * 100
-        df['price_change_pct'].fillna(0, inplace=True)
-        
-        return df
 
 
 # Gerador dos posts do Xister
@@ -161,149 +225,377 @@ class CryptoGenerator:
 class XisterGenerator:
     #Gera posts da rede social Xister em português
     
-    def __init__(self, templates_file, events_file):
+    def __init__(self, templates_file, events_file, rng=None, num_users=XISTER_USERS):
+        # Gerador aleatório próprio (semente reprodutível por job)
+        self.rng = np.random.default_rng(rng)
         self.templates = pd.read_csv(templates_file, encoding='utf-8-sig')
-        self.events = pd.read_csv(events_file, encoding='utf-8-sig')
-        self.events['date'] = pd.to_datetime(self.events['date'], errors='coerce')
+        # Textos distintos dos templates (dicionário): os posts guardam só o código do texto
+        self.template_text_codes, texts = pd.factorize(self.templates['text'])
+        self.text_dtype = pd.CategoricalDtype(texts)
+        # Placeholders ({coin}, {price}, {pct}, {user}, {event}) usados por cada texto distinto
+        self.text_fields = template_fields(texts)
+        self.has_placeholders = any('{' in text or '}' in text for text in texts)
+        # Índice dos eventos (compilado uma vez e cacheado ao lado do CSV); o sentiment usa só os marcados
+        self.all_events = load_event_index(events_file)
+        self.event_index = self.all_events.select(AFFECTS_SENTIMENT)
         
-        # Remove eventos com datas inválidas
-        self.events = self.events[self.events['date'].notna()]
-        
-        # Usernames brasileiros
-        self.usernames = self._generate_usernames()
         self.account_types = ['regular', 'influencer', 'company', 'bot']
-        
-    def _generate_usernames(self):
-        """Gera usernames realistas brasileiros"""
-        names = ['joao', 'maria', 'pedro', 'ana', 'lucas', 'julia', 'carlos', 
-                 'beatriz', 'rafael', 'fernanda', 'bruno', 'camila', 'thiago',
-                 'larissa', 'gustavo', 'amanda', 'felipe', 'jessica', 'rodrigo',
-                 'patricia', 'diego', 'renata', 'vitor', 'mariana', 'daniel',
-                 'isabela', 'matheus', 'leticia', 'gabriel', 'carolina']
-        
-        suffixes = ['', '_oficial', '_rp', '_real', 'crypto', 'invest', 
-                   '2024', 'BR', '_ribeirania', '_trader', 'tech', '_news',
-                   '_br', '123', '456', '_oficial']
-        
-        usernames = []
-        for _ in range(1000):
-            name = np.random.choice(names)
-            suffix = np.random.choice(suffixes)
-            number = np.random.randint(0, 999) if np.random.random() > 0.6 else ''
-            username = f"{name}{suffix}{number}"
-            usernames.append(username)
-        
-        # Adiciona contas especiais/verificadas
-        special_accounts = [
-            'prefeitura_ribeirania', 'riberanianews', 'ribercoin_oficial',
-            'cryptoribeirania', 'investidor_rp', 'tech_ribeirania',
-            'riberaniaoficial', 'prefeito_ribeirania', 'camara_ribeirania',
-            'jornal_ribeirania', 'radio_ribeirania', 'tv_ribeirania'
-        ]
-        usernames.extend(special_accounts)
-        
-        return usernames
+        # Probabilidade de cada tipo de conta (70% regular, 15% influencer, 10% company, 5% bot),
+        # faixas [mín, máx) dos likes/reposts base e mediana de seguidores, na mesma ordem de account_types
+        self.account_probs = [0.70, 0.15, 0.10, 0.05]
+        self.likes_ranges = np.array([[0, 500], [500, 20000], [1000, 50000], [0, 100]])
+        self.reposts_ranges = np.array([[0, 50], [50, 2000], [100, 5000], [0, 10]])
+        self.followers_median = np.array([150, 20000, 50000, 30])
+        # Quanto cada tipo de conta reposta e responde (multiplica a atividade do usuário)
+        self.repost_weights = np.array([1.0, 2.0, 0.5, 8.0])
+        self.reply_weights = np.array([1.0, 3.0, 0.3, 2.0])
+        
+        # População de usuários brasileiros (user_id = posição na tabela)
+        self.users = self._generate_users(num_users)
+        # Tipo categórico dos usernames nos posts (códigos = user_id), validado uma vez só
+        self.username_dtype = pd.CategoricalDtype(self.users['username'])
+        
+    def _generate_users(self, num_users):
+        """
+        Gera a tabela de usuários (vetorizado, aguenta milhões de usuários): user_id int32,
+        username único, account_type categórico, seguidores e peso de atividade (chance de postar)
+        """
+        names = np.array(['joao', 'maria', 'pedro', 'ana', 'lucas', 'julia', 'carlos', 
+                          'beatriz', 'rafael', 'fernanda', 'bruno', 'camila', 'thiago',
+                          'larissa', 'gustavo', 'amanda', 'felipe', 'jessica', 'rodrigo',
+                          'patricia', 'diego', 'renata', 'vitor', 'mariana', 'daniel',
+                          'isabela', 'matheus', 'leticia', 'gabriel', 'carolina'])
+        
+        suffixes = np.array(['', '_oficial', '_rp', '_real', 'crypto', 'invest', 
+                             '2024', 'BR', '_ribeirania', '_trader', 'tech', '_news',
+                             '_br', '123', '456', '_oficial'])
+        
+        rng = self.rng
+        name_idx = rng.integers(0, len(names), num_users)
+        suffix_idx = rng.integers(0, len(suffixes), num_users)
+        numbers = rng.integers(0, 999, num_users)
+        numbers = np.where(rng.random(num_users) > 0.6, numbers, -1)  # -1 = sem número
+        
+        # Monta o texto só das combinações distintas (no máximo nomes x sufixos x 1000) e espalha para os usuários
+        combos, first_user, inverse = np.unique((name_idx * len(suffixes) + suffix_idx) * 1000 + numbers + 1,
+                                                return_index=True, return_inverse=True)
+        combo_numbers = combos % 1000 - 1
+        combo_names = np.char.add(names[combos // 1000 // len(suffixes)], suffixes[combos // 1000 % len(suffixes)])
+        combo_text = np.char.add(combo_names, np.where(combo_numbers >= 0, combo_numbers.astype(str), ''))
+        account_codes = rng.choice(len(self.account_types), size=num_users, p=self.account_probs)
+        
+        # Adiciona contas especiais/verificadas (órgãos e veículos = company, pessoas = influencer)
+        special_accounts = {
+            'prefeitura_ribeirania': 'company', 'riberanianews': 'company', 'ribercoin_oficial': 'company',
+            'cryptoribeirania': 'influencer', 'investidor_rp': 'influencer', 'tech_ribeirania': 'company',
+            'riberaniaoficial': 'company', 'prefeito_ribeirania': 'influencer', 'camara_ribeirania': 'company',
+            'jornal_ribeirania': 'company', 'radio_ribeirania': 'company', 'tv_ribeirania': 'company'
+        }
+        account_codes = np.concatenate((account_codes, [self.account_types.index(account_type)
+                                                        for account_type in special_accounts.values()]))
+        
+        # Cada usuário aponta para um texto distinto (combinações diferentes podem dar o mesmo texto, ex: joao + 123)
+        texts, text_inverse = np.unique(np.concatenate((combo_text, list(special_accounts))), return_inverse=True)
+        text_ids = np.concatenate((text_inverse[inverse.ravel()], text_inverse[len(combo_text):]))
+        total = len(text_ids)
+        user_ids = np.arange(total, dtype=np.int32)
+        
+        # Dono de cada texto = o primeiro usuário que o usa (calculado nas combinações, não nos usuários)
+        first_user = np.concatenate((first_user, np.arange(num_users, total)))
+        owner = np.full(len(texts), total)
+        np.minimum.at(owner, text_inverse, first_user)
+        
+        # Usernames repetidos ganham o user_id no final (o username identifica o usuário nos posts)
+        usernames = texts.astype(object)[text_ids]
+        repeated = np.flatnonzero(owner[text_ids] != user_ids)
+        usernames[repeated] = np.char.add(texts[text_ids[repeated]], np.char.add('_', repeated.astype(str)))
+        
+        # Seguidores: log-normal em torno da mediana do tipo; atividade: cauda longa (poucos postam muito)
+        followers = (self.followers_median[account_codes] * rng.lognormal(0.0, 1.0, total)).astype(np.int64)
+        activity = rng.lognormal(0.0, 1.0, total)
+        
+        return pd.DataFrame({
+            'user_id': user_ids,
+            'username': usernames,
+            'account_type': pd.Categorical.from_codes(account_codes, categories=self.account_types),
+            'followers': followers,
+            'activity_weight': activity / activity.sum()
+        })
     
     def get_event_sentiment(self, date):
         """Retorna sentiment baseado em eventos próximos"""
-        base_sentiment = 0
-        count = 0
-        
-        for _, event in self.events.iterrows():
-            if pd.isna(event['date']):
-                continue
-                
-            event_date = event['date']
-            duration = timedelta(hours=event['duration_hours'])
-            
-            # Verifica se a data está dentro do período do evento
-            if event_date <= date <= event_date + duration:
-                if event['affects_sentiment'] == 'SIM':
-                    base_sentiment += event['sentiment']
-                    count += 1
-        
-        return base_sentiment / count if count > 0 else 0
-    
-    def generate_posts(self, num_posts, ribercoin_prices=None):
-        """Gera posts do Xister com correlação aos preços"""
-        timestamps = pd.date_range(start=START_DATE, end=END_DATE, periods=num_posts)
-        posts = []
-        
+        return self.get_event_sentiment_batch([date])[0]
+    
+    def get_event_sentiment_batch(self, timestamps):
+        """Sentiment médio dos eventos ativos em cada timestamp, lido da curva de sentiment"""
+        return self.event_index.sentiment(to_ns(timestamps))
+    
+    def event_sentiment_curve(self):
+        """
+        Curva do sentiment de eventos (Series degrau indexada por data), para plotar e validar:
+        cada valor vale até a próxima data, ex: curve.plot(drawstyle='steps-post')
+        """
+        times, values = self.event_index.sentiment_curve()
+        return pd.Series(values, index=pd.to_datetime(times), name='event_sentiment')
+    
+    def arrival_intensity(self, coin_prices=None, coin_weights=None):
+        """
+        Intensidade relativa de posts por faixa de 1 hora: (limites das faixas em ns, intensidade)
+        Hora do dia x dia da semana x eventos ativos (todos os eventos) x volatilidade das moedas
+        """
+        start_ns, end_ns = to_ns([START_DATE, END_DATE])
+        edges = bin_edges(start_ns, end_ns)
+        price_series = [
+            (to_ns(prices['timestamp']), prices['price_change_pct'].to_numpy(dtype=float),
+             (coin_weights or {}).get(symbol, 1.0))
+            for symbol, prices in (coin_prices or {}).items()
+        ]
+        intensity = (calendar_intensity(edges)
+                     * event_intensity(self.all_events, edges, ARRIVAL_EVENT_WEIGHT)
+                     * volatility_intensity(price_series, edges, ARRIVAL_VOLATILITY_WEIGHT))
+        return edges, intensity
+    
+    def arrival_curve(self, coin_prices=None, coin_weights=None):
+        """Intensidade de posts por hora (Series indexada pelo início da faixa, média 1), para plotar e validar"""
+        edges, intensity = self.arrival_intensity(coin_prices, coin_weights)
+        return pd.Series(intensity / intensity.mean(), index=pd.to_datetime(edges[:-1]), name='arrival_intensity')
+    
+    def post_timestamps(self, num_posts, coin_prices=None, coin_weights=None, arrivals='poisson'):
+        """Horários ordenados dos posts: chegadas de Poisson pela intensidade ou espaçamento igual ('uniform')"""
+        if arrivals == 'uniform':
+            return pd.date_range(start=START_DATE, end=END_DATE, periods=num_posts)
+        if arrivals != 'poisson':
+            raise ValueError(f"Modelo de chegada desconhecido: {arrivals}")
+        edges, intensity = self.arrival_intensity(coin_prices, coin_weights)
+        return pd.DatetimeIndex(sample_arrivals(num_posts, edges, intensity, self.rng).astype('datetime64[ns]'))
+    
+    def generate_posts(self, num_posts, coin_prices=None, coin_weights=None, arrivals='poisson'):
+        """
+        Gera posts do Xister com correlação aos preços
+        Tudo é sorteado em arrays de uma vez (template, conta, usuário, likes/reposts base) e o
+        DataFrame é montado direto das colunas, sem loop por post
+        
+        coin_prices: {símbolo: DataFrame de preços}; cada post de crypto sorteia uma dessas moedas
+        (com os pesos de coin_weights, padrão iguais) e reage à variação mais recente dela
+        arrivals: 'poisson' (volume varia com horário, eventos e volatilidade) ou 'uniform'
+        """
         print(f"\nGerando {num_posts:,} posts do Xister...")
-        
-        for i, ts in enumerate(timestamps):
-            # Progress report
-            if i % 10000 == 0 and i > 0:
-                print(f"  Progresso: {i:,}/{num_posts:,} posts ({i/num_posts*100:.1f}%)")
-            
-            # Seleciona template aleatório
-            template = self.templates.sample(1).iloc[0]
-            text = template['text']
-            
-            # Define account type (70% regular, 15% influencer, 10% company, 5% bot)
-            account_type = np.random.choice(
-                self.account_types,
-                p=[0.70, 0.15, 0.10, 0.05]
-            )
-            
-            # Username
-            username = np.random.choice(self.usernames)
-            
-            # Sentiment base do template
-            base_sentiment = template['sentiment_base']
-            
-            # Adiciona sentiment de eventos
-            event_sentiment = self.get_event_sentiment(ts)
-            
-            # Se há preços de RiberCoin e é post sobre crypto, correlaciona
-            sentiment_adjustment = 0
-            if ribercoin_prices is not None and template['category'] == 'crypto':
-                # Encontra preço mais próximo
-                price_mask = ribercoin_prices['timestamp'] <= ts
-                if price_mask.any():
-                    closest_price = ribercoin_prices[price_mask].iloc[-1]
-                    price_change = closest_price['price_change_pct']
-                    # Ajusta sentiment baseado na variação de preço
-                    sentiment_adjustment = np.clip(price_change / 100, -0.3, 0.3)
-            
-            # Sentiment final
-            final_sentiment = base_sentiment + event_sentiment * 0.3 + sentiment_adjustment
-            final_sentiment = np.clip(final_sentiment, -1, 1)
-            
-            # Likes e reposts baseados em sentiment e account type
-            sentiment_multiplier = (final_sentiment + 1) / 2  # Normaliza para 0-1
-            
-            if account_type == 'company':
-                base_likes = np.random.randint(1000, 50000)
-                base_reposts = np.random.randint(100, 5000)
-            elif account_type == 'influencer':
-                base_likes = np.random.randint(500, 20000)
-                base_reposts = np.random.randint(50, 2000)
-            elif account_type == 'bot':
-                base_likes = np.random.randint(0, 100)
-                base_reposts = np.random.randint(0, 10)
-            else:  # regular
-                base_likes = np.random.randint(0, 500)
-                base_reposts = np.random.randint(0, 50)
-            
-            # Aplica multiplicador de sentiment
-            likes = int(base_likes * (0.5 + sentiment_multiplier))
-            reposts = int(base_reposts * (0.5 + sentiment_multiplier))
-            
-            posts.append({
-                'post_id': f"POST_{i+1:06d}",
-                'username': username,
-                'text': text,
-                'timestamp': ts,
-                'likes': likes,
-                'reposts': reposts,
-                'account_type': account_type,
-                'sentiment': round(final_sentiment, 3)
-            })
-        
-        df = pd.DataFrame(posts)
+        timestamps = self.post_timestamps(num_posts, coin_prices, coin_weights, arrivals)
+        df = self.posts_at(timestamps, coin_prices, coin_weights)
         print(f"✓ {num_posts:,} posts gerados com sucesso!")
         return df
+    
+    def posts_at(self, timestamps, coin_prices=None, coin_weights=None):
+        """Posts nos horários dados (ordenados): sorteia template, autor e moeda de cada um e monta o DataFrame"""
+        rng = self.rng
+        num_posts = len(timestamps)
+        
+        # Template, tipo de conta e username de cada post
+        template_idx = rng.integers(0, len(self.templates), num_posts)
+        # Autor de cada post, proporcional à atividade; o tipo de conta é o do usuário
+        user_ids = rng.choice(len(self.users), size=num_posts, p=self.users['activity_weight'].to_numpy()).astype(np.int32)
+        
+        # Posts sobre crypto comentam uma das moedas com preço (coluna coin)
+        post_coins = np.full(num_posts, None, dtype=object)
+        if coin_prices:
+            symbols = list(coin_prices)
+            weights = np.array([(coin_weights or {}).get(symbol, 1.0) for symbol in symbols], dtype=float)
+            is_crypto = (self.templates['category'] == 'crypto').to_numpy()[template_idx]
+            crypto_posts = np.flatnonzero(is_crypto)
+            if len(symbols) == 1:
+                post_coins[crypto_posts] = symbols[0]
+            else:
+                post_coins[crypto_posts] = np.asarray(symbols, dtype=object)[
+                    rng.choice(len(symbols), size=len(crypto_posts), p=weights / weights.sum())
+                ]
+        
+        return self._post_frame(timestamps, template_idx, user_ids, post_coins, coin_prices)
+    
+    def _post_frame(self, timestamps, template_idx, user_ids, post_coins, coin_prices=None):
+        """
+        Monta o DataFrame dos posts a partir do horário, template, autor e moeda de cada um:
+        sentiment (template + eventos + variação da moeda), likes/reposts e texto
+        """
+        rng = self.rng
+        num_posts = len(template_idx)
+        account_idx = self.users['account_type'].cat.codes.to_numpy()[user_ids]
+        
+        # Sentiment base do template + sentiment de eventos
+        base_sentiment = self.templates['sentiment_base'].to_numpy(dtype=float)[template_idx]
+        event_sentiment = self.get_event_sentiment_batch(timestamps)
+        
+        # Se há preços, os posts sobre crypto acompanham a variação mais recente da sua moeda
+        sentiment_adjustment = np.zeros(num_posts)
+        if coin_prices:
+            price_change = asof_values(timestamps, post_coins, coin_prices)
+            has_price = ~np.isnan(price_change)
+            # Ajusta sentiment baseado na variação de preço
+            sentiment_adjustment[has_price] = np.clip(price_change[has_price] / 100, -0.3, 0.3)
+        
+        # Sentiment final
+        final_sentiment = np.clip(base_sentiment + event_sentiment * 0.3 + sentiment_adjustment, -1, 1)
+        
+        # Likes e reposts baseados em sentiment e account type
+        sentiment_multiplier = (final_sentiment + 1) / 2  # Normaliza para 0-1
+        likes_low, likes_high = self.likes_ranges[account_idx].T
+        reposts_low, reposts_high = self.reposts_ranges[account_idx].T
+        base_likes = rng.integers(likes_low, likes_high)
+        base_reposts = rng.integers(reposts_low, reposts_high)
+        
+        # Aplica multiplicador de sentiment
+        likes = (base_likes * (0.5 + sentiment_multiplier)).astype(np.int64)
+        reposts = (base_reposts * (0.5 + sentiment_multiplier)).astype(np.int64)
+        
+        # Texto: código do dicionário de textos (vira string só no export) ou, com placeholders,
+        # o texto já preenchido com os valores do momento de cada post
+        text_codes = self.template_text_codes[template_idx]
+        if self.has_placeholders:
+            used = set().union(*(self.text_fields[code] for code in np.unique(text_codes)))
+            fields = self._placeholder_fields(used, timestamps, post_coins, coin_prices)
+            text = render_texts(text_codes, self.text_dtype.categories.to_numpy(dtype=object), fields)
+        else:
+            text = pd.Categorical.from_codes(text_codes, dtype=self.text_dtype)
+        
+        return pd.DataFrame({
+            'post_id': post_ids(num_posts),
+            'user_id': user_ids,
+            'username': pd.Categorical.from_codes(user_ids, dtype=self.username_dtype),
+            'template_id': self.templates['template_id'].to_numpy(dtype=np.int32)[template_idx],
+            'text': text,
+            'timestamp': timestamps,
+            'likes': likes,
+            'reposts': reposts,
+            'account_type': pd.Categorical.from_codes(account_idx, categories=self.account_types),
+            'sentiment': np.round(final_sentiment, 3),
+            'coin': post_coins
+        })
+    
+    def generate_campaigns(self, num_campaigns, coin_prices=None, ring_size=BOT_RING_SIZE):
+        """
+        Posts de campanhas coordenadas de bots antes dos eventos da RiberCoin + gabarito
+        Os bots são divididos em anéis; em cada campanha os bots de um anel postam o mesmo template de
+        crypto (às vezes uma variação do mesmo tom) em rajada, até LEAD_HOURS antes do evento
+        Retorna (posts, labels): labels tem uma linha por post, na mesma ordem
+        """
+        planned, labels = self.plan_campaign_posts(num_campaigns, ring_size)
+        if planned is None:
+            return None, None
+        posts = self.campaign_posts(planned, coin_prices)
+        print(f"✓ {len(posts):,} posts de campanha gerados")
+        return posts, labels
+    
+    def plan_campaign_posts(self, num_campaigns, ring_size=BOT_RING_SIZE):
+        """
+        Planeja os posts das campanhas (horário, template e bot de cada um), sem montar o DataFrame
+        Retorna (planned, labels): planned = {'timestamp' (ns), 'template_idx', 'user_id'}; labels = gabarito
+        """
+        rng = self.rng
+        events = self.all_events.select(AFFECTS_RIBERCOIN)
+        bots = np.flatnonzero(self.users['account_type'].to_numpy() == 'bot')
+        if num_campaigns <= 0 or len(events) == 0 or len(bots) == 0:
+            print("⚠ Campanhas de bots ignoradas (sem eventos da RiberCoin ou sem bots)")
+            return None, None
+        
+        print(f"\nPlanejando {num_campaigns:,} campanhas de bots...")
+        ring_indptr, ring_members = bot_rings(bots, ring_size, rng)
+        campaigns, planned = plan_campaigns(num_campaigns, events.starts, ring_indptr, ring_members, rng,
+                                            earliest_ns=to_ns([START_DATE])[0])
+        campaign = planned['campaign']
+        
+        # Template principal da campanha: crypto com o tom do evento (pump = positivo, crash = negativo);
+        # VARIANT_SHARE dos posts usam outro template do mesmo tom
+        crypto = (self.templates['category'] == 'crypto').to_numpy()
+        base = self.templates['sentiment_base'].to_numpy(dtype=float)
+        positive, negative = np.flatnonzero(crypto & (base >= 0)), np.flatnonzero(crypto & (base < 0))
+        if len(negative) == 0:
+            negative = positive
+        bullish = events.events['sentiment'][campaigns['event']] >= 0
+        
+        def pick(tone, size):
+            # Template aleatório do tom de cada linha (tone = True positivo)
+            u = rng.random(size)
+            return np.where(tone, positive[(u * len(positive)).astype(int)], negative[(u * len(negative)).astype(int)])
+        
+        main_template = pick(bullish, num_campaigns)
+        template_idx = main_template[campaign]
+        variant = rng.random(len(campaign)) < VARIANT_SHARE
+        template_idx[variant] = pick(bullish[campaign[variant]], variant.sum())
+        
+        labels = pd.DataFrame({
+            'campaign_id': campaign.astype(np.int32) + 1,
+            'ring_id': campaigns['ring'][campaign].astype(np.int32) + 1,
+            'user_id': planned['user_id'].astype(np.int32),
+            'event_name': pd.Categorical(events.events['name'][campaigns['event']][campaign]),
+            'event_start': pd.to_datetime(events.starts[campaigns['event']][campaign]),
+            'campaign_start': pd.to_datetime(campaigns['start'][campaign]),
+        })
+        print(f"✓ {len(campaign):,} posts de campanha planejados ({len(bots):,} bots em {len(ring_indptr) - 1:,} anéis)")
+        planned = {'timestamp': planned['timestamp'], 'template_idx': template_idx,
+                   'user_id': planned['user_id'].astype(np.int32)}
+        return planned, labels
+    
+    def campaign_posts(self, planned, coin_prices=None):
+        """DataFrame dos posts planejados por plan_campaign_posts (todos sobre a RiberCoin)"""
+        timestamps = pd.DatetimeIndex(np.asarray(planned['timestamp']).astype('datetime64[ns]'))
+        symbol = 'RBC' if coin_prices and 'RBC' in coin_prices else None
+        post_coins = np.full(len(timestamps), symbol, dtype=object)
+        return self._post_frame(timestamps, planned['template_idx'], planned['user_id'], post_coins, coin_prices)
+    
+    def generate_interactions(self, posts, repost_rate=REPOST_EDGE_RATE, reply_rate=REPLY_EDGE_RATE):
+        """
+        Grafo de reposts/respostas dos posts (InteractionGraph, um CSR por linha de posts)
+        Ligação preferencial: cada post recebe arestas em proporção aos seus reposts/likes, que já
+        crescem com o tipo de conta do autor; quem interage é sorteado pela atividade x peso do tipo de conta
+        """
+        rng = self.rng
+        print(f"\nGerando interações de {len(posts):,} posts...")
+        
+        repost_counts = rng.poisson(posts['reposts'].to_numpy() * repost_rate)
+        reply_counts = rng.poisson(posts['likes'].to_numpy() * reply_rate)
+        activity = self.users['activity_weight'].to_numpy()
+        account_codes = self.users['account_type'].cat.codes.to_numpy()
+        graph = build_interactions(posts['user_id'].to_numpy(), repost_counts, reply_counts,
+                                   activity * self.repost_weights[account_codes],
+                                   activity * self.reply_weights[account_codes], rng)
+        
+        print(f"✓ {len(graph):,} interações geradas ({repost_counts.sum():,} reposts, {reply_counts.sum():,} respostas)")
+        return graph
+    
+    def _placeholder_fields(self, used, timestamps, post_coins, coin_prices):
+        """
+        Valores dos placeholders usados, como {placeholder: (tabela de textos, código de cada post)}
+        A moeda citada é a do post (posts de crypto) ou a primeira de coin_prices (padrão RBC)
+        """
+        symbols = list(coin_prices) if coin_prices else ['RBC']
+        text_coins = np.where(pd.isna(post_coins), symbols[0], post_coins).astype(object)
+        fields = {}
+        
+        if 'coin' in used:
+            fields['coin'] = (np.array(symbols), pd.Index(symbols).get_indexer(text_coins))
+        
+        if used & {'price', 'pct'}:
+            if not coin_prices:
+                raise ValueError("Templates com {price}/{pct} precisam dos preços das moedas")
+            prices = asof_values(timestamps, text_coins, coin_prices, 'price_usd')
+            if 'price' in used:
+                fields['price'] = price_strings(prices)
+            if 'pct' in used:
+                # Variação em relação ao preço de 24h antes (0 quando ainda não há histórico)
+                before = asof_values(timestamps - pd.Timedelta(hours=24), text_coins, coin_prices, 'price_usd')
+                fields['pct'] = pct_strings(np.where(before > 0, (prices / before - 1) * 100, 0.0))
+        
+        if 'user' in used:
+            # Menção a outro usuário, com a mesma chance de quem mais posta
+            mentioned = self.rng.choice(len(self.users), size=len(timestamps), p=self.users['activity_weight'].to_numpy())
+            fields['user'] = (self.users['username'].to_numpy(dtype=object), mentioned)
+        
+        if 'event' in used:
+            # Evento mais recente já iniciado (antes do primeiro, o primeiro evento)
+            names = self.all_events.events['name'] if len(self.all_events) else np.array(['Ribeirania'])
+            latest = np.searchsorted(self.all_events.starts, to_ns(timestamps), side='right') - 1
+            fields['event'] = (names, np.clip(latest, 0, len(names) - 1))
+        
+        return fields
 
 
 # Gerador de preços das criptomoedas principais, incluindo Solana e RiberCoin
@@ -315,11 +607,11 @@ def load_solana_prices():
     Carrega dados REAIS do Solana previamente baixados
     """
     print("\n" + "-" * 70)
-    print("ETAPA 1/4: Carregando preços REAIS Solana (SOL)")
+    print("ETAPA 1/3: Carregando preços REAIS Solana (SOL)")
     print("-" * 70)
     
     try:
-        df = pd.read_csv('solana_prices.csv', encoding='utf-8-sig')
+        df = profiling.read_csv('solana_prices.csv', encoding='utf-8-sig')
         df['timestamp'] = pd.to_datetime(df['timestamp'], format='mixed', utc=True)
         # Remove timezone para compatibilidade
         df['timestamp'] = df['timestamp'].dt.tz_localize(None)
@@ -341,555 +633,861 @@ def load_solana_prices():
         print("para baixar os dados reais do Solana.\n")
         return None
 
-def generate_ribercoin_prices(num_records, events_file):
-    """Gera preços da RiberCoin reagindo a eventos de Ribeirania"""
-    print("\n" + "-" * 70)
-    print("ETAPA 2/4: Gerando preços RiberCoin (RBC)")
-    print("-" * 70)
-    
-    # Lê eventos
-    events_df = pd.read_csv(events_file, encoding='utf-8-sig')
-    events_df['date'] = pd.to_datetime(events_df['date'], errors='coerce')
-    events_df = events_df[events_df['date'].notna()]
-    
-    ribercoin = CryptoGenerator(
-        coin_name='RiberCoin',
-        symbol='RBC',
-        start_price=0.08,  # Preço inicial realista
-        volatility=0.035,  # Volatilidade moderada
-        trend='bullish'
-    )
-    
-    # Adiciona eventos
-    events_added = 0
-    for _, event in events_df.iterrows():
-        if event['affects_ribercoin'] == 'SIM':
-            ribercoin.add_event(
-                event['date'],
-                event['impact_type'],
-                event['impact_intensity'],
-                event['duration_hours']
-            )
-            events_added += 1
-    
-    # Gera preços com lógica personalizada de memecoins
-    timestamps = pd.date_range(start=START_DATE, end=END_DATE, periods=num_records)
-    prices = []
-    volumes = []
-    market_caps = []
-    
-    # Parâmetros do ciclo de 3 meses
-    days_per_cycle = 90  # 3 meses
-    records_per_cycle = num_records / ((END_DATE - START_DATE).days / days_per_cycle)
-    
-    # Preço base que oscila ao longo do tempo
-    base_price = 0.08
-    
-    for i, ts in enumerate(timestamps):
-        # 1. CICLO DE 3 MESES (mean reversion)
-        cycle_position = (i % records_per_cycle) / records_per_cycle
-        
-        # Preço "alvo" do ciclo atual (oscila entre 0.06 e 0.12)
-        cycle_target = base_price * (0.75 + 0.5 * np.sin(2 * np.pi * cycle_position))
-        cycle_target = np.clip(cycle_target, 0.05, 0.15)
-        
-        # 2. FORÇA DE MEAN REVERSION (puxa de volta para o ciclo)
-        if i > 0:
-            deviation = prices[-1] - cycle_target
-            mean_reversion = -deviation * 0.08  # 8% de correção por período
-        else:
-            mean_reversion = 0
-        
-        # 3. IMPACTO DE EVENTOS (amplificado mas controlado)
-        event_impact = ribercoin.get_event_impact(ts)
-        
-        # Durante evento, reduz mean reversion para deixar o pump/dump acontecer
-        if abs(event_impact) > 0.1:
-            mean_reversion *= 0.3  # Reduz força de reversão durante eventos
-        
-        # 4. RANDOM WALK DIÁRIO (0.02% a 0.05% para cima ou baixo)
-        daily_change_pct = np.random.uniform(0.0002, 0.0005) * np.random.choice([-1, 1])
-        
-        # 5. VOLATILIDADE EXTRA EM EVENTOS
-        if abs(event_impact) > 0.1:
-            volatility_multiplier = 1 + abs(event_impact) * 2
-            daily_change_pct *= volatility_multiplier
-        
-        # 6. SPIKES OCASIONAIS (típico de memecoin - 1% de chance)
-        if np.random.random() < 0.01:
-            spike = np.random.uniform(0.03, 0.08) * np.random.choice([-1, 1])
-        else:
-            spike = 0
-        
-        # CALCULA NOVO PREÇO
-        if i == 0:
-            ribercoin.current_price = base_price
-        else:
-            # Combina todos os fatores
-            total_change = 1 + daily_change_pct + event_impact + mean_reversion + spike
-            
-            # Limita mudança máxima por período (±10%)
-            total_change = np.clip(total_change, 0.90, 1.10)
-            
-            ribercoin.current_price = prices[-1] * total_change
-        
-        # LIMITES RÍGIDOS DE PREÇO
-        ribercoin.current_price = np.clip(ribercoin.current_price, 0.003, 0.80)
-        
-        prices.append(ribercoin.current_price)
-        
-        # Volume (aumenta durante eventos e volatilidade)
-        base_volume = 600000
-        volume_multiplier = 1 + abs(event_impact) * 5 + abs(spike) * 3
-        volume = base_volume * volume_multiplier * np.random.uniform(0.7, 1.3)
-        volumes.append(volume)
-        
-        # Market cap
-        supply = 500000000
-        market_cap = ribercoin.current_price * supply
-        market_caps.append(market_cap)
-    
+# Geração em blocos (streaming)
+# As moedas são geradas por um iterador que devolve blocos de chunk_size registros, carregando entre os blocos
+# o preço atual de cada moeda e os geradores aleatórios. Cada componente aleatório
+# (ruído, volume, spikes...) tem seu próprio gerador, então sortear em blocos dá exatamente os mesmos
+# números que sortear tudo de uma vez: a geração em memória é só o caso de um bloco único
+
+def series_timestamps(num_records, start=0, stop=None):
+    """
+    Timestamps das posições [start, stop) de uma série de num_records pontos entre START_DATE e END_DATE
+    Mesmo espaçamento do pd.date_range(periods=num_records), mas calculado por posição
+    """
+    stop = num_records if stop is None else stop
+    start_ns, end_ns = to_ns([START_DATE, END_DATE])
+    step = (end_ns - start_ns) / (num_records - 1) if num_records > 1 else 0.0
+    offsets = (np.arange(start, stop) * step).astype(np.int64)
+    if stop == num_records and num_records > 1:
+        offsets[-1] = end_ns - start_ns
+    return pd.DatetimeIndex((start_ns + offsets).astype('datetime64[ns]'))
+
+def chunk_bounds(num_records, chunk_size=None):
+    """Divide [0, num_records) em blocos [start, stop) de até chunk_size registros"""
+    chunk_size = chunk_size or max(num_records, 1)
+    for start in range(0, num_records, chunk_size):
+        yield start, min(start + chunk_size, num_records)
+
+def component_streams(rng, names):
+    """Um gerador aleatório independente para cada componente da moeda, derivados de rng"""
+    rng = np.random.default_rng(rng)
+    return dict(zip(names, rng.spawn(len(names))))
+
+def price_frame(coin, timestamps, prices, volumes, previous_price=None):
+    """Monta o DataFrame padrão de preços de uma moeda; previous_price liga a variação % ao bloco anterior"""
     df = pd.DataFrame({
         'timestamp': timestamps,
-        'coin_name': ribercoin.coin_name,
-        'symbol': ribercoin.symbol,
+        'coin_name': coin['coin_name'],
+        'symbol': coin['symbol'],
         'price_usd': prices,
         'volume_24h': volumes,
-        'market_cap': market_caps
+        'market_cap': prices * coin['supply']
     })
     
-    # Calcula variação percentual
-    df['price_change_pct'] = df['price_usd'].pct_change() * 100
-    df['price_change_pct'].fillna(0, inplace=True)
+    # Calcula variação percentual (o 1° registro da série fica com 0)
+    if len(prices) > 0:
+        previous = np.concatenate(([prices[0] if previous_price is None else previous_price], prices[:-1]))
+        df['price_change_pct'] = (prices / previous - 1) * 100
+    else:
+        df['price_change_pct'] = prices
     
-    print(f"\n✓ Preços RiberCoin gerados!")
+    return df
+
+# Motor multi-moeda
+# Todas as moedas sintéticas são descritas por uma linha do registro (coins_registry.csv) e avançam juntas:
+# o ruído de todas é sorteado de uma vez já correlacionado (fator de Cholesky da matriz de correlação)
+# e a recorrência de preços roda uma única vez sobre a matriz (moedas x registros), com limites por linha
+# A correlação entre quaisquer moedas (inclusive com a Solana real) é só configuração em COIN_CORRELATIONS
+
+# Valores padrão de cada campo da especificação de uma moeda
+COIN_DEFAULTS = {
+    'start_price': 1.0,
+    'volatility': 0.01,           # Desvio do ruído (correlacionado entre moedas) por período
+    'drift': 0.0,                 # Tendência constante por período
+    'events': None,               # 'ribeirania' (eventos do CSV) ou 'data|tipo|intensidade|horas; ...'
+    'event_loading': 0.0,         # Quanto do impacto dos eventos entra na variação (negativo = reage ao contrário)
+    'event_noise_boost': 0.0,     # Amplificação do ruído durante eventos fortes
+    'reversion': 0.0,             # Força da mean reversion em direção ao preço alvo
+    'event_reversion_damping': 1.0,  # Multiplicador da mean reversion durante eventos fortes
+    'target_level': 1.0,          # Preço alvo = start_price * (target_level + cycle_amplitude * sen(ciclo))
+    'cycle_amplitude': 0.0,
+    'cycle_days': 90,
+    'target_min': -np.inf,
+    'target_max': np.inf,
+    'spike_prob': 0.0,            # Chance de spike por período (tamanho entre spike_min e spike_max, sinal aleatório)
+    'spike_min': 0.0,
+    'spike_max': 0.0,
+    'wave_amplitude': 0.0,        # Falso ciclo: onda com período sorteado entre wave_period_min e wave_period_max
+    'wave_period_min': 1.0,
+    'wave_period_max': 1.0,
+    'step_min': -np.inf,          # Limites da variação por período
+    'step_max': np.inf,
+    'price_min': -np.inf,         # Limites rígidos de preço
+    'price_max': np.inf,
+    'base_volume': 1000000,
+    'volume_min': 1.0,            # Multiplicador aleatório do volume entre volume_min e volume_max
+    'volume_max': 1.0,
+    'volume_event_boost': 0.0,    # Volume sobe com o impacto dos eventos e com os spikes
+    'volume_spike_boost': 0.0,
+    'volume_wave_amplitude': 0.0, # Padrão cíclico (falso) no volume
+    'volume_wave_period': 1.0,
+    'supply': 1000000000,
+}
+
+# Registro das moedas sintéticas: uma linha por moeda, campos vazios usam COIN_DEFAULTS
+# Criado pelo generate_templates.py; para adicionar uma moeda basta adicionar uma linha
+COIN_REGISTRY_FILE = 'coins_registry.csv'
+
+# Correlação alvo entre o ruído das moedas, por par de símbolos (pares ausentes = 0)
+# Incluir 'SOL' usa os retornos reais da Solana como fator comum, ex: {('SOL', 'ZPH'): 0.6}
+COIN_CORRELATIONS = {
+    ('RBC', 'BFC'): -0.95,
+}
+
+# O alvo vale para o ruído, não para os retornos: eventos, mean reversion e limites de preço
+# enfraquecem a correlação obtida. O resumo avisa quando ela se afasta do alvo mais que isso
+CORRELATION_TOLERANCE = 0.2
+
+# Impacto acima disso (em módulo) conta como evento forte
+EVENT_THRESHOLD = 0.1
+
+MARKET_STREAMS = ('noise', 'spike', 'spike_size', 'spike_sign', 'wave', 'volume')
+
+def coin_spec(coin):
+    """Especificação completa de uma moeda (campos ausentes recebem os valores de COIN_DEFAULTS)"""
+    return {**COIN_DEFAULTS, **coin}
+
+def parse_coin_events(value):
+    """Eventos de uma moeda no registro: 'ribeirania', vazio ou 'data|tipo|intensidade|horas; ...'"""
+    if not isinstance(value, str) or not value.strip():
+        return None
+    if value.strip() == 'ribeirania':
+        return 'ribeirania'
+    
+    events = []
+    for item in value.split(';'):
+        date, impact_type, intensity, duration_hours = [field.strip() for field in item.split('|')]
+        events.append((date, impact_type, float(intensity), float(duration_hours)))
+    return events
+
+def load_coin_registry(registry_file=COIN_REGISTRY_FILE):
+    """Lê o registro de moedas e devolve a especificação completa de cada uma"""
+    df = pd.read_csv(registry_file, encoding='utf-8-sig')
+    
+    unknown = set(df.columns) - set(COIN_DEFAULTS) - {'coin_name', 'symbol'}
+    if unknown:
+        raise ValueError(f"Colunas desconhecidas em {registry_file}: {', '.join(sorted(unknown))}")
+    duplicated = df['symbol'][df['symbol'].duplicated()]
+    if len(duplicated) > 0:
+        raise ValueError(f"Símbolos repetidos em {registry_file}: {', '.join(duplicated)}")
+    
+    coins = []
+    for row in df.to_dict('records'):
+        # Células vazias ficam com o valor padrão
+        coin = {field: value for field, value in row.items() if not pd.isna(value)}
+        coin['events'] = parse_coin_events(coin.get('events'))
+        coins.append(coin_spec(coin))
+    return coins
+
+def coin_output_file(coin):
+    """Arquivo CSV de saída de uma moeda (ex: ribercoin_prices.csv)"""
+    return f"{coin['coin_name'].lower()}_prices.csv"
+
+def find_coin(coins, symbol):
+    """Especificação da moeda com o símbolo dado"""
+    for coin in coins:
+        if coin['symbol'] == symbol:
+            return coin
+    raise ValueError(f"Moeda desconhecida: {symbol}")
+
+def build_event_generator(coin, events_file):
+    """Cria o CryptoGenerator que calcula o impacto dos eventos da moeda"""
+    if coin['events'] == 'ribeirania':
+        # Eventos de Ribeirania que afetam a RiberCoin, direto do índice compilado
+        event_index = load_event_index(events_file).select(AFFECTS_RIBERCOIN)
+        return CryptoGenerator(coin['coin_name'], coin['symbol'], event_index=event_index)
+    
+    generator = CryptoGenerator(coin['coin_name'], coin['symbol'])
+    for date, impact_type, intensity, duration_hours in coin['events'] or []:
+        generator.add_event(date, impact_type, intensity, duration_hours)
+    return generator
+
+def check_correlations(correlations, symbols):
+    """Valida os pares de COIN_CORRELATIONS (símbolos conhecidos e valores entre -1 e 1)"""
+    for (a, b), rho in correlations.items():
+        unknown = {a, b} - set(symbols)
+        if unknown:
+            raise ValueError(f"Correlação com moeda desconhecida: {', '.join(sorted(unknown))}")
+        if a == b or not -1 <= rho <= 1:
+            raise ValueError(f"Correlação inválida para {a}/{b}: {rho}")
+
+def check_post_coins(weights, symbols):
+    """Valida CRYPTO_POST_COINS (símbolos conhecidos e pesos positivos)"""
+    for symbol, weight in weights.items():
+        if symbol not in symbols:
+            raise ValueError(f"Moeda desconhecida em CRYPTO_POST_COINS: {symbol}")
+        if not weight > 0:
+            raise ValueError(f"Peso inválido para {symbol} em CRYPTO_POST_COINS: {weight}")
+
+def correlation_matrix(symbols, correlations):
+    """Matriz de correlação (K, K) na ordem de symbols; pares com moedas fora da lista são ignorados"""
+    index = {symbol: i for i, symbol in enumerate(symbols)}
+    matrix = np.eye(len(symbols))
+    for (a, b), rho in correlations.items():
+        if a in index and b in index:
+            matrix[index[a], index[b]] = matrix[index[b], index[a]] = rho
+    return matrix
+
+def cholesky_factor(matrix):
+    """Fator de Cholesky L (matrix = L @ L.T), usado para correlacionar ruídos independentes"""
+    try:
+        return np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        raise ValueError("Matriz de correlação inválida: as correlações configuradas são incompatíveis entre si")
+
+def build_solana_driver(num_records, solana_file='solana_prices.csv'):
+    """
+    Fator comum com os retornos REAIS da Solana, no espaçamento das moedas sintéticas
+    Retorna driver(start, stop): retornos padronizados (média 0, desvio 1) das posições [start, stop)
+    """
+    df = pd.read_csv(solana_file, encoding='utf-8-sig')
+    times = to_ns(pd.to_datetime(df['timestamp'], format='mixed', utc=True).dt.tz_localize(None))
+    order = np.argsort(times)
+    times = times[order]
+    log_prices = np.log(df['price_usd'].to_numpy(dtype=float)[order])
+    
+    # Retorno por nanossegundo de cada intervalo da série real: a interpolação linear do log-preço
+    # distribui esse retorno igualmente pelos registros do intervalo
+    rates = np.diff(log_prices) / np.diff(times)
+    mean, std = rates.mean(), rates.std() or 1.0
+    
+    def driver(start, stop):
+        first = max(start - 1, 0)
+        positions = to_ns(series_timestamps(num_records, first, stop))
+        rate = np.diff(np.interp(positions, times, log_prices)) / np.maximum(np.diff(positions), 1)
+        standardized = (rate - mean) / std
+        return standardized if start > 0 else np.concatenate(([0.0], standardized))
+    
+    return driver
+
+def correlate_noise(independent, factor):
+    """
+    Aplica o fator de Cholesky ao último eixo de independent
+    Só as moedas que aparecem em alguma correlação são misturadas; as demais já são independentes
+    """
+    identity = np.eye(len(factor))
+    mixed = np.flatnonzero(np.any(factor != identity, axis=0) | np.any(factor != identity, axis=1))
+    correlated = independent.copy()
+    if len(mixed) > 0:
+        correlated[..., mixed] = independent[..., mixed] @ factor[np.ix_(mixed, mixed)].T
+    return correlated
+
+def iter_market_chunks(coins, num_records, chunk_size=None, rng=None, correlations=None,
+                       drivers=None, num_paths=1, events_file='ribeirania_events.csv'):
+    """
+    Gera todas as moedas juntas em blocos de chunk_size registros (None = bloco único)
+    Devolve (timestamps, preços, volumes) de cada bloco, com preços e volumes no formato
+    (num_paths, moedas, registros do bloco); drivers = {símbolo: driver(start, stop)} são fatores
+    reais (ex: Solana) que entram na matriz de correlação sem serem gerados
+    """
+    coins = [coin_spec(coin) for coin in coins]
+    drivers = drivers or {}
+    streams = component_streams(rng, MARKET_STREAMS)
+    
+    symbols = list(drivers) + [coin['symbol'] for coin in coins]
+    factor = cholesky_factor(correlation_matrix(symbols, correlations or {}))
+    num_drivers, num_coins = len(drivers), len(coins)
+    rows = num_paths * num_coins
+    
+    # Parâmetros de cada moeda como arrays (moedas,): os sorteios são feitos no formato
+    # (registros, caminhos, moedas), então os parâmetros fazem broadcast direto no último eixo
+    spec = {field: np.array([float(coin[field]) for coin in coins]) for field in COIN_DEFAULTS if field != 'events'}
+    records_per_cycle = num_records / ((END_DATE - START_DATE).days / spec['cycle_days'])
+    limits = {name: np.tile(spec[name], num_paths) for name in ('step_min', 'step_max', 'price_min', 'price_max')}
+    start_prices = np.clip(np.tile(spec['start_price'], num_paths), limits['price_min'], limits['price_max'])
+    has_spikes = bool(np.any(spec['spike_prob'] > 0))
+    has_waves = bool(np.any(spec['wave_amplitude'] != 0))
+    # Sem mean reversion (e com variação e piso positivos) a variação não depende do preço anterior:
+    # essas linhas saem de um cumprod vetorizado com piso/teto, as demais do kernel de recorrência
+    free = np.tile((spec['reversion'] == 0) & (spec['step_min'] > 0) & (spec['price_min'] > 0), num_paths)
+    free_prices = FlooredCumprod(start_prices[free], limits['price_min'][free], limits['price_max'][free])
+    
+    # Impacto de eventos: um gerador por fonte de eventos, compartilhado entre moedas e caminhos
+    event_generators = {}
+    for coin in coins:
+        key = repr(coin['events'])
+        if coin['events'] and key not in event_generators:
+            event_generators[key] = build_event_generator(coin, events_file)
+    
+    def to_rows(values, size):
+        # (registros, caminhos, moedas) -> linhas contíguas (caminhos * moedas, registros) para o kernel
+        return np.ascontiguousarray(np.broadcast_to(values, (size, num_paths, num_coins)).reshape(size, rows).T)
+    
+    def advance(start_prices, shocks, reversion, targets):
+        # Preços (linhas, registros) depois de start_prices; as linhas free continuam do estado de free_prices
+        prices = np.empty(shocks.shape)
+        if free.any():
+            factors = np.clip(1 + shocks[free], limits['step_min'][free, None], limits['step_max'][free, None])
+            prices[free] = free_prices.advance(factors)
+        if not free.all():
+            bound = {name: limit[~free] for name, limit in limits.items()}
+            prices[~free] = price_recurrence_paths(start_prices[~free], shocks[~free], reversion[~free], targets[~free], **bound)
+        return prices
+    
+    previous_prices = None
+    for start, stop in chunk_bounds(num_records, chunk_size):
+        size = stop - start
+        shape = (size, num_paths, num_coins)
+        steps = np.arange(start, stop)[:, None, None]
+        timestamps = series_timestamps(num_records, start, stop)
+        
+        impacts = {key: generator.get_event_impact_batch(timestamps) for key, generator in event_generators.items()}
+        event_impacts = np.zeros((size, 1, num_coins))
+        for i, coin in enumerate(coins):
+            if coin['events']:
+                event_impacts[:, 0, i] = impacts[repr(coin['events'])]
+        in_event = np.abs(event_impacts) > EVENT_THRESHOLD
+        
+        # 1. RUÍDO CORRELACIONADO: normais independentes (sorteadas em ordem de tempo, para o bloco não
+        # mudar o resultado) multiplicadas pelo fator de Cholesky; os fatores reais substituem suas linhas
+        independent = streams['noise'].standard_normal((size, num_paths, num_drivers + num_coins))
+        for i, driver in enumerate(drivers.values()):
+            independent[:, :, i] = driver(start, stop)[:, None]
+        noise = correlate_noise(independent, factor)[:, :, num_drivers:] * spec['volatility']
+        
+        # Mais volatilidade durante eventos fortes
+        noise *= np.where(in_event, 1 + np.abs(event_impacts) * spec['event_noise_boost'], 1)
+        
+        shocks = noise + spec['event_loading'] * event_impacts + spec['drift']
+        
+        # 2. SPIKES OCASIONAIS
+        spikes = 0.0
+        if has_spikes:
+            spike_mask = streams['spike'].random(shape) < spec['spike_prob']
+            spike_sizes = streams['spike_size'].uniform(spec['spike_min'], spec['spike_max'], shape)
+            spike_signs = streams['spike_sign'].choice([-1, 1], shape)
+            spikes = np.where(spike_mask, spike_sizes * spike_signs, 0)
+            shocks += spikes
+        
+        # 3. FALSO CICLO (onda com período sorteado a cada registro)
+        if has_waves:
+            wave_periods = streams['wave'].uniform(spec['wave_period_min'], spec['wave_period_max'], shape)
+            shocks += spec['wave_amplitude'] * np.sin(2 * np.pi * steps / wave_periods)
+        
+        # 4. MEAN REVERSION em direção ao alvo do ciclo (mais fraca durante eventos fortes)
+        cycle_position = (steps % records_per_cycle) / records_per_cycle
+        targets = spec['start_price'] * (spec['target_level'] + spec['cycle_amplitude'] * np.sin(2 * np.pi * cycle_position))
+        targets = np.clip(targets, spec['target_min'], spec['target_max'])
+        reversion = np.where(in_event, spec['reversion'] * spec['event_reversion_damping'], spec['reversion'])
+        
+        # 5. RECORRÊNCIA: todas as moedas (e caminhos) avançam juntas, uma linha por (caminho, moeda)
+        shocks, reversion, targets = to_rows(shocks, size), to_rows(reversion, size), to_rows(targets, size)
+        prices = np.empty((rows, size))
+        if previous_prices is None:
+            # O 1° registro da série é o preço inicial
+            prices[:, 0] = start_prices
+            prices[:, 1:] = advance(start_prices, shocks[:, 1:], reversion[:, 1:], targets[:, 1:])
+        else:
+            prices[:] = advance(previous_prices, shocks, reversion, targets)
+        previous_prices = prices[:, -1].copy()
+        
+        # 6. VOLUME (aumenta em eventos e spikes, com padrão cíclico opcional)
+        volume_multiplier = 1 + np.abs(event_impacts) * spec['volume_event_boost'] + np.abs(spikes) * spec['volume_spike_boost']
+        volume_wave = 1 + spec['volume_wave_amplitude'] * np.sin(2 * np.pi * steps / spec['volume_wave_period'])
+        volume_noise = streams['volume'].uniform(spec['volume_min'], spec['volume_max'], shape)
+        volumes = spec['base_volume'] * volume_multiplier * volume_wave * volume_noise
+        
+        yield timestamps, prices.reshape(num_paths, num_coins, size), np.moveaxis(volumes, 0, -1)
+
+def iter_market_frames(coins, num_records, chunk_size=None, rng=None, correlations=None, drivers=None):
+    """Blocos do motor convertidos em DataFrames: {símbolo: DataFrame do bloco} para cada bloco"""
+    coins = [coin_spec(coin) for coin in coins]
+    previous_prices = [None] * len(coins)
+    
+    for timestamps, prices, volumes in iter_market_chunks(coins, num_records, chunk_size, rng, correlations, drivers):
+        frames = {}
+        for i, coin in enumerate(coins):
+            frames[coin['symbol']] = price_frame(coin, timestamps, prices[0, i], volumes[0, i], previous_prices[i])
+            previous_prices[i] = prices[0, i, -1]
+        yield frames
+
+def market_drivers(coins, num_records, correlations):
+    """Fatores reais usados nas correlações configuradas (hoje só a Solana)"""
+    symbols = {symbol for pair in correlations for symbol in pair}
+    coin_symbols = {coin['symbol'] for coin in coins}
+    if 'SOL' in symbols and 'SOL' not in coin_symbols:
+        return {'SOL': build_solana_driver(num_records)}
+    return {}
+
+def write_market_csvs(frame_chunks, output_files):
+    """Escreve os blocos de todas as moedas nos CSVs conforme são gerados; retorna o total de registros"""
+    files = {symbol: open(path, 'w', encoding='utf-8-sig', newline='') for symbol, path in output_files.items()}
+    rows = 0
+    try:
+        for frames in frame_chunks:
+            for symbol, chunk in frames.items():
+                profiling.to_csv(chunk, files[symbol], header=(rows == 0), index=False, date_format=CSV_DATE_FORMAT)
+            rows += len(next(iter(frames.values())))
+    finally:
+        for f in files.values():
+            f.close()
+    return rows
+
+def print_coin_summary(df):
+    """Resumo de uma moeda gerada"""
+    print(f"\n✓ Preços {df['coin_name'].iloc[0]} ({df['symbol'].iloc[0]}) gerados!")
     print(f"  - Preço inicial: ${df['price_usd'].iloc[0]:.4f}")
     print(f"  - Preço final: ${df['price_usd'].iloc[-1]:.4f}")
     print(f"  - Preço mínimo: ${df['price_usd'].min():.4f}")
     print(f"  - Preço máximo: ${df['price_usd'].max():.4f}")
     print(f"  - Variação total: {((df['price_usd'].iloc[-1] / df['price_usd'].iloc[0]) - 1) * 100:.1f}%")
     print(f"  - Volatilidade média: {df['price_change_pct'].std():.2f}%")
-    print(f"  - Maior alta diária: {df['price_change_pct'].max():.2f}%")
-    print(f"  - Maior queda diária: {df['price_change_pct'].min():.2f}%")
-    print(f"  - Eventos aplicados: {events_added}")
-    
-    return df
 
-def generate_neuroncoin_prices(num_records):
-    """Gera preços da NeuronCoin (baixa volatilidade, tipo stablecoin)"""
+def generate_market(num_records, coins, correlations=COIN_CORRELATIONS, chunk_size=None,
+                    rng=None, output_files=None):
+    """
+    Gera todas as moedas do registro em uma única passada do motor
+    Sem output_files retorna {símbolo: DataFrame}; com output_files ({símbolo: caminho}) grava
+    os CSVs bloco a bloco e não guarda as séries na memória
+    """
     print("\n" + "-" * 70)
-    print("ETAPA 3/7: Gerando preços NeuronCoin (NRC)")
+    print(f"ETAPA 2/3: Gerando preços de {len(coins)} moedas sintéticas (motor multi-moeda)")
     print("-" * 70)
     
-    neuroncoin = CryptoGenerator(
-        coin_name='NeuronCoin',
-        symbol='NRC',
-        start_price=1.00,  # Stablecoin perto de $1
-        volatility=0.003,  # MUITO baixa volatilidade (0.3%)
-        trend='stable'
-    )
-    
-    # Apenas 2 eventos pequenos, já que a ideia da NeuronCoin é ser uma stablecoin
-    neuroncoin.add_event('2022-06-01', 'slight_crash', 0.08, 720)
-    neuroncoin.add_event('2023-12-01', 'slight_pump', 0.10, 1440)
-    
-    timestamps = pd.date_range(start=START_DATE, end=END_DATE, periods=num_records)
-    prices = []
-    volumes = []
-    market_caps = []
-    
-    target_price = 1.00  # Sempre tenta voltar para $1
-    
-    for i, ts in enumerate(timestamps):
-        # 1. Impacto de eventos (muito reduzido)
-        event_impact = neuroncoin.get_event_impact(ts) * 0.3  # Reduz impacto para 30%
-        
-        # 2. Mean reversion (sempre puxa de volta para $1)
-        deviation = (neuroncoin.current_price - target_price) / target_price
-        reversion = -deviation * 0.1  # Força de volta para $1
-        
-        # 3. Volatilidade mínima
-        random_change = np.random.normal(0, neuroncoin.volatility)
-        
-        # Calcula novo preço
-        total_change = (1 + random_change + event_impact * 0.5 + reversion)
-        neuroncoin.current_price *= total_change
-        
-        # Mantém perto de $1
-        neuroncoin.current_price = np.clip(neuroncoin.current_price, 0.85, 1.15)
-        
-        prices.append(neuroncoin.current_price)
-        
-        # Volume estável
-        volume = 800000 * np.random.uniform(0.8, 1.2)
-        volumes.append(volume)
-        
-        # Market cap
-        supply = 1000000000
-        market_cap = neuroncoin.current_price * supply
-        market_caps.append(market_cap)
-    
-    df = pd.DataFrame({
-        'timestamp': timestamps,
-        'coin_name': neuroncoin.coin_name,
-        'symbol': neuroncoin.symbol,
-        'price_usd': prices,
-        'volume_24h': volumes,
-        'market_cap': market_caps
-    })
+    drivers = market_drivers(coins, num_records, correlations)
+    frame_chunks = iter_market_frames(coins, num_records, chunk_size, rng, correlations, drivers)
     
-    # Calcula variação percentual
-    df['price_change_pct'] = df['price_usd'].pct_change() * 100
-    df['price_change_pct'].fillna(0, inplace=True)
-    
-    print(f"\n✓ Preços NeuronCoin gerados!")
-    print(f"  - Preço inicial: ${df['price_usd'].iloc[0]:.2f}")
-    print(f"  - Preço final: ${df['price_usd'].iloc[-1]:.2f}")
-    print(f"  - Volatilidade (std): ${df['price_usd'].std():.4f}")
-    print(f"  - Variação total: {((df['price_usd'].iloc[-1] / df['price_usd'].iloc[0]) - 1) * 100:.1f}%")
+    if output_files is not None:
+        rows = write_market_csvs(frame_chunks, output_files)
+        print(f"\n✓ {len(coins)} moedas geradas em blocos de {chunk_size or num_records:,} ({rows:,} registros cada)")
+        return None
     
-    return df
+    chunks = list(frame_chunks)
+    market = {coin['symbol']: pd.concat([frames[coin['symbol']] for frames in chunks], ignore_index=True)
+              for coin in coins}
+    for df in market.values():
+        print_coin_summary(df)
+    return market
+
+# Modo Monte Carlo (ensemble)
+# Gera K histórias alternativas da RiberCoin e da BonfimCoin de uma vez, em blocos no tempo de (K, registros)
+# O motor multi-moeda trata cada (caminho, moeda) como uma linha e avança todas juntas; cada bloco
+# entra no resumo por caminho e é descartado
+# Serve para testar a robustez das análises sem montar K DataFrames
 
-def generate_bonfimcoin_prices(num_records, ribercoin_df):
+class EnsembleStats:
     """
-    Gera preços da BonfimCoin com CORRELAÇÃO NEGATIVA FORTE à RiberCoin
-    Quando RBC sobe, BFC cai proporcionalmente e vice-versa
+    Resumo por caminho acumulado bloco a bloco, sem guardar as matrizes (K, num_records):
+    preço final, drawdown máximo relativo ao ensemble e correlação RBC/BFC
     """
+
+    def __init__(self, num_paths):
+        self.count = 0
+        # Uma linha por moeda (RBC, BFC), uma coluna por caminho
+        self.final = np.zeros((2, num_paths))
+        self.peak = np.zeros((2, num_paths))
+        self.drawdown = np.zeros((2, num_paths))
+        self.mean = np.zeros((2, num_paths))
+        self.squares = np.zeros((2, num_paths))   # soma dos quadrados dos desvios da média
+        self.cross = np.zeros(num_paths)          # soma dos produtos dos desvios RBC x BFC
+
+    def update(self, prices):
+        """Incorpora um bloco de preços no formato (K, 2, registros do bloco)"""
+        prices = np.moveaxis(prices, 1, 0)
+        size = prices.shape[-1]
+        self.final = prices[..., -1].copy()
+        
+        # Drawdown do preço relativo à mediana dos caminhos: os eventos (iguais em todos os caminhos)
+        # levam os preços aos limites rígidos, e o drawdown absoluto sairia igual em todos
+        relative = prices / np.median(prices, axis=1, keepdims=True)
+        running_max = np.maximum(np.maximum.accumulate(relative, axis=-1), self.peak[..., None])
+        self.drawdown = np.maximum(self.drawdown, np.max(1 - relative / running_max, axis=-1))
+        self.peak = running_max[..., -1]
+        
+        # Correlação: médias e somas de desvios de cada bloco combinadas com as anteriores (Chan et al.)
+        chunk_mean = prices.mean(axis=-1)
+        deviations = prices - chunk_mean[..., None]
+        total = self.count + size
+        delta = chunk_mean - self.mean
+        weight = self.count * size / total
+        self.squares += np.einsum('ckn,ckn->ck', deviations, deviations) + delta ** 2 * weight
+        self.cross += np.einsum('kn,kn->k', deviations[0], deviations[1]) + delta[0] * delta[1] * weight
+        self.mean += delta * size / total
+        self.count = total
+
+    def summary(self):
+        """DataFrame com uma linha por caminho"""
+        return pd.DataFrame({
+            'path': np.arange(self.final.shape[1]),
+            'rbc_final_price': self.final[0],
+            'bfc_final_price': self.final[1],
+            'rbc_relative_drawdown': self.drawdown[0],
+            'bfc_relative_drawdown': self.drawdown[1],
+            'rbc_bfc_correlation': self.cross / np.sqrt(self.squares[0] * self.squares[1])
+        })
+
+def run_ensemble(num_paths, num_records, events_file, coins, rng=None):
+    """Gera o ensemble RBC/BFC, imprime a distribuição e salva o resumo por caminho"""
     print("\n" + "-" * 70)
-    print("ETAPA 4/7: Gerando preços BonfimCoin (BFC) - CORRELAÇÃO NEGATIVA FORTE")
+    print(f"MONTE CARLO: Gerando {num_paths:,} caminhos RiberCoin/BonfimCoin")
     print("-" * 70)
     
-    bonfimcoin = CryptoGenerator(
-        coin_name='BonfimCoin',
-        symbol='BFC',
-        start_price=0.45,  # Ajustado para melhor visualização
-        volatility=0.020,  # Reduzido para seguir mais RBC
-        trend='stable'
-    )
-    
-    timestamps = pd.date_range(start=START_DATE, end=END_DATE, periods=num_records)
-    prices = []
-    volumes = []
-    market_caps = []
-    
-    # Calcula retornos da RiberCoin
-    rbc_returns = ribercoin_df['price_usd'].pct_change().fillna(0)
-    
-    # Preço base que ajusta ao longo do tempo
-    base_price = 0.45
-    
-    for i, ts in enumerate(timestamps):
-        # 1. INVERSÃO FORTE da variação da RiberCoin
-        rbc_return = rbc_returns.iloc[i] if i < len(rbc_returns) else 0
-        
-        # Inverte 95% da variação da RBC (correlação muito forte)
-        inverse_movement = -rbc_return * 0.95
-        
-        # 2. Volatilidade própria MÍNIMA (só 2% para não interferir)
-        random_change = np.random.normal(0, bonfimcoin.volatility)
-        
-        # 3. Mean reversion FRACO (permite seguir RBC)
-        if i > 0:
-            deviation = (prices[-1] - base_price) / base_price
-            mean_reversion = -deviation * 0.02  # Muito fraco
-        else:
-            mean_reversion = 0
-        
-        # 4. Ajuste do preço base ao longo do tempo (contraponto de RBC)
-        # Se RBC está em tendência de alta, BFC em baixa
-        if i > 100:
-            rbc_trend = (ribercoin_df['price_usd'].iloc[i] / ribercoin_df['price_usd'].iloc[i-100]) - 1
-            base_price *= (1 - rbc_trend * 0.002)  # Ajuste gradual oposto
-        
-        # Calcula novo preço
-        if i == 0:
-            bonfimcoin.current_price = 0.45
-        else:
-            total_change = (1 + inverse_movement + random_change * 0.3 + mean_reversion)
-            
-            # Limita mudanças extremas
-            total_change = np.clip(total_change, 0.85, 1.15)
-            
-            bonfimcoin.current_price = prices[-1] * total_change
-        
-        # Limites amplos para permitir variação
-        bonfimcoin.current_price = np.clip(bonfimcoin.current_price, 0.01, 2.00)
-        prices.append(bonfimcoin.current_price)
-        
-        # Volume aumenta quando há divergência forte
-        base_volume = 500000 * (1 + abs(inverse_movement) * 8)
-        volume = base_volume * np.random.uniform(0.7, 1.3)
-        volumes.append(volume)
-        
-        # Market cap
-        supply = 300000000
-        market_cap = bonfimcoin.current_price * supply
-        market_caps.append(market_cap)
-    
-    df = pd.DataFrame({
-        'timestamp': timestamps,
-        'coin_name': bonfimcoin.coin_name,
-        'symbol': bonfimcoin.symbol,
-        'price_usd': prices,
-        'volume_24h': volumes,
-        'market_cap': market_caps
-    })
-    
-    df['price_change_pct'] = df['price_usd'].pct_change() * 100
-    df['price_change_pct'].fillna(0, inplace=True)
-    
-    # Calcula correlação com RiberCoin
-    correlation = ribercoin_df['price_usd'].corr(df['price_usd'])
-    
-    print(f"\n✓ Preços BonfimCoin gerados!")
-    print(f"  - Preço inicial: ${df['price_usd'].iloc[0]:.4f}")
-    print(f"  - Preço final: ${df['price_usd'].iloc[-1]:.4f}")
-    print(f"  - Correlação com RBC: {correlation:.3f} ⚡ (quanto mais negativo, melhor!)")
-    print(f"  - Volatilidade: {df['price_change_pct'].std():.2f}%")
-    
-    # Aviso se correlação não for negativa o suficiente
-    if correlation > -0.6:
-        print(f"  ⚠ ATENÇÃO: Correlação deveria ser < -0.6 (está em {correlation:.3f})")
+    coins = [find_coin(coins, 'RBC'), find_coin(coins, 'BFC')]
+    drivers = market_drivers(coins, num_records, COIN_CORRELATIONS)
+    # Blocos no tempo com todos os caminhos juntos (a mediana do drawdown relativo é entre caminhos)
+    chunk_size = max(1, ENSEMBLE_BLOCK_VALUES // num_paths)
+    chunks = iter_market_chunks(coins, num_records, chunk_size, rng=rng, correlations=COIN_CORRELATIONS,
+                                drivers=drivers, num_paths=num_paths, events_file=events_file)
+    stats = EnsembleStats(num_paths)
+    for _, prices, _ in chunks:
+        stats.update(prices)
+    summary = stats.summary()
+    
+    percentiles = [5, 25, 50, 75, 95]
+    print(f"\n✓ Ensemble gerado! ({num_paths:,} x {num_records:,}, blocos de {chunk_size:,} registros)")
+    for column in ['rbc_final_price', 'bfc_final_price', 'rbc_relative_drawdown', 'bfc_relative_drawdown', 'rbc_bfc_correlation']:
+        values = np.percentile(summary[column], percentiles)
+        formatted = ' | '.join(f"p{p}: {v:.4f}" for p, v in zip(percentiles, values))
+        print(f"  - {column}: {formatted}")
+    
+    weak = (summary['rbc_bfc_correlation'] > -0.6).mean() * 100
+    print(f"  - Caminhos com correlação RBC/BFC > -0.6: {weak:.1f}%")
+    
+    profiling.to_csv(summary, 'ribercoin_bonfimcoin_ensemble.csv', index=False, encoding='utf-8-sig')
+    print("✓ Salvo: ribercoin_bonfimcoin_ensemble.csv")
+    
+    return summary
+
+# Jobs de geração: cada job tem semente própria
+# O motor multi-moeda gera todas as moedas sintéticas de uma vez; os posts do Xister esperam os preços
+# A ordem do dicionário define a ordem das sementes e a ordem de execução
+# Os jobs formam uma cadeia e rodam em série: como o motor gera todas as moedas juntas, não há mais
+# um job por moeda para paralelizar (um pool só serializaria os DataFrames do motor de ida e volta)
+
+GENERATION_JOBS = {
+    'market': [],
+    'xister': ['market'],
+}
+
+def load_post_prices(symbols, coins, market=None):
+    """
+    {símbolo: preços} das moedas comentadas nos posts: usa as séries já geradas quando estão
+    na memória; senão (streaming, Solana) lê do CSV só as colunas usadas na correlação
+    """
+    coin_prices = {}
+    for symbol in symbols:
+        if market is not None and symbol in market:
+            coin_prices[symbol] = market[symbol]
+            continue
+        path = 'solana_prices.csv' if symbol == 'SOL' else coin_output_file(find_coin(coins, symbol))
+        df = profiling.read_csv(path, encoding='utf-8-sig', usecols=['timestamp', 'price_usd', 'price_change_pct'],
+                                float_precision='round_trip')
+        df['timestamp'] = pd.to_datetime(df['timestamp'], format='ISO8601', utc=True).dt.tz_localize(None)
+        coin_prices[symbol] = df
+    return coin_prices
+
+# Colunas que saem dos posts no layout normalizado (texto em xister_templates.csv, usuário em xister_users.csv)
+NORMALIZED_POST_COLUMNS = ['post_id', 'user_id', 'template_id', 'timestamp', 'likes', 'reposts', 'sentiment', 'coin']
+
+def merge_campaign_posts(posts, campaign_posts, labels, first_post=0):
+    """
+    Junta os posts das campanhas ao fluxo de posts (ordenado por horário) e renumera os post_id
+    (a partir de first_post, em shards). Retorna (posts, labels), com o post_id de cada post de
+    campanha na 1ª coluna do gabarito
+    """
+    combined = pd.concat([posts, campaign_posts], ignore_index=True)
+    order = np.argsort(to_ns(combined['timestamp']), kind='stable')
+    combined = combined.take(order).reset_index(drop=True)
+    combined['post_id'] = post_ids(len(combined), first_post)
+    
+    # Nova posição de cada post de campanha (estavam no fim do concat)
+    position = np.empty(len(order), dtype=np.int64)
+    position[order] = np.arange(len(order))
+    labels = labels.copy()
+    labels.insert(0, 'post_id', combined['post_id'].to_numpy()[position[len(posts):]])
+    return combined, labels.sort_values('post_id', ignore_index=True)
+
+def export_posts(df, xister_gen, layout='denormalized', posts_file='xister_posts.csv', with_tables=True):
+    """
+    Grava os posts no layout escolhido (o texto só é materializado aqui) e a tabela de usuários
+    with_tables=False grava só os posts (partes de shards: as tabelas são gravadas uma vez)
+    """
+    if layout == 'normalized':
+        # Texto com placeholders é único por post: nesse caso ele continua na tabela de posts
+        text_column = [] if isinstance(df['text'].dtype, pd.CategoricalDtype) else ['text']
+        posts = df[NORMALIZED_POST_COLUMNS + text_column]
+    elif layout == 'denormalized':
+        posts = df
     else:
-        print(f"  ✓ Correlação negativa forte alcançada!")
+        raise ValueError(f"Layout de export desconhecido: {layout}")
     
-    return df
+    profiling.to_csv(posts, posts_file, index=False, encoding='utf-8-sig', date_format=CSV_DATE_FORMAT)
+    print(f"✓ Salvo: {posts_file}")
+    if with_tables:
+        export_tables(xister_gen, layout)
+
+def export_tables(xister_gen, layout='denormalized'):
+    """Grava a tabela de usuários (e, no layout normalizado, a de templates)"""
+    if layout == 'normalized':
+        templates = xister_gen.templates[['template_id', 'text', 'category', 'sentiment_base']]
+        profiling.to_csv(templates, 'xister_templates.csv', index=False, encoding='utf-8-sig')
+        print("✓ Salvo: xister_templates.csv")
+    profiling.to_csv(xister_gen.users, 'xister_users.csv', index=False, encoding='utf-8-sig')
+    print("✓ Salvo: xister_users.csv")
+
+# Xister em shards de tempo
+# O número de posts de cada faixa de 1 hora é sorteado uma vez no processo principal; cada shard é um
+# bloco contíguo de faixas, com seu próprio gerador (SeedSequence.spawn pela posição do shard) e o número
+# de posts antes dele já conhecido. Assim cada shard gera e grava sua parte sozinho, e as partes em ordem
+# formam uma sequência única, ordenada por horário e numerada, com qualquer número de processos
+# Os workers montam o gerador uma vez por processo (mesma semente = mesmos usuários) e mapeiam os
+# preços de arquivos .npy, sem receber DataFrames a cada tarefa
+
+# Estado de cada processo do pool de shards (montado em init_shard_worker)
+SHARD_WORKER = {}
+
+SHARED_PRICE_DTYPE = np.dtype([('timestamp', 'i8'), ('price_usd', 'f8'), ('price_change_pct', 'f8')])
 
-def generate_smoke_coin_1(num_records):
+def save_shared_prices(coin_prices, directory):
+    """Grava os preços das moedas dos posts em .npy (um por moeda); retorna {símbolo: caminho}"""
+    paths = {}
+    for symbol, prices in coin_prices.items():
+        table = np.empty(len(prices), dtype=SHARED_PRICE_DTYPE)
+        table['timestamp'] = to_ns(prices['timestamp'])
+        table['price_usd'] = prices['price_usd'].to_numpy(dtype=float)
+        table['price_change_pct'] = prices['price_change_pct'].to_numpy(dtype=float)
+        paths[symbol] = os.path.join(directory, f"prices.{symbol}.npy")
+        np.save(paths[symbol], table)
+    return paths
+
+def load_shared_prices(paths):
+    """{símbolo: DataFrame de preços} a partir dos .npy de save_shared_prices (mapeados na memória)"""
+    coin_prices = {}
+    for symbol, path in paths.items():
+        table = np.load(path, mmap_mode='r')
+        coin_prices[symbol] = pd.DataFrame({
+            'timestamp': pd.DatetimeIndex(np.asarray(table['timestamp']).astype('datetime64[ns]')),
+            'price_usd': table['price_usd'],
+            'price_change_pct': table['price_change_pct'],
+        })
+    return coin_prices
+
+def init_shard_worker(user_seed, num_users, price_paths):
+    """Inicializa um processo do pool: gerador do Xister (usuários da semente) e preços compartilhados"""
+    SHARD_WORKER['generator'] = XisterGenerator('xister_tweets_template.csv', 'ribeirania_events.csv',
+                                                rng=user_seed, num_users=num_users)
+    SHARD_WORKER['coin_prices'] = load_shared_prices(price_paths)
+
+def plan_xister_shards(num_posts, shard_posts, xister_gen, coin_prices, coin_weights, arrivals, rng):
     """
-    Gera ZephyrCoin (ZPH) - Moeda cortina de fumaça que PARECE uma grande moeda
-    Similar ao Solana em valor e volume (moeda tier-1)
+    Divide os posts em shards de tempo com ~shard_posts posts cada; retorna uma lista de
+    {'start_ns': início do shard, 'num_posts': posts comuns, 'counts'/'edges' (poisson) ou
+    'positions' (uniform: total, início, fim)}
     """
-    print("\n" + "-" * 70)
-    print("ETAPA 5/7: Gerando preços ZephyrCoin (ZPH) - MOEDA GRANDE")
-    print("-" * 70)
-    
-    zephyr = CryptoGenerator(
-        coin_name='ZephyrCoin',
-        symbol='ZPH',
-        start_price=95.50,  # Preço alto como Solana
-        volatility=0.028,  # Volatilidade similar a Solana
-        trend='stable'
-    )
-    
-    timestamps = pd.date_range(start=START_DATE, end=END_DATE, periods=num_records)
-    prices = []
-    volumes = []
-    market_caps = []
-    
-    # Simula comportamento de moeda tier-1 mas SEM padrão real
-    for i, ts in enumerate(timestamps):
-        # Random walk puro (sem eventos, sem lógica)
-        random_change = np.random.normal(0, zephyr.volatility)
-        
-        # Ruído adicional
-        noise = np.random.uniform(-0.008, 0.008)
-        
-        # Ocasionalmente muda de regime (simula "notícias" aleatórias de mercado)
-        if np.random.random() < 0.003:
-            regime_shift = np.random.uniform(-0.04, 0.04)
-        else:
-            regime_shift = 0
-        
-        # Leve drift para cima (típico de bull market)
-        drift = 0.00005
-        
-        if i == 0:
-            zephyr.current_price = 95.50
-        else:
-            total_change = 1 + random_change + noise + regime_shift + drift
-            total_change = np.clip(total_change, 0.94, 1.06)
-            zephyr.current_price = prices[-1] * total_change
-        
-        # Range realista para tier-1
-        zephyr.current_price = np.clip(zephyr.current_price, 20.0, 300.0)
-        prices.append(zephyr.current_price)
-        
-        # VOLUME ALTO como Solana (moeda tier-1)
-        base_volume = 2000000000  # 2 bilhões
-        volume = base_volume * np.random.uniform(0.6, 1.8)
-        volumes.append(volume)
-        
-        # Market cap grande
-        supply = 400000000  # 400 milhões (como Solana)
-        market_cap = zephyr.current_price * supply
-        market_caps.append(market_cap)
-    
-    df = pd.DataFrame({
-        'timestamp': timestamps,
-        'coin_name': zephyr.coin_name,
-        'symbol': zephyr.symbol,
-        'price_usd': prices,
-        'volume_24h': volumes,
-        'market_cap': market_caps
-    })
-    
-    df['price_change_pct'] = df['price_usd'].pct_change() * 100
-    df['price_change_pct'].fillna(0, inplace=True)
-    
-    print(f"\n✓ Preços ZephyrCoin gerados!")
-    print(f"  - Preço inicial: ${df['price_usd'].iloc[0]:.2f}")
-    print(f"  - Preço final: ${df['price_usd'].iloc[-1]:.2f}")
-    print(f"  - Market cap médio: ${df['market_cap'].mean()/1e9:.1f}B")
-    print(f"  - Volume médio: ${df['volume_24h'].mean()/1e9:.2f}B")
-    print(f"  - Comportamento: TIER-1 mas ALEATÓRIO (sem padrão)")
-    
-    return df
+    if arrivals == 'uniform':
+        starts = list(range(0, num_posts, shard_posts)) or [0]
+        stops = starts[1:] + [num_posts]
+        return [{'start_ns': to_ns(series_timestamps(num_posts, start, start + 1))[0] if start < num_posts else 0,
+                 'num_posts': stop - start, 'positions': (num_posts, start, stop)}
+                for start, stop in zip(starts, stops)]
+    if arrivals != 'poisson':
+        raise ValueError(f"Modelo de chegada desconhecido: {arrivals}")
+    
+    edges, intensity = xister_gen.arrival_intensity(coin_prices, coin_weights)
+    counts = arrival_counts(num_posts, edges, intensity, rng)
+    # Corta depois da faixa em que o total acumulado passa de cada múltiplo de shard_posts
+    cumulative = np.cumsum(counts)
+    cuts = np.searchsorted(cumulative, np.arange(shard_posts, num_posts, shard_posts), side='left') + 1
+    bounds = np.unique(np.concatenate(([0], np.minimum(cuts, len(counts)), [len(counts)])))
+    return [{'start_ns': edges[lo], 'num_posts': int(counts[lo:hi].sum()),
+             'counts': counts[lo:hi], 'edges': edges[lo:hi + 1]}
+            for lo, hi in zip(bounds[:-1], bounds[1:])]
 
-def generate_smoke_coin_2(num_records):
+def shard_file(name, index, extension='csv'):
+    """Caminho da parte de um shard: xister_shards/<name>.part-00000.<extension>"""
+    return os.path.join(XISTER_SHARD_DIR, f"{name}.part-{index:05d}.{extension}")
+
+def generate_xister_shard(index, shard, seed, first_post, campaign=None, labels=None, coin_weights=None,
+                          layout='denormalized', interactions=False):
     """
-    Gera LunarToken (LNR) - Moeda cortina de fumaça 2
-    Parece seguir um padrão mas é só ruído
+    Gera e grava um shard (num processo do pool ou no principal, após init_shard_worker)
+    campaign/labels: posts de campanha planejados que caem no shard; retorna o número de posts gravados
     """
-    print("\n" + "-" * 70)
-    print("ETAPA 6/7: Gerando preços LunarToken (LNR) - CORTINA DE FUMAÇA")
-    print("-" * 70)
+    xister_gen = SHARD_WORKER['generator']
+    coin_prices = SHARD_WORKER['coin_prices']
+    xister_gen.rng = np.random.default_rng(seed)
     
-    lunar = CryptoGenerator(
-        coin_name='LunarToken',
-        symbol='LNR',
-        start_price=0.42,
-        volatility=0.032,
-        trend='stable'
-    )
-    
-    timestamps = pd.date_range(start=START_DATE, end=END_DATE, periods=num_records)
-    prices = []
-    volumes = []
-    market_caps = []
-    
-    # "Falso padrão" - parece cíclico mas não é
-    for i, ts in enumerate(timestamps):
-        # Random walk
-        random_change = np.random.normal(0, lunar.volatility)
-        
-        # Falso ciclo (período aleatório)
-        fake_cycle_period = np.random.uniform(800, 1200)
-        fake_cycle = 0.02 * np.sin(2 * np.pi * i / fake_cycle_period)
-        
-        # Drift aleatório
-        drift = np.random.choice([-0.0001, 0, 0.0001])
-        
-        if i == 0:
-            lunar.current_price = 0.42
+    with profiling.stage('xister:shard') as stage:
+        if 'positions' in shard:
+            timestamps = series_timestamps(*shard['positions'])
         else:
-            total_change = 1 + random_change + fake_cycle + drift
-            total_change = np.clip(total_change, 0.90, 1.10)
-            lunar.current_price = prices[-1] * total_change
-        
-        lunar.current_price = np.clip(lunar.current_price, 0.05, 2.0)
-        prices.append(lunar.current_price)
-        
-        # Volume com padrão falso
-        base_volume = 350000
-        volume = base_volume * (1 + 0.3 * np.sin(2 * np.pi * i / 500)) * np.random.uniform(0.7, 1.3)
-        volumes.append(volume)
+            timestamps = pd.DatetimeIndex(bin_arrivals(shard['counts'], shard['edges'], xister_gen.rng).astype('datetime64[ns]'))
+        df = xister_gen.posts_at(timestamps, coin_prices, coin_weights)
         
-        supply = 200000000
-        market_cap = lunar.current_price * supply
-        market_caps.append(market_cap)
-    
-    df = pd.DataFrame({
-        'timestamp': timestamps,
-        'coin_name': lunar.coin_name,
-        'symbol': lunar.symbol,
-        'price_usd': prices,
-        'volume_24h': volumes,
-        'market_cap': market_caps
-    })
-    
-    df['price_change_pct'] = df['price_usd'].pct_change() * 100
-    df['price_change_pct'].fillna(0, inplace=True)
-    
-    print(f"\n✓ Preços LunarToken gerados!")
-    print(f"  - Preço inicial: ${df['price_usd'].iloc[0]:.4f}")
-    print(f"  - Preço final: ${df['price_usd'].iloc[-1]:.4f}")
-    print(f"  - Comportamento: RUÍDO (falso padrão)")
-    
-    return df
-    """Gera preços da NeuronCoin (baixa volatilidade, tipo stablecoin)"""
-    print("\n" + "-" * 70)
-    print("ETAPA 3/4: Gerando preços NeuronCoin (NRC)")
-    print("-" * 70)
-    
-    neuroncoin = CryptoGenerator(
-        coin_name='NeuronCoin',
-        symbol='NRC',
-        start_price=1.00,  # Stablecoin perto de $1
-        volatility=0.003,  # MUITO baixa volatilidade (0.3%)
-        trend='stable'
-    )
-    
-    # APENAS 2 eventos pequenos
-    neuroncoin.add_event('2022-06-01', 'slight_crash', 0.08, 720)
-    neuroncoin.add_event('2023-12-01', 'slight_pump', 0.10, 1440)
-    
-    # GERA PREÇOS SUPER ESTÁVEIS
-    timestamps = pd.date_range(start=START_DATE, end=END_DATE, periods=num_records)
-    prices = []
-    volumes = []
-    market_caps = []
-    
-    target_price = 1.00  # Sempre tenta voltar para $1
-    
-    for i, ts in enumerate(timestamps):
-        # 1. Impacto de eventos (muito reduzido)
-        event_impact = neuroncoin.get_event_impact(ts) * 0.3  # Reduz impacto para 30%
-        
-        # 2. Mean reversion (sempre puxa de volta para $1)
-        deviation = (neuroncoin.current_price - target_price) / target_price
-        reversion = -deviation * 0.1  # Força de volta para $1
-        
-        # 3. Volatilidade mínima
-        random_change = np.random.normal(0, neuroncoin.volatility)
-        
-        # Calcula novo preço
-        total_change = (1 + random_change + event_impact * 0.5 + reversion)
-        neuroncoin.current_price *= total_change
-        
-        # Mantém perto de $1
-        neuroncoin.current_price = np.clip(neuroncoin.current_price, 0.85, 1.15)
-        
-        prices.append(neuroncoin.current_price)
-        
-        # Volume estável
-        volume = 800000 * np.random.uniform(0.8, 1.2)
-        volumes.append(volume)
-        
-        # Market cap
-        supply = 1000000000
-        market_cap = neuroncoin.current_price * supply
-        market_caps.append(market_cap)
-    
-    df = pd.DataFrame({
-        'timestamp': timestamps,
-        'coin_name': neuroncoin.coin_name,
-        'symbol': neuroncoin.symbol,
-        'price_usd': prices,
-        'volume_24h': volumes,
-        'market_cap': market_caps
-    })
-    
-    # Calcula variação percentual
-    df['price_change_pct'] = df['price_usd'].pct_change() * 100
-    df['price_change_pct'].fillna(0, inplace=True)
-    
-    print(f"\n✓ Preços NeuronCoin gerados!")
-    print(f"  - Preço inicial: ${df['price_usd'].iloc[0]:.2f}")
-    print(f"  - Preço final: ${df['price_usd'].iloc[-1]:.2f}")
-    print(f"  - Volatilidade (std): ${df['price_usd'].std():.4f}")
-    print(f"  - Variação total: {((df['price_usd'].iloc[-1] / df['price_usd'].iloc[0]) - 1) * 100:.1f}%")
-    
-    return df
+        if campaign is not None and len(labels) > 0:
+            df, labels = merge_campaign_posts(df, xister_gen.campaign_posts(campaign, coin_prices), labels, first_post)
+            profiling.to_csv(labels, shard_file('xister_campaigns', index), index=False, encoding='utf-8-sig',
+                             date_format=CSV_DATE_FORMAT)
+        else:
+            df['post_id'] = post_ids(len(df), first_post)
+        stage['rows'] = len(df)
+        export_posts(df, xister_gen, layout, shard_file('xister_posts', index), with_tables=False)
+        
+        if interactions:
+            graph = xister_gen.generate_interactions(df)
+            graph.first_post = first_post
+            graph.save(shard_file('xister_interactions', index, 'npz'))
+    return len(df)
+
+def concat_csv_parts(part_paths, output_file):
+    """Junta CSVs com o mesmo cabeçalho em um só, copiando em blocos (cabeçalho só do primeiro)"""
+    with open(output_file, 'wb') as output:
+        for i, path in enumerate(part_paths):
+            with open(path, 'rb') as part:
+                if i > 0:
+                    part.readline()
+                shutil.copyfileobj(part, output, 16 * 1024 * 1024)
+
+def run_xister_shards(seed, coin_prices, max_workers):
+    """Gera os posts do Xister em shards de tempo (em paralelo com max_workers > 1); retorna o total de posts"""
+    user_seed, plan_seed, shard_seed = seed.spawn(3)
+    xister_gen = XisterGenerator('xister_tweets_template.csv', 'ribeirania_events.csv', rng=user_seed,
+                                 num_users=XISTER_USERS)
+    plan_rng = np.random.default_rng(plan_seed)
+    shards = plan_xister_shards(XISTER_POSTS, XISTER_SHARD_POSTS, xister_gen, coin_prices, CRYPTO_POST_COINS,
+                                XISTER_ARRIVALS, plan_rng)
+    
+    # Campanhas planejadas uma vez; cada post vai para o shard em cujo período ele cai
+    xister_gen.rng = plan_rng
+    planned, labels = xister_gen.plan_campaign_posts(BOT_CAMPAIGNS) if BOT_CAMPAIGNS > 0 else (None, None)
+    shard_of = np.zeros(0, dtype=np.int64)
+    if planned is not None:
+        shard_starts = np.array([shard['start_ns'] for shard in shards])
+        shard_of = np.searchsorted(shard_starts[1:], planned['timestamp'], side='right')
+    campaign_counts = np.bincount(shard_of, minlength=len(shards))
+    
+    # Primeiro post de cada shard (numeração global, sem depender da ordem de execução)
+    sizes = np.array([shard['num_posts'] for shard in shards]) + campaign_counts
+    first_posts = np.concatenate(([0], np.cumsum(sizes)[:-1]))
+    
+    os.makedirs(XISTER_SHARD_DIR, exist_ok=True)
+    for old in glob.glob(os.path.join(glob.escape(XISTER_SHARD_DIR), '*.part-*')):
+        os.remove(old)
+    
+    tasks = []
+    for index, (shard, shard_seed_i) in enumerate(zip(shards, shard_seed.spawn(len(shards)))):
+        rows = np.flatnonzero(shard_of == index)
+        campaign = {key: values[rows] for key, values in planned.items()} if len(rows) else None
+        tasks.append((index, shard, shard_seed_i, int(first_posts[index]), campaign,
+                      labels.iloc[rows].reset_index(drop=True) if len(rows) else None,
+                      CRYPTO_POST_COINS, XISTER_EXPORT, XISTER_INTERACTIONS))
+    print(f"\n🧩 {XISTER_POSTS:,} posts em {len(shards):,} shards ({max_workers} processos)")
+    
+    # Preços compartilhados com os workers em uma pasta temporária, apagada quando os shards terminam
+    # (não fica junto das partes entregues em XISTER_SHARD_DIR)
+    with tempfile.TemporaryDirectory(prefix='prices-', dir=XISTER_SHARD_DIR) as price_dir:
+        price_paths = save_shared_prices(coin_prices, price_dir)
+        if max_workers <= 1:
+            SHARD_WORKER.update(generator=xister_gen, coin_prices=load_shared_prices(price_paths))
+            sizes_written = [generate_xister_shard(*task) for task in tasks]
+            SHARD_WORKER.clear()
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers, initializer=init_shard_worker,
+                                     initargs=(user_seed, XISTER_USERS, price_paths)) as pool:
+                if profiling.ACTIVE is not None:
+                    futures = [pool.submit(profiling.profiled_call, profiling.ACTIVE.pipeline,
+                                           profiling.ACTIVE.profile_slowest, generate_xister_shard, *task)
+                               for task in tasks]
+                else:
+                    futures = [pool.submit(generate_xister_shard, *task) for task in tasks]
+                sizes_written = []
+                for future in futures:
+                    result = future.result()
+                    if profiling.ACTIVE is not None:
+                        result, measurements = result
+                        profiling.ACTIVE.merge(measurements)
+                    sizes_written.append(result)
+    
+    export_tables(xister_gen, XISTER_EXPORT)
+    if XISTER_SHARD_CONCAT:
+        for name in ('xister_posts', 'xister_campaigns'):
+            parts = sorted(glob.glob(os.path.join(glob.escape(XISTER_SHARD_DIR), f"{name}.part-*.csv")))
+            if parts:
+                concat_csv_parts(parts, f"{name}.csv")
+                for part in parts:
+                    os.remove(part)
+                print(f"✓ Salvo: {name}.csv ({len(parts)} partes)")
+    
+    total = int(sum(sizes_written))
+    print(f"✓ {total:,} posts gerados em {len(shards):,} shards")
+    return total
+
+def run_generation_job(name, seed, market=None):
+    """Executa um job de geração (no processo atual ou em um worker) e salva os CSVs"""
+    coins = load_coin_registry()
+    
+    if name == 'market':
+        output_files = {coin['symbol']: coin_output_file(coin) for coin in coins}
+        with profiling.stage('market', rows=CRYPTO_PRICES * len(coins)):
+            if STREAM_CHUNK_SIZE:
+                # Streaming: grava bloco a bloco e não devolve as séries
+                return generate_market(CRYPTO_PRICES, coins, chunk_size=STREAM_CHUNK_SIZE, rng=seed,
+                                       output_files=output_files)
+            
+            market = generate_market(CRYPTO_PRICES, coins, rng=seed)
+            for symbol, df in market.items():
+                profiling.to_csv(df, output_files[symbol], index=False, encoding='utf-8-sig',
+                                 date_format=CSV_DATE_FORMAT)
+                print(f"✓ Salvo: {output_files[symbol]}")
+            return market
+    
+    if name == 'xister':
+        # Xister Posts (usa RiberCoin para correlação)
+        print("\n" + "-" * 70)
+        print("ETAPA 3/3: Gerando posts Xister")
+        print("-" * 70)
+        with profiling.stage('xister', rows=XISTER_POSTS):
+            coin_prices = load_post_prices(CRYPTO_POST_COINS, coins, market)
+            if XISTER_SHARD_POSTS:
+                # Em shards os posts não ficam na memória: devolve só o total
+                return run_xister_shards(seed, coin_prices, MAX_WORKERS)
+            xister_gen = XisterGenerator('xister_tweets_template.csv', 'ribeirania_events.csv', rng=seed)
+            df = xister_gen.generate_posts(XISTER_POSTS, coin_prices, CRYPTO_POST_COINS, XISTER_ARRIVALS)
+            if BOT_CAMPAIGNS > 0:
+                with profiling.stage('xister:campaigns') as stage:
+                    campaign_posts, labels = xister_gen.generate_campaigns(BOT_CAMPAIGNS, coin_prices)
+                    if campaign_posts is not None:
+                        df, labels = merge_campaign_posts(df, campaign_posts, labels)
+                        stage['rows'] = len(labels)
+                        profiling.to_csv(labels, 'xister_campaigns.csv', index=False, encoding='utf-8-sig',
+                                         date_format=CSV_DATE_FORMAT)
+                        print("✓ Salvo: xister_campaigns.csv (gabarito das campanhas)")
+            export_posts(df, xister_gen, XISTER_EXPORT)
+            if XISTER_INTERACTIONS:
+                with profiling.stage('xister:interactions') as stage:
+                    graph = xister_gen.generate_interactions(df)
+                    stage['rows'] = len(graph)
+                    graph.save('xister_interactions.npz')
+                    print("✓ Salvo: xister_interactions.npz")
+            return df
+    
+    raise ValueError(f"Job desconhecido: {name}")
+
+def run_generation_jobs(seed_sequence):
+    """Roda os jobs de GENERATION_JOBS em ordem, no processo principal, e retorna {nome: resultado}"""
+    seeds = dict(zip(GENERATION_JOBS, seed_sequence.spawn(len(GENERATION_JOBS))))
+    results = {}
+    for name, dependencies in GENERATION_JOBS.items():
+        inputs = {dep: results[dep] for dep in dependencies}
+        results[name] = run_generation_job(name, seeds[name], **inputs)
+    return results
 
 # Função principal que orquestra a geração de todas as databases
 
 def main():
+    print("=" * 70)
+    print(" GERADOR PRINCIPAL - DATATHON RIBEIRANIA")
+    print("=" * 70)
+    print(f"\nPeríodo: {START_DATE.date()} até {END_DATE.date()}")
+    print(f"Total de dias: {TOTAL_DAYS}")
+    print(f"Registros por database: ~{XISTER_POSTS:,}\n")
+    
     # Verifica se arquivos de configuração existem
     try:
         templates = pd.read_csv('xister_tweets_template.csv', encoding='utf-8-sig')
         events = pd.read_csv('ribeirania_events.csv', encoding='utf-8-sig')
-        print("✓ Arquivos de configuração encontrados\n")
+        coins = load_coin_registry()
+        print(f"✓ Arquivos de configuração encontrados ({len(coins)} moedas no registro)\n")
     except FileNotFoundError as e:
         print("\n❌ ERRO: Arquivos de configuração não encontrados!")
         print("Execute primeiro: python generate_templates.py\n")
@@ -898,46 +1496,47 @@ def main():
     # Funções para a criação de cada base de dados de preços e market caps, 
     # Também gera os posts do Xister se baseando na RiberCoin e nos eventos definidos anteriomente.
     
+    if PROFILE_REPORT:
+        profiling.start('main_generator', PROFILE_SLOWEST_STAGE)
+    
     # 1. Solana (DADOS REAIS)
-    solana_df = load_solana_prices()
-    if solana_df is None:
+    with profiling.stage('solana') as stage:
+        solana_df = load_solana_prices()
+        if solana_df is None:
+            profiling.finish()
+            return
+        stage['rows'] = len(solana_df)
+        profiling.to_csv(solana_df, 'solana_prices.csv', index=False, encoding='utf-8-sig')
+        print("✓ Salvo: solana_prices.csv")
+    
+    # 2-3. Moedas sintéticas e posts do Xister, cada um com seu próprio gerador aleatório
+    symbols = ['SOL'] + [coin['symbol'] for coin in coins]
+    check_correlations(COIN_CORRELATIONS, symbols)
+    check_post_coins(CRYPTO_POST_COINS, symbols)
+    if XISTER_EXPORT not in ('denormalized', 'normalized'):
+        raise ValueError(f"XISTER_EXPORT inválido: {XISTER_EXPORT}")
+    if XISTER_ARRIVALS not in ('poisson', 'uniform'):
+        raise ValueError(f"XISTER_ARRIVALS inválido: {XISTER_ARRIVALS}")
+    seed_sequence = np.random.SeedSequence(RANDOM_SEED)
+    print(f"\n🎲 Semente: {seed_sequence.entropy} (use RANDOM_SEED = {seed_sequence.entropy} para reproduzir)")
+    if XISTER_SHARD_POSTS:
+        print(f"⚙ Processos (shards do Xister): {MAX_WORKERS}")
+    
+    results = run_generation_jobs(seed_sequence)
+    market = results['market']
+    xister_df = results['xister']
+    
+    if STREAM_CHUNK_SIZE:
+        # Em streaming as séries não ficam na memória: o resumo completo fica de fora
+        print("\n🌊 Modo streaming: resumo das moedas e correlações não calculados (séries gravadas direto no CSV)")
+        if ENSEMBLE_PATHS > 0:
+            with profiling.stage('ensemble', rows=ENSEMBLE_PATHS * CRYPTO_PRICES * 2):
+                run_ensemble(ENSEMBLE_PATHS, CRYPTO_PRICES, 'ribeirania_events.csv', coins, rng=seed_sequence.spawn(1)[0])
+        profiling.finish()
+        print("\n" + "=" * 70)
+        print(" ✅ GERAÇÃO COMPLETA!")
+        print("=" * 70)
         return
-    solana_df.to_csv('solana_prices.csv', index=False, encoding='utf-8-sig')
-    print("✓ Salvo: solana_prices.csv")
-    
-    # 2. RiberCoin
-    ribercoin_df = generate_ribercoin_prices(CRYPTO_PRICES, 'ribeirania_events.csv')
-    ribercoin_df.to_csv('ribercoin_prices.csv', index=False, encoding='utf-8-sig')
-    print("✓ Salvo: ribercoin_prices.csv")
-    
-    # 3. NeuronCoin
-    neuroncoin_df = generate_neuroncoin_prices(CRYPTO_PRICES)
-    neuroncoin_df.to_csv('neuroncoin_prices.csv', index=False, encoding='utf-8-sig')
-    print("✓ Salvo: neuroncoin_prices.csv")
-    
-    # 4. BonfimCoin (correlação NEGATIVA com RiberCoin)
-    bonfimcoin_df = generate_bonfimcoin_prices(CRYPTO_PRICES, ribercoin_df)
-    bonfimcoin_df.to_csv('bonfimcoin_prices.csv', index=False, encoding='utf-8-sig')
-    print("✓ Salvo: bonfimcoin_prices.csv")
-    
-    # 5. ZephyrCoin (cortina de fumaça - GRANDE como Solana)
-    zephyrcoin_df = generate_smoke_coin_1(CRYPTO_PRICES)
-    zephyrcoin_df.to_csv('zephyrcoin_prices.csv', index=False, encoding='utf-8-sig')
-    print("✓ Salvo: zephyrcoin_prices.csv")
-    
-    # 6. LunarToken (cortina de fumaça 2)
-    lunartoken_df = generate_smoke_coin_2(CRYPTO_PRICES)
-    lunartoken_df.to_csv('lunartoken_prices.csv', index=False, encoding='utf-8-sig')
-    print("✓ Salvo: lunartoken_prices.csv")
-    
-    # 7. Xister Posts (usa RiberCoin para correlação)
-    print("\n" + "-" * 70)
-    print("ETAPA 4/4: Gerando posts Xister")
-    print("-" * 70)
-    xister_gen = XisterGenerator('xister_tweets_template.csv', 'ribeirania_events.csv')
-    xister_df = xister_gen.generate_posts(XISTER_POSTS, ribercoin_df)
-    xister_df.to_csv('xister_posts.csv', index=False, encoding='utf-8-sig')
-    print("✓ Salvo: xister_posts.csv")
     
     # Gera um resumo ao final de toda geração com o resumo das bases geradas e suas estatísticas principais
     # Deixando claro caso algo deu errado ou saiu dos conformes
@@ -947,27 +1546,25 @@ def main():
     print("=" * 70)
     
     print("\n📊 XISTER POSTS:")
-    print(f"  - Total de posts: {len(xister_df):,}")
-    print(f"  - Usuários únicos: {xister_df['username'].nunique():,}")
-    print(f"  - Sentiment médio: {xister_df['sentiment'].mean():.3f}")
-    print(f"  - Total de likes: {xister_df['likes'].sum():,}")
-    print(f"  - Total de reposts: {xister_df['reposts'].sum():,}")
-    
-    print(f"\n  Distribuição por tipo de conta:")
-    for account_type, count in xister_df['account_type'].value_counts().items():
-        pct = count / len(xister_df) * 100
-        print(f"    - {account_type}: {count:,} ({pct:.1f}%)")
+    if XISTER_SHARD_POSTS:
+        # Em shards os posts não ficam na memória: só o total é conhecido
+        print(f"  - Total de posts: {xister_df:,} (gerados em shards, estatísticas não calculadas)")
+    else:
+        print(f"  - Total de posts: {len(xister_df):,}")
+        print(f"  - Usuários únicos: {xister_df['username'].nunique():,}")
+        print(f"  - Sentiment médio: {xister_df['sentiment'].mean():.3f}")
+        print(f"  - Total de likes: {xister_df['likes'].sum():,}")
+        print(f"  - Total de reposts: {xister_df['reposts'].sum():,}")
+        
+        print(f"\n  Distribuição por tipo de conta:")
+        for account_type, count in xister_df['account_type'].value_counts().items():
+            pct = count / len(xister_df) * 100
+            print(f"    - {account_type}: {count:,} ({pct:.1f}%)")
     
     print("\n💰 CRIPTOMOEDAS - RESUMO:")
     
-    cryptos = [
-        ('Solana (SOL) - REAL', solana_df),
-        ('RiberCoin (RBC) - FAKE', ribercoin_df),
-        ('NeuronCoin (NRC) - FAKE', neuroncoin_df),
-        ('BonfimCoin (BFC) - FAKE (correlação negativa)', bonfimcoin_df),
-        ('ZephyrCoin (ZPH) - FAKE (ruído)', zephyrcoin_df),
-        ('LunarToken (LNR) - FAKE (falso padrão)', lunartoken_df)
-    ]
+    cryptos = [('Solana (SOL) - REAL', solana_df)]
+    cryptos += [(f"{df['coin_name'].iloc[0]} ({symbol}) - FAKE", df) for symbol, df in market.items()]
     
     for name, df in cryptos:
         var_total = ((df['price_usd'].iloc[-1] / df['price_usd'].iloc[0]) - 1) * 100
@@ -978,25 +1575,55 @@ def main():
         print(f"    - Volatilidade: {df['price_change_pct'].std():.2f}%")
     
     # Mostra correlações
-    print("\n📊 CORRELAÇÕES entre moedas:")
-    rbc_price = ribercoin_df['price_usd']
-    print(f"  - RBC vs BFC: {rbc_price.corr(bonfimcoin_df['price_usd']):.3f} (deve ser NEGATIVA)")
-    print(f"  - RBC vs ZPH: {rbc_price.corr(zephyrcoin_df['price_usd']):.3f} (deve ser próxima de 0)")
-    print(f"  - RBC vs LNR: {rbc_price.corr(lunartoken_df['price_usd']):.3f} (deve ser próxima de 0)")
-    print(f"  - RBC vs SOL: {rbc_price.corr(solana_df['price_usd']):.3f}")
-    print(f"  - RBC vs NRC: {rbc_price.corr(neuroncoin_df['price_usd']):.3f}")
+    print("\n📊 CORRELAÇÕES com a RiberCoin:")
+    rbc_price = market['RBC']['price_usd']
+    for symbol, df in [('SOL', solana_df)] + list(market.items()):
+        if symbol != 'RBC':
+            print(f"  - RBC vs {symbol}: {rbc_price.corr(df['price_usd']):.3f}")
+    
+    # Correlação configurada no motor x correlação obtida nos retornos
+    print("\n🎯 CORRELAÇÕES configuradas (alvo do ruído x retornos gerados):")
+    series = {'SOL': solana_df, **market}
+    for (a, b), rho in COIN_CORRELATIONS.items():
+        if a == 'SOL' or b == 'SOL':
+            # A Solana real tem outro espaçamento: compara os retornos diários
+            daily = [series[symbol].set_index('timestamp')['price_usd'].resample('D').last().pct_change() for symbol in (a, b)]
+            realized = daily[0].corr(daily[1])
+        else:
+            realized = series[a]['price_change_pct'].corr(series[b]['price_change_pct'])
+        print(f"  - {a} vs {b}: alvo {rho:+.2f} | retornos {realized:+.3f}")
+        if not abs(realized - rho) <= CORRELATION_TOLERANCE:
+            print(f"    ⚠ ATENÇÃO: {realized - rho:+.3f} de diferença (tolerância {CORRELATION_TOLERANCE}); "
+                  "eventos, mean reversion e limites de preço enfraquecem a correlação do ruído")
+    
+    # Modo Monte Carlo (opcional)
+    if ENSEMBLE_PATHS > 0:
+        with profiling.stage('ensemble', rows=ENSEMBLE_PATHS * CRYPTO_PRICES * 2):
+            run_ensemble(ENSEMBLE_PATHS, CRYPTO_PRICES, 'ribeirania_events.csv', coins, rng=seed_sequence.spawn(1)[0])
+    
+    profiling.finish()
     
     print("\n" + "=" * 70)
     print(" ✅ GERAÇÃO COMPLETA!")
     print("=" * 70)
     print("\n📂 Arquivos criados:")
-    print("  1. xister_posts.csv (50.000 linhas)")
-    print("  2. solana_prices.csv (50.000 linhas) - DADOS REAIS")
-    print("  3. ribercoin_prices.csv (50.000 linhas) - DADOS FAKE")
-    print("  4. neuroncoin_prices.csv (50.000 linhas) - DADOS FAKE")
-    print("  5. bonfimcoin_prices.csv (50.000 linhas) - CORRELAÇÃO NEGATIVA")
-    print("  6. zephyrcoin_prices.csv (50.000 linhas) - CORTINA DE FUMAÇA")
-    print("  7. lunartoken_prices.csv (50.000 linhas) - CORTINA DE FUMAÇA")
+    if XISTER_SHARD_POSTS:
+        posts_file = 'xister_posts.csv' if XISTER_SHARD_CONCAT else f"{XISTER_SHARD_DIR}/xister_posts.part-*.csv"
+        print(f"  1. {posts_file} ({xister_df:,} linhas, em shards)")
+        print("  2. xister_users.csv")
+    else:
+        print(f"  1. xister_posts.csv ({len(xister_df):,} linhas)")
+        print(f"  2. xister_users.csv ({xister_df['username'].cat.categories.size:,} usuários)")
+    if XISTER_EXPORT == 'normalized':
+        print("     + xister_templates.csv (textos dos posts, por template_id)")
+    if BOT_CAMPAIGNS > 0:
+        print("     + xister_campaigns.csv (gabarito das campanhas de bots)")
+    if XISTER_INTERACTIONS:
+        interactions_file = f"{XISTER_SHARD_DIR}/xister_interactions.part-*.npz" if XISTER_SHARD_POSTS else 'xister_interactions.npz'
+        print(f"     + {interactions_file} (reposts/respostas por post, em CSR)")
+    print(f"  3. solana_prices.csv ({len(solana_df):,} linhas) - DADOS REAIS")
+    for i, coin in enumerate(coins, start=4):
+        print(f"  {i}. {coin_output_file(coin)} ({CRYPTO_PRICES:,} linhas) - DADOS FAKE")
     print("\n💡 Próximo passo:")
     print("  - Execute 'python visualize_data.py' para visualizar correlações")
     print("  - Ou comece a análise dos dados no seu datathon!")
@@ -0,0 +1,107 @@
+"""
+Gabarito do Ruído - Datathon Ribeirania
+Manifesto de cada base suja: de onde veio cada linha e quais corrupções ela recebeu (usado pelo add_noise.py)
+
+Um array por coluna, na mesma ordem das linhas do CSV sujo:
+
+    original_row    linha do CSV limpo de onde ela veio (0 = 1ª linha de dados)
+    duplicate_of    nas duplicatas, a linha do CSV sujo com a cópia original; -1 nas demais
+    corruptions     bitmask uint16: o bit i ligado indica a corrupção flags[i]
+    flags           nome de cada bit (ex: 'missing_price', 'invalid_timestamp')
+
+Fica ao lado do CSV sujo como <base>_dirty.manifest.npz (compactado). Avaliar uma limpeza vira
+junção de arrays, sem comparar textos:
+
+    manifest = load_manifest('ribercoin_prices_dirty.manifest.npz')
+    negativos = has_corruption(manifest, 'negative_price')
+    duplicatas = manifest['duplicate_of'] >= 0
+"""
+
+import os
+import shutil
+
+import numpy as np
+from numpy.lib.format import open_memmap
+
+# Linhas por bloco ao calcular duplicate_of no ManifestWriter
+MANIFEST_BLOCK = 8_000_000
+
+
+def manifest_path(dirty_path):
+    """ribercoin_prices_dirty.csv -> ribercoin_prices_dirty.manifest.npz"""
+    return os.path.splitext(dirty_path)[0] + '.manifest.npz'
+
+
+def row_dtype(num_rows):
+    """int32 enquanto couber (metade do espaço), senão int64"""
+    return np.int32 if num_rows < 2**31 else np.int64
+
+
+def save_manifest(path, original_row, duplicate_of, corruptions, flags):
+    """Grava o manifesto em .npz compactado (aceita arrays mapeados em disco, gravados em blocos)"""
+    dtype = row_dtype(len(original_row))
+    np.savez_compressed(path, original_row=np.asarray(original_row).astype(dtype, copy=False),
+                        duplicate_of=np.asarray(duplicate_of).astype(dtype, copy=False),
+                        corruptions=np.asarray(corruptions, dtype=np.uint16), flags=np.array(flags))
+
+
+def load_manifest(path):
+    """Manifesto em dicionário: original_row, duplicate_of, corruptions (arrays) e flags (lista)"""
+    with np.load(path) as data:
+        manifest = {name: data[name] for name in ('original_row', 'duplicate_of', 'corruptions')}
+        manifest['flags'] = data['flags'].tolist()
+    return manifest
+
+
+def has_corruption(manifest, flag):
+    """Linhas (bool) que receberam a corrupção flag"""
+    bit = np.uint16(1 << manifest['flags'].index(flag))
+    return (manifest['corruptions'] & bit) != 0
+
+
+class ManifestWriter:
+    """
+    Monta o manifesto em blocos, na ordem do CSV sujo (modo streaming), com os arrays em arquivos
+    .npy mapeados em disco: a memória não cresce com o tamanho da base
+    """
+
+    def __init__(self, path, num_rows, num_original, flags, tmp_dir):
+        os.makedirs(tmp_dir, exist_ok=True)
+        self.path = path
+        self.flags = flags
+        self.tmp_dir = tmp_dir
+        self.rows = 0
+        dtype = row_dtype(max(num_rows, num_original))
+
+        def array(name, dtype, size):
+            return open_memmap(os.path.join(tmp_dir, f'{name}.npy'), mode='w+', dtype=dtype, shape=(size,))
+
+        self.original_row = array('original_row', dtype, num_rows)
+        self.is_duplicate = array('is_duplicate', bool, num_rows)
+        self.corruptions = array('corruptions', np.uint16, num_rows)
+        # Linha do CSV sujo de cada linha original (para apontar as duplicatas no final)
+        self.position = array('position', dtype, num_original)
+
+    def add(self, original_row, is_duplicate, corruptions):
+        """Acrescenta as próximas linhas do CSV sujo"""
+        start, stop = self.rows, self.rows + len(original_row)
+        self.original_row[start:stop] = original_row
+        self.is_duplicate[start:stop] = is_duplicate
+        self.corruptions[start:stop] = corruptions
+        originals = np.flatnonzero(~np.asarray(is_duplicate))
+        self.position[np.asarray(original_row)[originals]] = start + originals
+        self.rows = stop
+
+    def close(self):
+        """Calcula duplicate_of, grava o .npz e apaga os arquivos temporários"""
+        duplicate_of = open_memmap(os.path.join(self.tmp_dir, 'duplicate_of.npy'), mode='w+',
+                                   dtype=self.original_row.dtype, shape=(self.rows,))
+        for start in range(0, self.rows, MANIFEST_BLOCK):
+            stop = min(start + MANIFEST_BLOCK, self.rows)
+            copies = self.is_duplicate[start:stop]
+            block = np.full(stop - start, -1, dtype=duplicate_of.dtype)
+            block[copies] = self.position[self.original_row[start:stop][copies]]
+            duplicate_of[start:stop] = block
+        save_manifest(self.path, self.original_row[:self.rows], duplicate_of, self.corruptions[:self.rows], self.flags)
+        del duplicate_of, self.original_row, self.is_duplicate, self.corruptions, self.position
+        shutil.rmtree(self.tmp_dir, ignore_errors=True)
@@ -0,0 +1,161 @@
+"""
+Plano de Ruído - Datathon Ribeirania
+Planeja todas as corrupções de um dataset antes de tocar nos dados (usado pelo add_noise.py)
+
+Em vez de copiar o DataFrame e passar por ele inteiro a cada corrupção (np.random.choice + df.loc,
+pd.concat para as duplicatas, sample(frac=1) para embaralhar), cada corrupção é só registrada:
+(coluna, linhas, novos valores ou função). As linhas são "virtuais": 0..n-1 são as linhas
+originais e cada duplicata ganha o número seguinte, guardando a linha de origem. Uma duplicata
+copia a linha como ela estava no momento da duplicação, então as corrupções planejadas antes
+também valem para ela.
+
+No final, NoisePlan.build monta o DataFrame sujo de uma vez: uma permutação das linhas virtuais
+vira um único índice de origem (um gather por coluna, já embaralhado) e cada coluna recebe as
+suas corrupções, na ordem em que foram planejadas.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def sample_rows(num_rows, size, rng):
+    """size linhas distintas de [0, num_rows), em ordem aleatória, sem permutar as num_rows linhas"""
+    size = min(int(size), num_rows)
+    if size * 4 > num_rows:
+        return rng.permutation(num_rows)[:size]
+    # Amostra pequena: sorteia com reposição, remove repetidas e completa se faltar
+    chosen = np.unique(rng.integers(0, num_rows, size + size // 8 + 16))
+    while len(chosen) < size:
+        chosen = np.union1d(chosen, rng.integers(0, num_rows, size - len(chosen) + 16))
+    return rng.permutation(chosen)[:size]
+
+
+def assign(values, positions, new_values):
+    """values[positions] = new_values, mudando o tipo do array quando necessário (ex: NaN em inteiros)"""
+    new_values = np.asarray(new_values)
+    if values.dtype.kind in 'iub' and new_values.dtype.kind == 'f':
+        values = values.astype(float)
+    elif values.dtype.kind != 'O' and new_values.dtype.kind in 'OUS':
+        values = values.astype(object)
+    values[positions] = new_values
+    return values
+
+
+class NoisePlan:
+    """Corrupções planejadas para um DataFrame de num_rows linhas"""
+
+    def __init__(self, num_rows, rng=None):
+        self.num_rows = num_rows
+        self.rng = np.random.default_rng(rng)
+        self.duplicate_of = np.zeros(0, dtype=np.int64)
+        # (coluna, linhas virtuais, valores ou função, argumentos por linha, rótulo, duplicatas já existentes)
+        self.operations = []
+
+    def __len__(self):
+        """Número de linhas virtuais (originais + duplicatas)"""
+        return self.num_rows + len(self.duplicate_of)
+
+    def sample(self, size, candidates=None):
+        """size linhas virtuais distintas, em ordem aleatória (só entre candidates, se dado)"""
+        if candidates is None:
+            return sample_rows(len(self), size, self.rng)
+        return np.asarray(candidates)[sample_rows(len(candidates), size, self.rng)]
+
+    def duplicate(self, rows):
+        """Acrescenta uma cópia de cada linha original em rows; retorna as linhas virtuais das cópias"""
+        rows = np.asarray(rows, dtype=np.int64)
+        if len(rows) > 0 and rows.max() >= self.num_rows:
+            raise ValueError("Só linhas originais podem ser duplicadas")
+        copies = np.arange(len(self), len(self) + len(rows))
+        self.duplicate_of = np.concatenate((self.duplicate_of, rows))
+        return copies
+
+    def set(self, column, rows, values, label):
+        """column[rows] = values (um valor só ou um por linha)"""
+        self.operations.append((column, np.asarray(rows, dtype=np.int64), values, (), label, len(self.duplicate_of)))
+
+    def transform(self, column, rows, function, label, *row_args):
+        """column[rows] = function(valores atuais, *row_args), com row_args alinhados com rows"""
+        self.operations.append((column, np.asarray(rows, dtype=np.int64), function, row_args, label,
+                                len(self.duplicate_of)))
+
+    def sources(self):
+        """Linha original de cada linha virtual"""
+        return np.concatenate((np.arange(self.num_rows), self.duplicate_of))
+
+    def operation_rows(self, operation):
+        """
+        Linhas virtuais atingidas por uma corrupção: as planejadas mais as duplicatas criadas depois
+        a partir delas; retorna (linhas, posição de cada uma em rows, para alinhar valores por linha)
+        """
+        _, rows, _, _, _, duplicates_before = operation
+        later = self.duplicate_of[duplicates_before:]
+        hits = np.flatnonzero(np.isin(later, rows)) if len(later) > 0 else np.zeros(0, dtype=np.int64)
+        if len(hits) == 0:
+            return rows, np.arange(len(rows))
+        sorter = np.argsort(rows, kind='stable')
+        source_index = sorter[np.searchsorted(rows, later[hits], sorter=sorter)]
+        copies = self.num_rows + duplicates_before + hits
+        return np.concatenate((rows, copies)), np.concatenate((np.arange(len(rows)), source_index))
+
+    def build(self, df, shuffle=True):
+        """
+        DataFrame sujo: linhas originais + duplicatas, embaralhadas com uma única permutação,
+        cada coluna copiada uma vez e corrompida na ordem planejada
+        Guarda a ordem final em self.order (linha virtual de cada linha da saída) e self.position (o inverso)
+        """
+        num_virtual = len(self)
+        self.order = self.rng.permutation(num_virtual) if shuffle else np.arange(num_virtual)
+        self.position = position = np.empty(num_virtual, dtype=np.int64)
+        position[self.order] = np.arange(num_virtual)
+        gather = self.sources()[self.order]
+
+        by_column = {}
+        for operation in self.operations:
+            by_column.setdefault(operation[0], []).append(operation)
+
+        columns = {}
+        for column in df.columns:
+            values = df[column].to_numpy()[gather]
+            for operation in by_column.get(column, []):
+                _, _, change, row_args, _, _ = operation
+                rows, value_index = self.operation_rows(operation)
+                positions = position[rows]
+                if callable(change):
+                    args = [np.asarray(arg)[value_index] for arg in row_args]
+                    values = assign(values, positions, change(values[positions], *args))
+                else:
+                    new_values = change if np.ndim(change) == 0 else np.asarray(change)[value_index]
+                    values = assign(values, positions, new_values)
+            dtype = df[column].dtype
+            if values.dtype == object and not isinstance(dtype, np.dtype):
+                # Volta ao tipo original (ex: str) sem a inferência de tipo do pandas, que gasta ~50 bytes/linha
+                values = pd.array(values, dtype=dtype)
+            columns[column] = values
+        # As colunas já são cópias novas: copy=False evita o pandas copiar tudo de novo
+        return pd.DataFrame(columns, copy=False)
+
+    def corruption_mask(self, flags):
+        """Bitmask uint16 das corrupções de cada linha da saída do build (bit i = rótulo flags[i])"""
+        if len(flags) > 16:
+            raise ValueError(f"No máximo 16 rótulos de corrupção por base (recebidos {len(flags)})")
+        bits = {flag: np.uint16(1 << i) for i, flag in enumerate(flags)}
+        unknown = {operation[4] for operation in self.operations} - set(bits)
+        if unknown:
+            raise ValueError(f"Corrupções sem bit no manifesto: {sorted(unknown)}")
+        mask = np.zeros(len(self), dtype=np.uint16)
+        for operation in self.operations:
+            rows, _ = self.operation_rows(operation)
+            mask[self.position[rows]] |= bits[operation[4]]
+        return mask
+
+    def manifest(self, flags):
+        """
+        Gabarito de cada linha da saída do build: (linha original, linha da saída com a cópia original
+        para duplicatas ou -1, bitmask das corrupções)
+        """
+        original_row = self.sources()[self.order]
+        duplicate_of = np.full(len(self), -1, dtype=np.int64)
+        copies = self.order >= self.num_rows
+        duplicate_of[copies] = self.position[original_row[copies]]
+        return original_row, duplicate_of, self.corruption_mask(flags)
@@ -0,0 +1,125 @@
+"""
+Ruído em Streaming - Datathon Ribeirania
+Peças para sujar CSVs maiores que a memória, bloco a bloco (usado pelo add_noise.py)
+
+    NoiseBudget          reparte o total de cada corrupção entre os blocos (hipergeométrica), então
+                         o arquivo inteiro recebe exatamente as mesmas quantidades da versão em memória
+    DuplicateReservoir   amostra uniforme (algoritmo R) de até capacity linhas já lidas; as duplicatas
+                         saem dela, então podem copiar linhas de blocos anteriores
+    BucketShuffler       embaralhamento externo: cada linha vai para um balde temporário sorteado e
+                         cada balde (~ um bloco) é embaralhado na memória no final
+
+A memória fica limitada ao tamanho do bloco + reservatório, qualquer que seja o tamanho do arquivo.
+"""
+
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+
+class NoiseBudget:
+    """Quantas linhas de cada corrupção ainda faltam sortear no arquivo"""
+
+    def __init__(self, counts, rng):
+        self.remaining = dict(counts)
+        self.rng = rng
+
+    def take(self, name, population, remaining_population):
+        """
+        Parte de name que cai em um bloco com population linhas, de remaining_population ainda não
+        processadas: hipergeométrica, igual a sortear as linhas no arquivo todo de uma vez
+        """
+        left = self.remaining[name]
+        others = remaining_population - population
+        if others <= 0:
+            count = min(left, population)
+        else:
+            count = int(self.rng.hypergeometric(population, others, min(left, remaining_population)))
+        self.remaining[name] -= count
+        return count
+
+    def give_back(self, name, count):
+        """Devolve count linhas que não puderam ser usadas neste bloco (ficam para os próximos)"""
+        self.remaining[name] += count
+
+
+class DuplicateReservoir:
+    """Amostra uniforme de até capacity linhas já lidas (algoritmo R), de onde saem as duplicatas"""
+
+    def __init__(self, capacity, rng):
+        self.capacity = max(int(capacity), 1)
+        self.rng = rng
+        self.seen = 0
+        self.frame = None
+
+    def __len__(self):
+        return 0 if self.frame is None else len(self.frame)
+
+    def add(self, chunk):
+        """Passa as linhas de um bloco pelo reservatório"""
+        free = self.capacity - len(self)
+        head, tail = chunk.iloc[:free], chunk.iloc[free:]
+        self.frame = head.copy() if self.frame is None else pd.concat([self.frame, head], ignore_index=True)
+
+        # Reservatório cheio: a t-ésima linha lida entra com chance capacity / t no lugar de uma sorteada
+        positions = self.seen + len(head) + 1 + np.arange(len(tail))
+        accepted = np.flatnonzero(self.rng.random(len(tail)) < self.capacity / positions)
+        slots = self.rng.integers(0, self.capacity, len(accepted))
+        # Duas linhas sorteadas para a mesma vaga: fica a última
+        _, last = np.unique(slots[::-1], return_index=True)
+        last = len(slots) - 1 - last
+        if len(last) > 0:
+            keep = np.ones(len(self.frame), dtype=bool)
+            keep[slots[last]] = False
+            self.frame = pd.concat([self.frame[keep], tail.iloc[accepted[last]]], ignore_index=True)
+        self.seen += len(chunk)
+
+    def pop(self, count):
+        """Tira count linhas sorteadas do reservatório (cada linha vira duplicata uma vez só)"""
+        taken = self.rng.choice(len(self), min(count, len(self)), replace=False)
+        rows = self.frame.iloc[taken].reset_index(drop=True)
+        keep = np.ones(len(self.frame), dtype=bool)
+        keep[taken] = False
+        self.frame = self.frame[keep].reset_index(drop=True)
+        return rows
+
+
+class BucketShuffler:
+    """
+    Embaralhamento externo em num_buckets baldes temporários (pickle, sem perder tipos nem casas decimais)
+    Balde sorteado para cada linha + ordem aleatória dentro de cada balde = permutação uniforme do arquivo
+    """
+
+    def __init__(self, directory, num_buckets, rng):
+        os.makedirs(directory, exist_ok=True)
+        self.paths = [os.path.join(directory, f'bucket_{bucket:05d}.pkl') for bucket in range(num_buckets)]
+        self.rng = rng
+
+    def add(self, df):
+        """Espalha as linhas de df pelos baldes"""
+        bucket = self.rng.integers(0, len(self.paths), len(df))
+        order = np.argsort(bucket, kind='stable')
+        bounds = np.searchsorted(bucket[order], np.arange(len(self.paths) + 1))
+        for index, path in enumerate(self.paths):
+            rows = order[bounds[index]:bounds[index + 1]]
+            if len(rows) > 0:
+                with open(path, 'ab') as f:
+                    pickle.dump(df.iloc[rows].reset_index(drop=True), f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def buckets(self):
+        """Cada balde já embaralhado (DataFrame); o arquivo temporário é apagado depois de lido"""
+        for path in self.paths:
+            if not os.path.exists(path):
+                continue
+            pieces = []
+            with open(path, 'rb') as f:
+                while True:
+                    try:
+                        pieces.append(pickle.load(f))
+                    except EOFError:
+                        break
+            os.remove(path)
+            bucket = pd.concat(pieces, ignore_index=True)
+            yield bucket.take(self.rng.permutation(len(bucket)))
@@ -0,0 +1,113 @@
+"""
+Chegada dos Posts - Datathon Ribeirania
+Sorteia os horários dos posts do Xister como um processo de Poisson não homogêneo
+
+O período é dividido em faixas de 1 hora, e cada faixa recebe uma intensidade (posts esperados
+por hora, em escala relativa) que combina:
+    hora do dia        madrugada quieta, picos no almoço e à noite
+    dia da semana      mais posts na sexta e no fim de semana
+    eventos ativos     soma da intensidade dos eventos de Ribeirania em andamento
+    volatilidade       variação média (absoluta) das moedas comentadas naquela hora
+
+Dado o total de posts, um processo de Poisson com intensidade constante por faixa equivale a
+sortear quantos posts caem em cada faixa (multinomial) e espalhá-los uniformemente dentro dela.
+Tudo é feito em arrays, sem loop por post, e os horários saem ordenados. As contagens por faixa
+também permitem sortear os horários só de um bloco de faixas por vez (bin_arrivals).
+"""
+
+import numpy as np
+
+# Largura de cada faixa de intensidade, em ns (1 hora)
+BIN_NS = 3600 * 10**9
+
+# Atividade relativa por hora do dia (0h ... 23h)
+HOURLY_ACTIVITY = np.array([
+    0.45, 0.30, 0.20, 0.15, 0.12, 0.15, 0.30, 0.55, 0.80, 0.90, 0.95, 1.05,
+    1.25, 1.20, 1.00, 0.95, 0.95, 1.05, 1.20, 1.40, 1.55, 1.60, 1.35, 0.85,
+])
+
+# Atividade relativa por dia da semana (segunda=0 ... domingo=6)
+WEEKDAY_ACTIVITY = np.array([0.95, 0.95, 0.95, 1.00, 1.10, 1.15, 1.10])
+
+# Volatilidade relativa máxima considerada (em múltiplos da volatilidade típica, a mediana):
+# durante um pump/crash as variações batem no limite da moeda por horas seguidas
+VOLATILITY_CAP = 5.0
+
+
+def bin_edges(start_ns, end_ns, bin_ns=BIN_NS):
+    """Limites das faixas [start_ns, end_ns), de bin_ns em bin_ns (a última pode ser menor)"""
+    edges = np.arange(start_ns, end_ns, bin_ns, dtype=np.int64)
+    return np.append(edges, np.int64(end_ns))
+
+
+def calendar_intensity(edges):
+    """Fator de hora do dia x dia da semana de cada faixa (pelo início da faixa)"""
+    starts = edges[:-1]
+    hours = starts // BIN_NS % 24
+    # 01/01/1970 (dia 0 dos timestamps) foi uma quinta-feira
+    weekdays = (starts // (24 * BIN_NS) + 3) % 7
+    return HOURLY_ACTIVITY[hours] * WEEKDAY_ACTIVITY[weekdays]
+
+
+def event_intensity(event_index, edges, weight):
+    """1 + weight x (soma da intensidade dos eventos ativos no meio de cada faixa)"""
+    middles = edges[:-1] + np.diff(edges) // 2
+    event_idx, bin_idx = event_index.active_pairs(middles)
+    active = np.bincount(bin_idx, weights=event_index.events['intensity'][event_idx], minlength=len(middles))
+    return 1 + weight * active
+
+
+def volatility_intensity(price_series, edges, weight):
+    """
+    Fator de volatilidade de cada faixa: (1 + weight x vol relativa) / (1 + weight), 1 na volatilidade típica
+    price_series: [(timestamps em ns, variações %, peso da moeda), ...]; a volatilidade da faixa é a
+    média de |variação| dos registros nela (faixas sem registro repetem a anterior), relativa à
+    mediana da moeda e limitada a VOLATILITY_CAP
+    """
+    num_bins = len(edges) - 1
+    volatility = np.zeros(num_bins)
+    total_weight = 0.0
+
+    for times_ns, changes, coin_weight in price_series:
+        bins = np.searchsorted(edges, times_ns, side='right') - 1
+        inside = (bins >= 0) & (bins < num_bins) & ~np.isnan(changes)
+        if not inside.any():
+            continue
+        count = np.bincount(bins[inside], minlength=num_bins)
+        total = np.bincount(bins[inside], weights=np.abs(changes[inside]), minlength=num_bins)
+
+        # Repete o último valor conhecido nas faixas vazias (antes do 1° registro, usa o 1°)
+        last_filled = np.maximum.accumulate(np.where(count > 0, np.arange(num_bins), 0))
+        last_filled[:np.argmax(count > 0)] = np.argmax(count > 0)
+        mean = total[last_filled] / count[last_filled]
+        typical = np.median(mean)
+        if typical > 0:
+            volatility += coin_weight * np.minimum(mean / typical, VOLATILITY_CAP)
+            total_weight += coin_weight
+
+    if total_weight == 0:
+        return np.ones(num_bins)
+    return (1 + weight * volatility / total_weight) / (1 + weight)
+
+
+def sample_arrivals(num_posts, edges, intensity, rng):
+    """Horários (ns, ordenados) de num_posts chegadas com intensidade constante em cada faixa"""
+    return bin_arrivals(arrival_counts(num_posts, edges, intensity, rng), edges, rng)
+
+
+def arrival_counts(num_posts, edges, intensity, rng):
+    """Quantos posts caem em cada faixa: multinomial com probabilidade proporcional a intensidade x largura"""
+    mass = np.asarray(intensity, dtype=float) * np.diff(edges)
+    return rng.multinomial(num_posts, mass / mass.sum())
+
+
+def bin_arrivals(counts, edges, rng):
+    """
+    Espalha counts[i] posts uniformemente em [edges[i], edges[i+1]) e devolve os horários ordenados
+    Como as faixas não se sobrepõem, a ordenação só reorganiza os posts dentro de cada faixa
+    """
+    counts = np.asarray(counts)
+    times = np.repeat(edges[:-1], counts)
+    times += (rng.random(len(times)) * np.repeat(np.diff(edges), counts)).astype(np.int64)
+    times.sort()
+    return times
@@ -0,0 +1,102 @@
+"""
+Textos dos Posts - Datathon Ribeirania
+Expande os placeholders dos templates do Xister em lote
+
+Um template pode citar valores do momento do post:
+    {coin}  símbolo da moeda comentada (ex: RBC)
+    {price} preço dessa moeda no momento do post
+    {pct}   variação da moeda nas últimas 24h (ex: +3.2%)
+    {user}  username de outro usuário (menção)
+    {event} evento de Ribeirania mais recente
+Chaves literais são escritas dobradas: {{ e }}.
+
+Cada placeholder chega como uma tabela pequena de textos + um código por post, e números
+só são formatados uma vez por valor distinto. Os posts são agrupados por template e cada
+grupo é montado com concatenação vetorizada (np.char.add), sem .format por linha.
+"""
+
+import string
+
+import numpy as np
+
+PLACEHOLDERS = ('coin', 'price', 'pct', 'user', 'event')
+
+
+def parse_template(text):
+    """Divide o template em [(texto literal, placeholder ou None), ...]"""
+    parts = []
+    for literal, field, format_spec, conversion in string.Formatter().parse(text):
+        if field is not None and (field not in PLACEHOLDERS or format_spec or conversion):
+            raise ValueError(f"Placeholder inválido no template: {{{field}}} em {text!r}")
+        parts.append((literal, field))
+    return parts
+
+
+def template_fields(texts):
+    """Placeholders usados por cada texto (lista de sets, na ordem de texts)"""
+    return [{field for _, field in parse_template(text) if field} for text in texts]
+
+
+def format_distinct(keys, formatter):
+    """
+    Formata só os valores distintos de keys: devolve (tabela de textos, código de cada post)
+    formatter recebe o array de valores distintos e devolve a lista de textos
+    """
+    distinct, codes = np.unique(keys, return_inverse=True)
+    return np.array(formatter(distinct), dtype=str), codes.ravel()
+
+
+def price_strings(prices):
+    """Preços com 2 casas (>= 1) ou 4 casas (< 1), formatados por valor distinto"""
+    prices = np.nan_to_num(np.asarray(prices, dtype=float))
+    small = prices < 1
+    # Chave inteira = preço arredondado na casa certa, com o bit final indicando 4 casas
+    keys = np.round(prices * np.where(small, 10_000, 100)).astype(np.int64) * 2 + small
+    return format_distinct(keys, lambda distinct: [
+        f"{key // 2 / 10_000:.4f}" if key % 2 else f"{key // 2 / 100:.2f}" for key in distinct.tolist()
+    ])
+
+
+def pct_strings(pcts):
+    """Variações com sinal e 1 casa (ex: +3.2%), formatadas por valor distinto"""
+    tenths = np.round(np.nan_to_num(np.asarray(pcts, dtype=float)) * 10).astype(np.int64)
+    return format_distinct(tenths, lambda distinct: [f"{tenth / 10:+.1f}%" for tenth in distinct.tolist()])
+
+
+def render_texts(text_codes, texts, fields):
+    """
+    Monta o texto final de cada post
+    text_codes: código do texto (template) de cada post; texts: textos distintos
+    fields: {placeholder: (tabela de textos, código de cada post)} para os placeholders usados
+    Retorna um array object com um texto por post
+    """
+    text_codes = np.asarray(text_codes)
+    rendered = np.empty(len(text_codes), dtype=object)
+    if len(text_codes) == 0:
+        return rendered
+    parsed = [parse_template(text) for text in texts]
+
+    # Agrupa os posts por template (ordenação estável dos códigos)
+    order = np.argsort(text_codes, kind='stable')
+    codes_sorted = text_codes[order]
+    starts = np.flatnonzero(np.r_[True, codes_sorted[1:] != codes_sorted[:-1]])
+    ends = np.r_[starts[1:], len(order)]
+
+    for start, end in zip(starts, ends):
+        rows = order[start:end]
+        parts = parsed[codes_sorted[start]]
+        if not any(field for _, field in parts):
+            rendered[rows] = ''.join(literal for literal, _ in parts)
+            continue
+
+        text = None
+        for literal, field in parts:
+            pieces = [literal] if literal else []
+            if field:
+                table, codes = fields[field]
+                pieces.append(np.asarray(table[codes[rows]], dtype=str))
+            for piece in pieces:
+                text = piece if text is None else np.char.add(text, piece)
+        rendered[rows] = text
+
+    return rendered
@@ -0,0 +1,177 @@
+"""
+Kernels de Recorrência de Preços - Datathon Ribeirania
+Núcleo compilado (JIT) da recorrência de preços do motor multi-moeda (main_generator.py)
+
+Moedas com mean reversion não podem ser geradas com um cumprod simples: a variação depende do
+preço anterior. O motor sorteia todo o ruído e os eventos em arrays e passa uma matriz (K, n),
+uma linha por (caminho, moeda), para price_recurrence_paths; só a atualização escalar do preço
+roda em um loop apertado. Sem mean reversion a variação já sai dos choques e o preço vem de
+FlooredCumprod, um cumprod vetorizado (em log) com piso exato e teto.
+
+Se o numba estiver instalado (pip install numba) o loop é compilado; senão os caminhos
+avançam juntos em numpy, com o mesmo resultado.
+"""
+
+import numpy as np
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+
+def _price_recurrence_paths(start_prices, shocks, reversion, targets,
+                            step_min, step_max, price_min, price_max):
+    # Recorrência de price_recurrence, aplicada a K caminhos independentes
+    n_paths, n = shocks.shape
+    prices = np.empty((n_paths, n))
+
+    for k in range(n_paths):
+        price = start_prices[k]
+        for i in range(n):
+            change = 1.0 + shocks[k, i] + reversion[k, i] * (targets[k, i] - price)
+            if change < step_min[k]:
+                change = step_min[k]
+            elif change > step_max[k]:
+                change = step_max[k]
+
+            price = price * change
+            if price < price_min[k]:
+                price = price_min[k]
+            elif price > price_max[k]:
+                price = price_max[k]
+
+            prices[k, i] = price
+
+    return prices
+
+
+def _price_recurrence_paths_numpy(start_prices, shocks, reversion, targets,
+                                  step_min, step_max, price_min, price_max):
+    # Sem JIT: avança no tempo e atualiza todos os caminhos de uma vez em cada passo
+    n_paths, n = shocks.shape
+    prices = np.empty((n_paths, n))
+    price = start_prices.copy()
+
+    for i in range(n):
+        change = 1.0 + shocks[:, i] + reversion[:, i] * (targets[:, i] - price)
+        change = np.clip(change, step_min, step_max)
+        price = np.clip(price * change, price_min, price_max)
+        prices[:, i] = price
+
+    return prices
+
+
+if NUMBA_AVAILABLE:
+    _price_recurrence_paths_jit = njit(cache=True)(_price_recurrence_paths)
+
+
+def price_recurrence_paths(start_prices, shocks, reversion=0.0, targets=0.0,
+                           step_min=-np.inf, step_max=np.inf,
+                           price_min=-np.inf, price_max=np.inf):
+    """
+    Recorrência de price_recurrence em K caminhos: shocks tem formato (K, n), um caminho por linha
+
+    start_prices e os limites podem ser escalares ou arrays de tamanho K (um valor por
+    caminho); reversion e targets podem ser escalares, (n,) compartilhado entre os
+    caminhos, ou (K, n). Retorna a matriz (K, n) de preços
+    """
+    # Sem forçar cópia contígua: fatias como shocks[:, 1:] entram direto no kernel
+    shocks = np.asarray(shocks, dtype=np.float64)
+    n_paths = shocks.shape[0]
+
+    # Broadcast sem copiar: arrays compartilhados (ex: alvo do ciclo) não viram matriz K x n
+    reversion = np.broadcast_to(np.asarray(reversion, dtype=np.float64), shocks.shape)
+    targets = np.broadcast_to(np.asarray(targets, dtype=np.float64), shocks.shape)
+    start_prices = np.ascontiguousarray(np.broadcast_to(start_prices, (n_paths,)), dtype=np.float64)
+    limits = [
+        np.ascontiguousarray(np.broadcast_to(limit, (n_paths,)), dtype=np.float64)
+        for limit in (step_min, step_max, price_min, price_max)
+    ]
+
+    if NUMBA_AVAILABLE:
+        return _price_recurrence_paths_jit(start_prices, shocks, reversion, targets, *limits)
+    return _price_recurrence_paths_numpy(start_prices, shocks, reversion, targets, *limits)
+
+
+class FlooredCumprod:
+    """
+    Equivale ao loop preço = clip(preço * fator, piso, teto) em K caminhos, sem loop em Python por registro
+    Os fatores devem ser > 0 e o piso > 0. Trabalha em log: com y = log(preço / piso) e S = soma
+    acumulada dos log(fator), enquanto o preço não bate no teto y_t = S_t - min(0, mínimo acumulado
+    de S) (o piso é exato: y = 0). Ao bater no teto a solução troca para y_t = log(teto / piso) -
+    (máximo acumulado de S - S_t), até voltar ao piso. advance(factors) continua de onde parou, e
+    o resultado não depende do tamanho dos blocos
+    """
+
+    # Registros olhados à frente em cada busca pela próxima troca entre piso e teto (dobra a cada busca vazia)
+    WINDOW = 1024
+
+    def __init__(self, start_prices, floor, cap=np.inf):
+        self.floor = np.array(np.broadcast_to(floor, np.shape(start_prices)), dtype=np.float64)
+        self.cap = np.array(np.broadcast_to(cap, self.floor.shape), dtype=np.float64)
+        self.height = np.log(self.cap / self.floor)
+        # Estado de cada caminho: S atual, se está preso ao teto e o extremo acumulado de S
+        self.total = np.log(np.asarray(start_prices, dtype=np.float64) / self.floor)
+        self.at_cap = np.zeros(self.floor.shape, dtype=bool)
+        self.extreme = np.zeros(self.floor.shape)
+
+    def advance(self, factors):
+        """Preços (K, n) para os fatores (K, n) seguintes"""
+        factors = np.asarray(factors, dtype=np.float64)
+        log_prices = np.empty(factors.shape)
+        for k in range(factors.shape[0]):
+            log_prices[k] = self._advance_path(k, np.log(factors[k]))
+        # Preso ao teto, o preço é o teto exato (e não piso * exp(log(teto / piso)))
+        at_cap = log_prices >= self.height[:, None]
+        return np.where(at_cap, self.cap[:, None], self.floor[:, None] * np.exp(log_prices))
+
+    def _advance_path(self, k, log_factors):
+        # Soma acumulada continuando de S (sequencial, igual à da série inteira)
+        total = np.cumsum(np.concatenate(([self.total[k]], log_factors)))[1:]
+        height = self.height[k]
+        log_prices = np.empty(len(total))
+        i, window = 0, self.WINDOW
+        while i < len(total):
+            segment = total[i:i + window]
+            if self.at_cap[k]:
+                extreme = np.maximum.accumulate(np.concatenate(([self.extreme[k]], segment)))[1:]
+                values = height + (segment - extreme)
+                switch = np.flatnonzero(values < 0)
+            else:
+                extreme = np.minimum.accumulate(np.concatenate(([self.extreme[k]], segment)))[1:]
+                values = segment - extreme
+                switch = np.flatnonzero(values > height)
+
+            if len(switch) == 0:
+                log_prices[i:i + len(segment)] = values
+                self.extreme[k] = extreme[-1]
+                i, window = i + len(segment), window * 2
+            else:
+                # Passou do limite: a partir desse registro a outra solução vale, com extremo = S dele
+                j = switch[0]
+                log_prices[i:i + j] = values[:j]
+                self.at_cap[k] = not self.at_cap[k]
+                self.extreme[k] = segment[j]
+                i, window = i + j, self.WINDOW
+
+        if len(total) > 0:
+            self.total[k] = total[-1]
+        return log_prices
+
+
+def price_recurrence(start_price, shocks, reversion=0.0, targets=0.0,
+                     step_min=-np.inf, step_max=np.inf,
+                     price_min=-np.inf, price_max=np.inf):
+    """
+    Aplica passo a passo:
+        variação = clip(1 + choque + reversão * (alvo - preço_anterior), step_min, step_max)
+        preço = clip(preço_anterior * variação, price_min, price_max)
+
+    Um caminho só (price_recurrence_paths com K = 1); reversion e targets podem ser escalares
+    ou arrays do tamanho de shocks. Retorna o array de preços (um por choque), sem incluir start_price
+    """
+    shocks = np.asarray(shocks, dtype=np.float64)
+    return price_recurrence_paths(start_price, shocks[None, :], np.asarray(reversion, dtype=np.float64),
+                                  np.asarray(targets, dtype=np.float64), step_min, step_max, price_min, price_max)[0]
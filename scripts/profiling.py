@@ -0,0 +1,299 @@
+"""
+Profiling do Pipeline - Datathon Ribeirania
+Mede tempo, memória e vazão de cada etapa da geração (main_generator.py e add_noise.py)
+
+Cada etapa é marcada com `with profiling.stage('nome', rows=n):`. Para cada uma são
+registrados tempo total (wall) e de CPU, o tempo gasto em leitura/escrita de CSV
+(profiling.read_csv / profiling.to_csv) separado do cálculo, linhas por segundo e o
+pico de memória (RSS) durante a etapa. No Linux o pico do processo (VmHWM) é zerado no
+início de cada etapa, então cada uma mede só a própria memória, mesmo depois de uma etapa
+maior ou em um worker reaproveitado; em outros sistemas só o pico acumulado do processo
+(process_peak_rss_mb) é registrado. Ao final, profiling.finish() grava um relatório JSON
+ao lado dos arquivos gerados e, opcionalmente, o cProfile (.prof) da etapa mais lenta:
+
+    python -m pstats main_generator_slowest.prof
+
+Sem profiling.start() as funções continuam funcionando, só não medem nada.
+"""
+
+import cProfile
+import json
+import marshal
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+
+try:
+    import resource
+except ImportError:
+    # Windows: sem getrusage, o pico de memória fica de fora do relatório
+    resource = None
+
+# Profiler ativo no processo atual (None = profiling desligado)
+ACTIVE = None
+
+
+def peak_rss_mb():
+    """Pico de memória residente do processo desde o início (ou o último reset_peak_rss), em MB (None se indisponível)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux devolve KB, macOS devolve bytes
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def current_rss_mb():
+    """Memória residente atual do processo, em MB (None fora do Linux)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """Zera o pico de memória do processo (volta ao RSS atual); False se o sistema não permite"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+class PipelineProfiler:
+    """Acumula as medições das etapas de um pipeline"""
+
+    def __init__(self, pipeline, profile_slowest=False):
+        self.pipeline = pipeline
+        self.profile_slowest = profile_slowest
+        self.started_at = datetime.now()
+        self.start_time = time.perf_counter()
+        self.stages = []
+        self.open_stages = []
+        # Pico de cada etapa aberta até o último reset do pico do processo (mesma ordem de open_stages)
+        self.open_peaks = []
+        # O reset também zera o ru_maxrss: o pico do processo inteiro é acumulado aqui
+        self.process_peak = peak_rss_mb()
+        self.stage_peaks = reset_peak_rss()
+        # (segundos, etapa, estatísticas do cProfile) da etapa de topo mais lenta até agora
+        self.slowest_profile = None
+
+    @contextmanager
+    def stage(self, name, rows=None):
+        record = {
+            'stage': name,
+            'pid': os.getpid(),
+            'depth': len(self.open_stages),
+            'rows': rows,
+            'io': {},
+        }
+        profiler = None
+        if self.profile_slowest and not self.open_stages:
+            # Só as etapas de topo: o cProfile não aceita dois perfis ativos ao mesmo tempo
+            profiler = cProfile.Profile()
+
+        if self.stage_peaks:
+            # As etapas abertas guardam o pico até aqui; a nova começa a medir do RSS atual
+            self.fold_peak()
+            reset_peak_rss()
+        self.open_stages.append(record)
+        self.open_peaks.append(0.0)
+        rss_before = current_rss_mb()
+        wall_start = time.perf_counter()
+        cpu_start = time.process_time()
+        if profiler is not None:
+            profiler.enable()
+        try:
+            yield record
+        finally:
+            if profiler is not None:
+                profiler.disable()
+            wall = time.perf_counter() - wall_start
+            self.fold_peak()
+            self.open_stages.pop()
+            stage_peak = self.open_peaks.pop() if self.stage_peaks else None
+
+            io_seconds = sum(io['seconds'] for io in record['io'].values())
+            record.update({
+                'wall_s': wall,
+                'cpu_s': time.process_time() - cpu_start,
+                'io_s': io_seconds,
+                'compute_s': max(wall - io_seconds, 0.0),
+                'rows_per_s': record['rows'] / wall if record['rows'] and wall > 0 else None,
+                'peak_rss_mb': stage_peak,
+                'rss_growth_mb': stage_peak - rss_before if stage_peak is not None and rss_before is not None else None,
+                'process_peak_rss_mb': self.process_peak,
+            })
+            self.stages.append(record)
+
+            if profiler is not None and (self.slowest_profile is None or wall > self.slowest_profile[0]):
+                profiler.create_stats()
+                self.slowest_profile = (wall, name, marshal.dumps(profiler.stats))
+
+    def fold_peak(self):
+        """Leva o pico do processo desde o último reset para as etapas abertas e para o pico total"""
+        peak = peak_rss_mb()
+        if peak is None:
+            return
+        self.open_peaks = [max(open_peak, peak) for open_peak in self.open_peaks]
+        self.process_peak = max(self.process_peak, peak)
+
+    @contextmanager
+    def io(self, kind, rows=None):
+        """Conta o tempo de leitura/escrita em todas as etapas abertas (separado do cálculo)"""
+        counter = {'rows': rows}
+        start = time.perf_counter()
+        try:
+            yield counter
+        finally:
+            seconds = time.perf_counter() - start
+            for record in self.open_stages:
+                totals = record['io'].setdefault(kind, {'seconds': 0.0, 'calls': 0, 'rows': 0})
+                totals['seconds'] += seconds
+                totals['calls'] += 1
+                totals['rows'] += counter['rows'] or 0
+
+    def snapshot(self):
+        """Medições deste processo, para devolver de um worker ao processo principal"""
+        return {'stages': self.stages, 'slowest_profile': self.slowest_profile}
+
+    def merge(self, snapshot):
+        """Incorpora as medições feitas em um worker"""
+        self.stages.extend(snapshot['stages'])
+        theirs = snapshot['slowest_profile']
+        if theirs is not None and (self.slowest_profile is None or theirs[0] > self.slowest_profile[0]):
+            self.slowest_profile = theirs
+
+    def report(self):
+        """Relatório em dicionário (o mesmo conteúdo do JSON)"""
+        top_level = [record for record in self.stages if record['depth'] == 0]
+        slowest = max(top_level, key=lambda record: record['wall_s'], default=None)
+        self.fold_peak()
+        return {
+            'pipeline': self.pipeline,
+            'started_at': self.started_at.isoformat(timespec='seconds'),
+            'total_wall_s': time.perf_counter() - self.start_time,
+            'peak_rss_mb': self.process_peak,
+            'slowest_stage': slowest['stage'] if slowest else None,
+            'stages': self.stages,
+        }
+
+    def write(self, output_dir='.'):
+        """Grava <pipeline>_profile.json (e <pipeline>_slowest.prof); retorna os caminhos"""
+        report = self.report()
+        paths = [os.path.join(output_dir, f"{self.pipeline}_profile.json")]
+
+        if self.slowest_profile is not None:
+            _, name, stats = self.slowest_profile
+            prof_path = os.path.join(output_dir, f"{self.pipeline}_slowest.prof")
+            # Mesmo formato do Profile.dump_stats, legível com pstats
+            with open(prof_path, 'wb') as f:
+                f.write(stats)
+            report['profiled_stage'] = name
+            report['profile_file'] = os.path.basename(prof_path)
+            paths.append(prof_path)
+
+        with open(paths[0], 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        return paths
+
+    def print_summary(self):
+        """Tabela resumida das etapas de topo"""
+        print("\n⏱  PERFIL DAS ETAPAS:")
+        for record in self.stages:
+            if record['depth'] > 0:
+                continue
+            rate = f"{record['rows_per_s']:,.0f} linhas/s" if record['rows_per_s'] else "-"
+            if record['peak_rss_mb'] is not None:
+                memory = f"{record['peak_rss_mb']:,.0f} MB"
+            elif record['process_peak_rss_mb'] is not None:
+                memory = f"{record['process_peak_rss_mb']:,.0f} MB (processo)"
+            else:
+                memory = "-"
+            print(f"  - {record['stage']:<24} {record['wall_s']:8.2f}s "
+                  f"(CSV {record['io_s']:6.2f}s) | {rate:>20} | pico {memory}")
+
+
+def start(pipeline, profile_slowest=False):
+    """Liga o profiling no processo atual"""
+    global ACTIVE
+    ACTIVE = PipelineProfiler(pipeline, profile_slowest)
+    return ACTIVE
+
+
+def finish(output_dir='.'):
+    """Desliga o profiling, mostra o resumo e grava o relatório; retorna os caminhos gravados"""
+    global ACTIVE
+    profiler, ACTIVE = ACTIVE, None
+    if profiler is None:
+        return []
+    profiler.print_summary()
+    paths = profiler.write(output_dir)
+    for path in paths:
+        print(f"✓ Salvo: {path}")
+    return paths
+
+
+@contextmanager
+def stage(name, rows=None):
+    """Marca uma etapa; devolve o registro dela (ex: record['rows'] = n quando só se sabe no final)"""
+    if ACTIVE is None:
+        yield {'rows': rows}
+        return
+    with ACTIVE.stage(name, rows) as record:
+        yield record
+
+
+def read_csv(*args, **kwargs):
+    """pd.read_csv com o tempo contado como leitura"""
+    if ACTIVE is None:
+        return pd.read_csv(*args, **kwargs)
+    with ACTIVE.io('read_csv') as counter:
+        df = pd.read_csv(*args, **kwargs)
+        # O número de linhas lidas só é conhecido depois da leitura
+        counter['rows'] = len(df)
+    return df
+
+
+def read_csv_chunks(path, chunk_size, **kwargs):
+    """pd.read_csv em blocos de chunk_size linhas (gerador), com o tempo de cada bloco contado como leitura"""
+    with pd.read_csv(path, chunksize=chunk_size, **kwargs) as reader:
+        while True:
+            if ACTIVE is None:
+                chunk = next(reader, None)
+            else:
+                with ACTIVE.io('read_csv') as counter:
+                    chunk = next(reader, None)
+                    counter['rows'] = 0 if chunk is None else len(chunk)
+            if chunk is None:
+                return
+            yield chunk
+
+
+def to_csv(df, *args, **kwargs):
+    """df.to_csv com o tempo contado como escrita"""
+    if ACTIVE is None:
+        return df.to_csv(*args, **kwargs)
+    with ACTIVE.io('to_csv', rows=len(df)):
+        return df.to_csv(*args, **kwargs)
+
+
+def profiled_call(pipeline, profile_slowest, function, *args, **kwargs):
+    """
+    Roda function em um worker com um profiler próprio; devolve (resultado, medições)
+    O processo principal junta as medições com ACTIVE.merge
+    """
+    global ACTIVE
+    profiler = start(pipeline, profile_slowest)
+    try:
+        return function(*args, **kwargs), profiler.snapshot()
+    finally:
+        ACTIVE = None
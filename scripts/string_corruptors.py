@@ -0,0 +1,112 @@
+"""
+Corruptores de Texto - Datathon Ribeirania
+Erros de formato em colunas de texto (usernames, ...), aplicados em arrays inteiros (usado pelo add_noise.py)
+
+Cada corruptor recebe um array de strings (StringDType do numpy) e o gerador aleatório e devolve
+as strings corrompidas; a variação de cada linha (qual sufixo, quantos espaços, onde cortar...)
+também é sorteada em array. Tudo usa as funções vetorizadas de np.strings (numpy >= 2.0), sem
+loop em Python por linha; só o truncate precisa do numpy 2.3 (np.strings.slice).
+
+    special_suffix      'joao_123' -> 'joao_123@@'
+    lookalikes          letras trocadas por letras cirílicas idênticas ('a' -> 'а')
+    whitespace          espaços/tab/espaço não separável antes e/ou depois
+    case_flip           MAIÚSCULAS, minúsculas ou InVeRtIdO
+    truncate            cortado entre 30% e 90% do tamanho (numpy >= 2.3)
+"""
+
+import numpy as np
+import pandas as pd
+
+if not hasattr(np, 'strings'):
+    # np.strings e StringDType só existem a partir do numpy 2.0: falha aqui, com a versão, e não no meio do add_noise
+    raise ImportError(f"string_corruptors.py precisa de numpy >= 2.0 (instalado: {np.__version__}); "
+                      "atualize com: pip install -U \"numpy>=2.0\"")
+
+from numpy.dtypes import StringDType
+
+SPECIAL_SUFFIXES = ('@@', '##', '$$', '!!', '??')
+
+# Letras latinas -> cirílicas visualmente idênticas
+LOOKALIKES = {
+    'a': 'а', 'c': 'с', 'e': 'е', 'i': 'і', 'o': 'о', 'p': 'р', 'x': 'х', 'y': 'у',
+    'A': 'А', 'B': 'В', 'C': 'С', 'E': 'Е', 'H': 'Н', 'M': 'М', 'O': 'О', 'T': 'Т',
+}
+
+# Preenchimentos: espaços, tab e espaço não separável
+PADDING = (' ', '  ', '   ', '\t', '\u00a0')
+
+
+def special_suffix(strings, rng):
+    """Acrescenta um sufixo de caracteres especiais"""
+    suffixes = rng.choice(SPECIAL_SUFFIXES, len(strings)).astype(StringDType())
+    return np.strings.add(strings, suffixes)
+
+
+def lookalikes(strings, rng):
+    """Troca a 1ª ocorrência de cada letra do LOOKALIKES (cada uma com chance de 50% por linha)"""
+    for latin, lookalike in LOOKALIKES.items():
+        strings = np.strings.replace(strings, latin, lookalike, rng.integers(0, 2, len(strings)))
+    return strings
+
+
+def whitespace(strings, rng):
+    """Espaços antes, depois ou dos dois lados"""
+    side = rng.integers(0, 3, len(strings))   # 0 = antes, 1 = depois, 2 = dos dois lados
+    padding = rng.choice(PADDING, len(strings)).astype(StringDType())
+    before = np.where(side != 1, padding, '').astype(StringDType())
+    after = np.where(side != 0, padding, '').astype(StringDType())
+    return np.strings.add(np.strings.add(before, strings), after)
+
+
+def case_flip(strings, rng):
+    """Tudo maiúsculo, tudo minúsculo ou com maiúsculas/minúsculas invertidas"""
+    kind = rng.integers(0, 3, len(strings))
+    result = strings.copy()
+    for k, flip in enumerate((np.strings.upper, np.strings.lower, np.strings.swapcase)):
+        result[kind == k] = flip(strings[kind == k])
+    return result
+
+
+def truncate(strings, rng):
+    """Corta entre 30% e 90% do tamanho (sempre sobra pelo menos 1 caractere)"""
+    lengths = np.strings.str_len(strings)
+    stops = np.maximum((lengths * rng.uniform(0.3, 0.9, len(strings))).astype(np.int64), 1)
+    return np.strings.slice(strings, stops)
+
+
+CORRUPTORS = {
+    'special_suffix': special_suffix,
+    'lookalikes': lookalikes,
+    'whitespace': whitespace,
+    'case_flip': case_flip,
+    'truncate': truncate,
+}
+
+
+def pick_corruptors(weights, size, rng):
+    """Sorteia o corruptor de cada uma de size linhas (weights: nome -> peso)"""
+    unknown = set(weights) - set(CORRUPTORS)
+    if unknown:
+        raise ValueError(f"Corruptores desconhecidos: {sorted(unknown)} (opções: {sorted(CORRUPTORS)})")
+    names = list(weights)
+    probabilities = np.array([weights[name] for name in names], dtype=float)
+    if weights.get('truncate', 0) > 0 and not hasattr(np.strings, 'slice'):
+        # np.strings.slice só existe a partir do numpy 2.3: falha antes de sujar, com a versão
+        raise ImportError(f"O corruptor 'truncate' precisa de numpy >= 2.3 (instalado: {np.__version__}); "
+                          "atualize com: pip install -U \"numpy>=2.3\" ou tire o 'truncate' de USERNAME_CORRUPTORS")
+    return np.array(names)[rng.choice(len(names), size, p=probabilities / probabilities.sum())]
+
+
+def corrupt_strings(values, corruptors, rng):
+    """
+    Aplica a cada valor o corruptor sorteado para a sua linha (corruptors: nomes, alinhado com values)
+    Valores ausentes (NaN) continuam ausentes; retorna um array object
+    """
+    values = np.asarray(values, dtype=object)
+    result = values.copy()
+    present = pd.notna(values)
+    for name in np.unique(corruptors[present]):
+        rows = present & (corruptors == name)
+        strings = values[rows].astype(str).astype(StringDType())
+        result[rows] = CORRUPTORS[name](strings, rng).astype(object)
+    return result
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Os scripts importam uns aos outros pelo nome (rodam de dentro de scripts/)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
@@ -0,0 +1,167 @@
+"""
+Testes do add_noise.py em bases limpas pequenas e sintéticas: o gabarito (manifesto) confere com
+os CSVs limpo e sujo, o resultado não depende do número de processos e o modo streaming aplica as
+mesmas quantidades de cada corrupção que a versão em memória
+"""
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import add_noise
+from noise_manifest import load_manifest, manifest_path
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+NUM_POSTS = 3000
+NUM_PRICES = 2000
+READ_OPTIONS = {'encoding': 'utf-8-sig', 'float_precision': 'round_trip'}
+
+
+def clean_xister(rng):
+    """Posts limpos no formato do main_generator.py (com as chaves user_id e template_id)"""
+    user_id = rng.integers(0, 200, NUM_POSTS)
+    return pd.DataFrame({
+        'post_id': [f'POST_{i:06d}' for i in range(1, NUM_POSTS + 1)],
+        'user_id': user_id,
+        'username': [f'user_{i}' for i in user_id],
+        'template_id': rng.integers(0, 50, NUM_POSTS),
+        'text': rng.choice(['RiberCoin subindo 🚀', 'Dia tranquilo em Ribeirania', 'Vendi tudo'], NUM_POSTS),
+        'timestamp': pd.date_range('2022-01-01', periods=NUM_POSTS, freq='17min').astype(str),
+        'likes': rng.integers(0, 2000, NUM_POSTS),
+        'reposts': rng.integers(0, 500, NUM_POSTS),
+        'account_type': rng.choice(['regular', 'influencer', 'bot'], NUM_POSTS),
+        'sentiment': rng.uniform(-1, 1, NUM_POSTS).round(2),
+        'coin': rng.choice(['RBC', 'SOL'], NUM_POSTS),
+    })
+
+
+def clean_prices(rng, coin_name, symbol):
+    """Preços limpos no formato do main_generator.py"""
+    prices = 0.5 * np.cumprod(1 + rng.normal(0, 0.01, NUM_PRICES))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2022-01-01', periods=NUM_PRICES, freq='h').astype(str),
+        'coin_name': coin_name,
+        'symbol': symbol,
+        'price_usd': prices,
+        'volume_24h': rng.uniform(5e5, 2e6, NUM_PRICES),
+        'market_cap': prices * 1e9,
+        'price_change_pct': np.concatenate(([0.0], np.diff(prices) / prices[:-1] * 100)),
+    })
+
+
+@pytest.fixture(scope='module')
+def clean_dir(tmp_path_factory):
+    """Pasta com todas as bases limpas de NOISE_JOBS; os jobs usam caminhos relativos, então vira a pasta atual"""
+    directory = tmp_path_factory.mktemp('clean')
+    rng = np.random.default_rng(7)
+    for name, (path, kind) in add_noise.NOISE_JOBS.items():
+        if kind == 'xister':
+            clean_xister(rng).to_csv(directory / path, index=False, encoding='utf-8-sig')
+        elif kind == 'crypto':
+            clean_prices(rng, name, name[:3].upper()).to_csv(directory / path, index=False, encoding='utf-8-sig')
+        else:
+            shutil.copy(os.path.join(REPO_DIR, path), directory / path)
+
+    previous = os.getcwd()
+    os.chdir(directory)
+    yield directory
+    os.chdir(previous)
+
+
+def noise_dataset(kind, clean_path, dirty, seed, chunk_size=None, tmp_dir=None):
+    """Suja clean_path em dirty (em memória ou em blocos de chunk_size linhas) e grava o manifesto"""
+    manifest = manifest_path(str(dirty))
+    noise = add_noise.XISTER_NOISE if kind == 'xister' else add_noise.CRYPTO_NOISE
+    if chunk_size:
+        add_noise.stream_noise(clean_path, str(dirty), kind, noise, seed, chunk_size, str(tmp_dir), manifest)
+    else:
+        df = pd.read_csv(clean_path, **READ_OPTIONS)
+        if kind == 'xister':
+            df_dirty = add_noise.add_noise_to_xister(df, seed, manifest)
+        else:
+            df_dirty = add_noise.add_noise_to_crypto(df, kind, seed, manifest)
+        df_dirty.to_csv(dirty, index=False, encoding='utf-8-sig')
+    return load_manifest(manifest)
+
+
+def assert_same_values(dirty, clean):
+    """Mesmos valores, coluna a coluna (números com tolerância de arredondamento do CSV)"""
+    for column in dirty.columns:
+        values, expected = dirty[column].to_numpy(), clean[column].to_numpy()
+        if values.dtype.kind in 'iuf' and expected.dtype.kind in 'iuf':
+            np.testing.assert_allclose(values.astype(float), expected.astype(float), rtol=1e-12, err_msg=column)
+        else:
+            np.testing.assert_array_equal(values.astype(str), expected.astype(str), err_msg=column)
+
+
+def flag_counts(manifest, kind):
+    """
+    Linhas com cada corrupção: as de antes das duplicatas contadas só nas linhas originais (as cópias
+    herdam o bit), as demais em todas as linhas
+    """
+    noise = add_noise.XISTER_NOISE if kind == 'xister' else add_noise.CRYPTO_NOISE
+    originals = manifest['duplicate_of'] < 0
+    counts = {}
+    for bit, flag in enumerate(manifest['flags']):
+        rows = (manifest['corruptions'] & np.uint16(1 << bit)) != 0
+        counts[flag] = int((rows & originals).sum() if flag in noise['before_duplicates'] else rows.sum())
+    return counts
+
+
+@pytest.mark.parametrize('chunk_size', [None, 700], ids=['memory', 'streaming'])
+@pytest.mark.parametrize('kind, path', [('xister', 'xister_posts.csv'), ('crypto', 'ribercoin_prices.csv')])
+def test_manifest_matches_clean_and_dirty_rows(clean_dir, tmp_path, kind, path, chunk_size):
+    dirty = tmp_path / 'dirty.csv'
+    manifest = noise_dataset(kind, path, dirty, 11, chunk_size, tmp_path / 'noise_tmp')
+    clean = pd.read_csv(path, **READ_OPTIONS)
+    df_dirty = pd.read_csv(dirty, **READ_OPTIONS)
+    original_row, duplicate_of = manifest['original_row'], manifest['duplicate_of']
+
+    assert len(original_row) == len(df_dirty)
+    assert list(df_dirty.columns) == [c for c in clean.columns if c not in add_noise.XISTER_KEY_COLUMNS]
+    # Cada linha limpa aparece uma vez como original; as duplicatas apontam para a cópia original
+    copies = duplicate_of >= 0
+    assert np.array_equal(np.sort(original_row[~copies]), np.arange(len(clean)))
+    assert np.all(duplicate_of[duplicate_of[copies]] == -1)
+    assert np.array_equal(original_row[duplicate_of[copies]], original_row[copies])
+
+    # Linhas sem nenhuma corrupção (originais e duplicatas exatas) são iguais às linhas limpas de origem
+    untouched = manifest['corruptions'] == 0
+    assert untouched.sum() > len(clean) // 2
+    assert_same_values(df_dirty[untouched].reset_index(drop=True),
+                       clean.iloc[original_row[untouched]].reset_index(drop=True))
+
+
+@pytest.mark.parametrize('kind, path', [('xister', 'xister_posts.csv'), ('crypto', 'ribercoin_prices.csv')])
+def test_streaming_applies_same_counts_as_memory(clean_dir, tmp_path, kind, path):
+    memory = noise_dataset(kind, path, tmp_path / 'memory.csv', 3)
+    streaming = noise_dataset(kind, path, tmp_path / 'streaming.csv', 3, 700, tmp_path / 'noise_tmp')
+
+    assert len(streaming['original_row']) == len(memory['original_row'])
+    assert (streaming['duplicate_of'] >= 0).sum() == (memory['duplicate_of'] >= 0).sum()
+    assert flag_counts(streaming, kind) == flag_counts(memory, kind)
+    assert not os.path.exists(tmp_path / 'noise_tmp' / 'streaming')
+
+
+def test_noise_is_identical_with_any_number_of_workers(clean_dir):
+    seeds = dict(zip(add_noise.NOISE_JOBS, np.random.SeedSequence(2025).spawn(len(add_noise.NOISE_JOBS))))
+    outputs = []
+    for max_workers in (1, 3):
+        results = add_noise.run_noise_jobs(seeds, max_workers)
+        files, manifests = {}, {}
+        for path, _ in add_noise.NOISE_JOBS.values():
+            dirty = add_noise.dirty_path(path)
+            with open(dirty, 'rb') as f:
+                files[dirty] = f.read()
+            manifests[dirty] = load_manifest(manifest_path(dirty))
+        outputs.append((results, files, manifests))
+
+    (serial_results, serial_files, serial_manifests), (pool_results, pool_files, pool_manifests) = outputs
+    assert serial_results == pool_results
+    assert serial_files == pool_files
+    for dirty, manifest in serial_manifests.items():
+        for name, values in manifest.items():
+            assert np.array_equal(values, pool_manifests[dirty][name]), (dirty, name)